@@ -1,36 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc
 from typing import List, Optional
 from datetime import datetime, timedelta
 
 from app.core.database import get_db
-from app.services.auth import verify_token, get_user_by_email
+from app.api.auth import get_current_user
 from app.services.ai_analytics import AIAnalyticsService
+from app.services.trending import trending_engine, WINDOWS
+from app.services.response_cache import cached_endpoint, response_cache
 from app.models.social_data import SocialPost, AnalyticsData
 from app.schemas.social_data import AnalyticsData as AnalyticsDataSchema, SocialPost as SocialPostSchema
 
 router = APIRouter()
-security = HTTPBearer()
 ai_service = AIAnalyticsService()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-):
-    email = verify_token(credentials.credentials)
-    if email is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = await get_user_by_email(db, email)
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-
-    return user
-
 @router.get("/dashboard", response_model=dict)
+@cached_endpoint("analytics.dashboard")
 async def get_dashboard_data(
+    request: Request,
     days: int = Query(7, description="Number of days to analyze"),
     current_user = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -67,7 +55,7 @@ async def get_dashboard_data(
         ]
 
         # Generate AI insights
-        insights = ai_service.generate_insights(posts_data)
+        insights = ai_service.generate_insights(posts_data, trending_engine.trending(current_user.id, "24h", limit=5))
 
         # Get aggregated analytics data
         analytics_result = await db.execute(
@@ -97,7 +85,8 @@ async def get_dashboard_data(
                     'sentiment_negative': record.sentiment_negative,
                     'sentiment_neutral': record.sentiment_neutral,
                     'total_engagement': record.total_engagement,
-                    'top_topics': record.top_topics
+                    'top_topics': record.top_topics,
+                    'trending_keywords': record.trending_keywords
                 }
                 for record in analytics_records
             ],
@@ -121,7 +110,9 @@ async def get_dashboard_data(
         raise HTTPException(status_code=500, detail=f"Analytics generation failed: {str(e)}")
 
 @router.get("/sentiment-analysis", response_model=dict)
+@cached_endpoint("analytics.sentiment")
 async def get_sentiment_analysis(
+    request: Request,
     platform: Optional[str] = None,
     days: int = Query(30, description="Number of days to analyze"),
     current_user = Depends(get_current_user),
@@ -149,8 +140,10 @@ async def get_sentiment_analysis(
 
         # Analyze sentiment for posts that don't have it
         sentiment_data = []
+        analyzed = False
         for post in posts:
             if not post.sentiment:
+                analyzed = True
                 # Analyze sentiment if not already done
                 analysis = ai_service.analyze_sentiment(post.content)
                 post.sentiment = analysis['sentiment']
@@ -166,6 +159,8 @@ async def get_sentiment_analysis(
             })
 
         await db.commit()
+        if analyzed:
+            await response_cache.invalidate_user(current_user.id)
 
         # Aggregate by date
         daily_sentiment = {}
@@ -200,7 +195,9 @@ async def get_sentiment_analysis(
         raise HTTPException(status_code=500, detail=f"Sentiment analysis failed: {str(e)}")
 
 @router.get("/topic-analysis", response_model=dict)
+@cached_endpoint("analytics.topics")
 async def get_topic_analysis(
+    request: Request,
     days: int = Query(30, description="Number of days to analyze"),
     current_user = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -275,6 +272,22 @@ async def get_topic_analysis(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Topic analysis failed: {str(e)}")
 
+@router.get("/trending", response_model=dict)
+async def get_trending_keywords(
+    window: str = Query("24h", description="Window to rank: 1h, 24h or 7d"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user = Depends(get_current_user)
+):
+    """Get terms accelerating in a window relative to their longer-term baseline"""
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {', '.join(WINDOWS)}")
+
+    return {
+        'window': window,
+        'trending': trending_engine.trending(current_user.id, window, limit),
+        'generated_at': datetime.utcnow().isoformat()
+    }
+
 @router.post("/analyze-post")
 async def analyze_single_post(
     content: str,
@@ -1,23 +1,74 @@
+import math
+import asyncio
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.services.auth import authenticate_user, create_user, verify_token, get_user_by_email
+from app.services.auth import (
+    authenticate_user, create_user, create_access_token, get_user_by_email,
+    auth_cache, login_throttle, PasswordWorkersBusy
+)
 from app.schemas.user import User, UserCreate, Token, TokenData
 from app.core.config import settings
 
 router = APIRouter()
 security = HTTPBearer()
 
-@router.post("/login", response_model=Token)
-def login(
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Resolve the bearer token to its user, from the auth cache when possible"""
+    email = auth_cache.verify_token(credentials.credentials)
+    if email is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user = auth_cache.get_user(db, email)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return user
+
+def throttle_login(request: Request):
+    """Limit password attempts per client IP before any hashing is done"""
+    retry_after = login_throttle.acquire(request.client.host if request.client else "unknown")
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+def password_workers_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please try again",
+        headers={"Retry-After": "1"},
+    )
+
+@router.post("/login", response_model=Token, dependencies=[Depends(throttle_login)])
+async def login(
     email: str,
     password: str,
     db: Session = Depends(get_db)
 ):
-    user = authenticate_user(db, email, password)
+    try:
+        user = await authenticate_user(db, email, password)
+    except PasswordWorkersBusy:
+        raise password_workers_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,44 +87,30 @@ def login(
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.post("/register", response_model=User)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    db_user = get_user_by_email(db, user.email)
+@router.post("/register", response_model=User, dependencies=[Depends(throttle_login)])
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    # Check if user already exists, off the event loop
+    db_user = await asyncio.to_thread(get_user_by_email, db, user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    return create_user(db, user)
+    try:
+        return await create_user(db, user)
+    except PasswordWorkersBusy:
+        raise password_workers_busy()
 
 @router.get("/me", response_model=User)
-def read_users_me(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    email = verify_token(credentials.credentials)
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    user = get_user_by_email(db, email)
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return user
+def read_users_me(current_user = Depends(get_current_user)):
+    return current_user
 
 @router.post("/refresh-token", response_model=Token)
 def refresh_access_token(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    email = verify_token(credentials.credentials)
+    email = auth_cache.verify_token(credentials.credentials)
     if email is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
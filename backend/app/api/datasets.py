@@ -55,7 +55,7 @@ async def search_datasets(
             detail="Kaggle API not authenticated. Please setup credentials first."
         )
 
-    return service.search_datasets(query, max_results)
+    return await service.search_datasets(query, max_results)
 
 @router.get("/datasets/{dataset_slug}/info")
 async def get_dataset_info(dataset_slug: str):
@@ -68,7 +68,7 @@ async def get_dataset_info(dataset_slug: str):
             detail="Kaggle API not authenticated"
         )
 
-    info = service.get_dataset_info(dataset_slug)
+    info = await service.get_dataset_info(dataset_slug)
     if not info:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -95,7 +95,7 @@ async def download_and_process_dataset(
         )
 
     # Validate dataset exists
-    if not kaggle_service.validate_dataset_slug(dataset_slug):
+    if not await kaggle_service.validate_dataset_slug(dataset_slug):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dataset not found or not accessible"
@@ -1,53 +1,280 @@
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, BackgroundTasks
-from typing import Dict, List, Any
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, BackgroundTasks, Request, HTTPException, status
+from starlette.requests import HTTPConnection
+from sse_starlette.sse import EventSourceResponse
+from typing import Dict, List, Any, Optional, Union
 import json
 import asyncio
 import logging
 from datetime import datetime
+from functools import partial
 
-# WebSocket authentication dependency
+from app.api.auth import get_current_user
 from app.services.ai_analytics import AIAnalyticsService
-from app.core.database import get_db
+from app.services.auth import auth_cache
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
 from app.models.social_data import SocialPost, AnalyticsData
+from app.services.realtime_broker import MessageBroker, create_broker, user_channel
+from app.services.realtime_encoding import ENCODINGS, encode_message, negotiate_encoding
+from app.services.realtime_events import create_event_log, REPLAYABLE_EVENT_TYPES
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+class ConnectionOutbox:
+    """Bounded outbound queue with a dedicated writer task for one socket.
+
+    Broadcasts only enqueue, so a slow client never stalls delivery to other
+    sockets or the code that published the event. When the queue is full the
+    ``drop_oldest`` policy discards the oldest pending message, while
+    ``disconnect`` closes the slow socket.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        on_failure,
+        max_size: int,
+        policy: str,
+        per_post: bool = False,
+        encoding: str = "json"
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        # Client opted in to individual new_post events alongside batches
+        self.per_post = per_post
+        self.encoding = encoding
+        self.on_failure = on_failure
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        # Live messages are held back while missed events are being replayed
+        self.replaying = False
+        self._held: List[Dict[str, Any]] = []
+        self.task = asyncio.create_task(self._run())
+
+    def enqueue(self, message: Dict[str, Any]) -> bool:
+        """Queue a message without blocking; False means the client was cut off"""
+        if self.replaying:
+            self._held.append(message)
+            return True
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            if self.policy == "disconnect":
+                logger.warning(f"Disconnecting slow consumer for user {self.user_id}")
+                asyncio.ensure_future(self._close_slow_consumer())
+                return False
+
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.queue.put_nowait(message)
+            return True
+
+    def replay(self, missed: Optional[List[Dict[str, Any]]]):
+        """Send missed events, then the live messages held back meanwhile"""
+        self.replaying = False
+        last_seq = 0
+        if missed is None:
+            self.enqueue({"type": "resync", "timestamp": datetime.now().isoformat()})
+        else:
+            for message in missed:
+                last_seq = message["seq"]
+                self.enqueue(message)
+
+        held, self._held = self._held, []
+        for message in held:
+            if message.get("seq", last_seq + 1) > last_seq:
+                self.enqueue(message)
+
+    async def _run(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                payload = encode_message(message, self.encoding)
+                if isinstance(payload, bytes):
+                    await self.websocket.send_bytes(payload)
+                    self.bytes_sent += len(payload)
+                else:
+                    await self.websocket.send_text(payload)
+                    self.bytes_sent += len(payload.encode())
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Failed to send message to user {self.user_id}: {e}")
+            self.on_failure(self.websocket, self.user_id)
+
+    async def _close_slow_consumer(self):
+        self.on_failure(self.websocket, self.user_id)
+        try:
+            await self.websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+
+    def close(self):
+        self.task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'sent': self.sent,
+            'bytes_sent': self.bytes_sent,
+            'dropped': self.dropped,
+            'encoding': self.encoding
+        }
+
 # Global connection manager for WebSocket clients
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, broker: Optional[MessageBroker] = None):
         self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.outboxes: Dict[WebSocket, ConnectionOutbox] = {}
+        # Server-Sent Events subscribers, fed from the same broker messages
+        self.streams: Dict[int, List[asyncio.Queue]] = {}
+        # Fans messages out to whichever worker holds each user's sockets
+        self.broker = broker or create_broker()
+        # Recent post and alert events, replayed to clients that reconnect
+        self.event_log = create_event_log()
+
+    def _has_local(self, user_id: int) -> bool:
+        return user_id in self.active_connections or user_id in self.streams
+
+    async def _subscribe(self, user_id: int):
+        await self.broker.subscribe(user_channel(user_id), partial(self.deliver_local, user_id=user_id))
 
     async def connect(self, websocket: WebSocket, user_id: int):
-        await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
+        # JSON by default; ?encoding=msgpack or a msgpack subprotocol switches this
+        # socket to binary frames when msgpack is installed. Only an encoding the
+        # server supports is echoed back as the subprotocol.
+        offered = websocket.scope.get("subprotocols", [])
+        encoding = negotiate_encoding(websocket.query_params.get("encoding", ""), offered)
+        await websocket.accept(subprotocol=next((offer for offer in offered if offer.lower() == encoding), None))
+        self.outboxes[websocket] = ConnectionOutbox(
+            websocket,
+            user_id,
+            self.disconnect,
+            settings.REALTIME_SEND_QUEUE_SIZE,
+            settings.REALTIME_SLOW_CONSUMER_POLICY,
+            per_post=websocket.query_params.get("per_post", "").lower() == "true",
+            encoding=encoding
+        )
+        # ?since=<seq> resumes after the last event the client saw
+        since = websocket.query_params.get("since", "")
+        outbox = self.outboxes[websocket]
+        outbox.replaying = since != ""
+
+        first = not self._has_local(user_id)
+        self.active_connections.setdefault(user_id, []).append(websocket)
+        if first:
+            await self._subscribe(user_id)
+
+        if outbox.replaying:
+            # Subscribed first, so anything published during the read is held, not lost
+            outbox.replay(await self.event_log.since(user_id, int(since)) if since.isdigit() else None)
         logger.info(f"User {user_id} connected. Total connections: {len(self.active_connections[user_id])}")
 
     def disconnect(self, websocket: WebSocket, user_id: int):
+        outbox = self.outboxes.pop(websocket, None)
+        if outbox:
+            outbox.close()
         if user_id in self.active_connections:
             if websocket in self.active_connections[user_id]:
                 self.active_connections[user_id].remove(websocket)
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
+                if not self._has_local(user_id):
+                    asyncio.ensure_future(self._unsubscribe(user_id))
         logger.info(f"User {user_id} disconnected. Remaining connections: {len(self.active_connections.get(user_id, []))}")
 
+    async def open_stream(self, user_id: int) -> asyncio.Queue:
+        """Register a Server-Sent Events subscriber and return its bounded queue"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.REALTIME_SEND_QUEUE_SIZE)
+        first = not self._has_local(user_id)
+        self.streams.setdefault(user_id, []).append(queue)
+        if first:
+            await self._subscribe(user_id)
+        return queue
+
+    def close_stream(self, user_id: int, queue: asyncio.Queue):
+        queues = self.streams.get(user_id, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self.streams.pop(user_id, None)
+            if not self._has_local(user_id):
+                asyncio.ensure_future(self._unsubscribe(user_id))
+
+    async def _unsubscribe(self, user_id: int):
+        # A new socket or stream may have connected while this was scheduled
+        if not self._has_local(user_id):
+            try:
+                await self.broker.unsubscribe(user_channel(user_id))
+            except Exception as e:
+                logger.error(f"Failed to unsubscribe user {user_id} from broker: {e}")
+
     async def send_personal_message(self, message: Dict[str, Any], user_id: int):
-        """Send message to all connections for a specific user"""
-        if user_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Failed to send message to user {user_id}: {e}")
-                    disconnected.append(connection)
-
-            # Clean up disconnected clients
-            for conn in disconnected:
-                self.disconnect(conn, user_id)
+        """Send message to all connections for a specific user, on every worker"""
+        if message.get("type") in REPLAYABLE_EVENT_TYPES:
+            message = await self.event_log.record(user_id, message)
+        try:
+            await self.broker.publish(user_channel(user_id), message)
+        except Exception as e:
+            logger.error(f"Failed to publish message for user {user_id}: {e}")
+
+    async def deliver_local(self, message: Dict[str, Any], user_id: int):
+        """Queue a broker message on this worker's connections for a user"""
+        if "seq" in message:
+            self.event_log.observe(user_id, message)
+
+        for queue in self.streams.get(user_id, []):
+            self.send_to_stream(queue, message)
+
+        per_post_messages = None
+        for connection in list(self.active_connections.get(user_id, [])):
+            self.send_to_connection(connection, message)
+
+            outbox = self.outboxes.get(connection)
+            if outbox and outbox.per_post and message.get("type") == "new_posts_batch":
+                if per_post_messages is None:
+                    per_post_messages = [
+                        {"type": "new_post", "data": post, "timestamp": message["timestamp"]}
+                        for post in message["data"]["posts"]
+                    ]
+                for post_message in per_post_messages:
+                    self.send_to_connection(connection, post_message)
+
+    def send_to_connection(self, websocket: WebSocket, message: Dict[str, Any]) -> bool:
+        """Queue a message for one socket without waiting for the network"""
+        outbox = self.outboxes.get(websocket)
+        return outbox.enqueue(message) if outbox else False
+
+    @staticmethod
+    def send_to_stream(queue: asyncio.Queue, message: Dict[str, Any]):
+        """Queue a message for one SSE subscriber, dropping its oldest if full"""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Outbound queue depth and drop counters for this worker's sockets"""
+        connections = [outbox.metrics() for outbox in self.outboxes.values()]
+        return {
+            'users': len(self.active_connections),
+            'connections': len(connections),
+            'sse_streams': sum(len(queues) for queues in self.streams.values()),
+            'total_queue_depth': sum(c['queue_depth'] for c in connections),
+            'max_queue_depth': max((c['queue_depth'] for c in connections), default=0),
+            'total_dropped': sum(c['dropped'] for c in connections),
+            'total_sent': sum(c['sent'] for c in connections),
+            'total_bytes_sent': sum(c['bytes_sent'] for c in connections),
+            'slow_consumer_policy': settings.REALTIME_SLOW_CONSUMER_POLICY
+        }
 
     async def broadcast_to_user(self, message: Dict[str, Any], user_id: int):
         """Alias for send_personal_message"""
@@ -71,6 +298,29 @@ class ConnectionManager:
         }
         await self.send_personal_message(message, user_id)
 
+    async def send_new_posts_batch(self, user_id: int, posts: List[Dict[str, Any]]):
+        """Send one coalesced message for a burst of new posts"""
+        sentiment_delta = {}
+        platform_delta = {}
+        for post in posts:
+            sentiment = post.get('sentiment') or 'neutral'
+            sentiment_delta[sentiment] = sentiment_delta.get(sentiment, 0) + 1
+            platform = post.get('platform', 'unknown')
+            platform_delta[platform] = platform_delta.get(platform, 0) + 1
+
+        message = {
+            "type": "new_posts_batch",
+            "data": {
+                "count": len(posts),
+                "posts": posts,
+                "sentiment_delta": sentiment_delta,
+                "platform_delta": platform_delta,
+                "engagement_delta": sum(post.get('engagement', 0) for post in posts)
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+        await self.send_personal_message(message, user_id)
+
     async def send_sentiment_alert(self, user_id: int, alert_data: Dict[str, Any]):
         """Send sentiment analysis alert"""
         message = {
@@ -83,11 +333,50 @@ class ConnectionManager:
 # Global manager instance
 manager = ConnectionManager()
 
+def _connection_token(connection: HTTPConnection) -> Optional[str]:
+    """Bearer token from the Authorization header, or ``?token=`` for
+    browser WebSocket and EventSource clients, which cannot set headers"""
+    scheme, _, credentials = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials
+    return connection.query_params.get("token") or None
+
+def _token_user_id(token: str) -> Optional[int]:
+    email = auth_cache.verify_token(token)
+    if email is None:
+        return None
+    db = SessionLocal()
+    try:
+        user = auth_cache.get_user(db, email)
+    finally:
+        db.close()
+    return user.id if user is not None and user.is_active else None
+
+async def is_authorized(connection: HTTPConnection, user_id: int) -> bool:
+    """Whether the connection carries a valid token for ``user_id`` itself"""
+    token = _connection_token(connection)
+    if token is None:
+        return False
+    return await asyncio.to_thread(_token_user_id, token) == user_id
+
+@router.get("/metrics")
+async def get_realtime_metrics(current_user = Depends(get_current_user)):
+    """Outbound WebSocket queue and stats ticker metrics for this worker"""
+    return {
+        **manager.get_metrics(),
+        'stats_ticker': stats_ticker.metrics(),
+        'encodings': ENCODINGS
+    }
+
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
     """WebSocket endpoint for real-time dashboard updates"""
-    # Simple authentication - in production, you'd validate tokens
+    if not await is_authorized(websocket, user_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
     await manager.connect(websocket, user_id)
+    # Joins the user's shared stats ticker on its first stats request
+    ticking = False
 
     try:
         while True:
@@ -98,33 +387,40 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
                 message = json.loads(data)
                 # Handle client messages if needed
                 if message.get("type") == "ping":
-                    await websocket.send_json({"type": "pong", "timestamp": datetime.now().isoformat()})
+                    manager.send_to_connection(websocket, {"type": "pong", "timestamp": datetime.now().isoformat()})
                 elif message.get("type") == "request_stats":
-                    # Trigger stats update
-                    await send_realtime_stats(user_id)
+                    # Served from the ticker's cached snapshot rather than a fresh query;
+                    # joining sends the snapshot, after which this socket gets deltas
+                    if not ticking:
+                        await stats_ticker.acquire(user_id, websocket)
+                        ticking = True
+                    else:
+                        await stats_ticker.send_snapshot(user_id, websocket)
 
             except json.JSONDecodeError:
-                await websocket.send_json({"error": "Invalid JSON message"})
+                manager.send_to_connection(websocket, {"error": "Invalid JSON message"})
 
     except WebSocketDisconnect:
         manager.disconnect(websocket, user_id)
     except Exception as e:
         logger.error(f"WebSocket error for user {user_id}: {e}")
         manager.disconnect(websocket, user_id)
+    finally:
+        if ticking:
+            stats_ticker.release(user_id, websocket)
 
 @router.websocket("/ws/dashboard/{user_id}")
 async def dashboard_websocket_endpoint(websocket: WebSocket, user_id: int):
     """Dedicated WebSocket for dashboard real-time updates"""
-    # Simple authentication - in production, you'd validate tokens
+    if not await is_authorized(websocket, user_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
     await manager.connect(websocket, user_id)
 
-    # Send initial stats on connection
-    await send_realtime_stats(user_id)
+    # Join the user's shared stats ticker, which sends this socket the current snapshot
+    await stats_ticker.acquire(user_id, websocket)
 
     try:
-        # Start background task to periodically send updates
-        background_task = asyncio.create_task(send_periodic_updates(user_id))
-
         while True:
             try:
                 # Listen for client messages
@@ -132,102 +428,303 @@ async def dashboard_websocket_endpoint(websocket: WebSocket, user_id: int):
                 message = json.loads(data)
 
                 if message.get("type") == "request_update":
-                    await send_realtime_stats(user_id)
+                    await stats_ticker.send_snapshot(user_id, websocket)
                 elif message.get("type") == "stop_updates":
-                    background_task.cancel()
                     break
 
             except asyncio.TimeoutError:
                 # Send keepalive ping
-                await websocket.send_json({"type": "ping", "timestamp": datetime.now().isoformat()})
+                manager.send_to_connection(websocket, {"type": "ping", "timestamp": datetime.now().isoformat()})
             except json.JSONDecodeError:
-                await websocket.send_json({"error": "Invalid message format"})
+                manager.send_to_connection(websocket, {"error": "Invalid message format"})
 
     except WebSocketDisconnect:
-        if 'background_task' in locals():
-            background_task.cancel()
-        manager.disconnect(websocket, user_id)
+        pass
     except Exception as e:
         logger.error(f"Dashboard WebSocket error for user {user_id}: {e}")
-        if 'background_task' in locals():
-            background_task.cancel()
+    finally:
+        stats_ticker.release(user_id, websocket)
         manager.disconnect(websocket, user_id)
 
-async def send_realtime_stats(user_id: int):
-    """Send current statistics to user"""
+def _sse_event(message: Dict[str, Any]) -> Dict[str, Any]:
+    event = {"event": message.get("type", "message"), "data": encode_message(message)}
+    if "seq" in message:
+        event["id"] = str(message["seq"])
+    return event
+
+async def _sse_events(user_id: int, last_event_id: Optional[str]):
+    # Subscribe before replaying so nothing published in between is lost
+    queue = await manager.open_stream(user_id)
+    # Queues the stats snapshot ahead of any delta, behind the replayed events
+    await stats_ticker.acquire(user_id, queue)
     try:
-        from app.core.database import get_db_sync
-        from sqlalchemy import func, desc
-
-        # Get database session
-        db = next(get_db_sync())
-
-        # Get recent posts (last 24 hours)
-        yesterday = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        replayed = 0
+        if last_event_id:
+            missed = await manager.event_log.since(user_id, int(last_event_id)) if last_event_id.isdigit() else None
+            if missed is None:
+                # Gap is older than the ring buffer - the client must reload
+                yield _sse_event({"type": "resync", "timestamp": datetime.now().isoformat()})
+            else:
+                for message in missed:
+                    replayed = message["seq"]
+                    yield _sse_event(message)
 
-        posts = db.query(SocialPost).filter(
+        while True:
+            message = await queue.get()
+            if message.get("seq", replayed + 1) <= replayed:
+                continue
+            yield _sse_event(message)
+    finally:
+        stats_ticker.release(user_id, queue)
+        manager.close_stream(user_id, queue)
+
+@router.get("/sse/{user_id}")
+async def sse_endpoint(request: Request, user_id: int):
+    """Server-Sent Events stream of post, alert and stats events for a user.
+
+    Reconnecting clients send ``Last-Event-ID`` (or ``?last_event_id=``) and
+    only receive the events they missed.
+    """
+    if not await is_authorized(request, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized for this user's events"
+        )
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    return EventSourceResponse(_sse_events(user_id, last_event_id), ping=30)
+
+def compute_user_stats(user_id: int) -> Dict[str, Any]:
+    """Aggregate today's stats for a user with grouped SQL (runs in a thread)"""
+    from app.core.database import SessionLocal
+    from sqlalchemy import func, desc
+
+    db = SessionLocal()
+    try:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        rows = db.query(
+            SocialPost.platform,
+            SocialPost.sentiment,
+            func.count(SocialPost.id),
+            func.coalesce(func.sum(SocialPost.likes + SocialPost.shares + SocialPost.comments), 0)
+        ).filter(
             SocialPost.user_id == user_id,
-            SocialPost.posted_at >= yesterday
-        ).all()
+            SocialPost.posted_at >= today
+        ).group_by(SocialPost.platform, SocialPost.sentiment).all()
 
-        # Calculate basic stats
-        total_posts = len(posts)
-        total_engagement = sum((p.likes + p.shares + p.comments) for p in posts)
-
-        # Sentiment distribution
+        total_posts = 0
+        total_engagement = 0
         sentiment_counts = {}
-        for post in posts:
-            sent = post.sentiment or 'neutral'
-            sentiment_counts[sent] = sentiment_counts.get(sent, 0) + 1
-
-        # Platform distribution
         platform_counts = {}
-        for post in posts:
-            platform_counts[post.platform] = platform_counts.get(post.platform, 0) + 1
+        for platform, sentiment, count, engagement in rows:
+            total_posts += count
+            total_engagement += int(engagement)
+            sent = sentiment or 'neutral'
+            sentiment_counts[sent] = sentiment_counts.get(sent, 0) + count
+            platform_counts[platform] = platform_counts.get(platform, 0) + count
 
         # Get latest analytics
         latest_analytics = db.query(AnalyticsData).filter(
             AnalyticsData.user_id == user_id
         ).order_by(desc(AnalyticsData.date)).first()
 
-        stats = {
+        return {
             "total_posts_today": total_posts,
             "total_engagement_today": total_engagement,
             "sentiment_distribution": sentiment_counts,
             "platform_distribution": platform_counts,
             "latest_analytics": {
-                "total_posts": latest_analytics.total_posts if latest_analytics else 0,
-                "sentiment_positive": latest_analytics.sentiment_positive if latest_analytics else 0,
-                "sentiment_negative": latest_analytics.sentiment_negative if latest_analytics else 0,
-                "sentiment_neutral": latest_analytics.sentiment_neutral if latest_analytics else 0,
-                "total_engagement": latest_analytics.total_engagement if latest_analytics else 0,
+                "total_posts": latest_analytics.total_posts,
+                "sentiment_positive": latest_analytics.sentiment_positive,
+                "sentiment_negative": latest_analytics.sentiment_negative,
+                "sentiment_neutral": latest_analytics.sentiment_neutral,
+                "total_engagement": latest_analytics.total_engagement,
             } if latest_analytics else None
         }
+    finally:
+        db.close()
+
+def _stats_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Keys whose values changed between two stats snapshots (removed keys map to None)"""
+    delta = {}
+    for key in previous.keys() | current.keys():
+        old, new = previous.get(key), current.get(key)
+        if isinstance(old, dict) and isinstance(new, dict):
+            nested = _stats_delta(old, new)
+            if nested:
+                delta[key] = nested
+        elif old != new:
+            delta[key] = new
+    return delta
+
+class StatsTicker:
+    """Per-user stats loop shared by every dashboard socket of that user.
+
+    Sockets and SSE queues join and leave a user's ticker; each gets the
+    full snapshot on joining, then while any are joined the user's stats
+    are computed once per interval and only the changed fields are pushed
+    to them as a ``stats_delta`` message. Connections that never joined
+    get no deltas, as they have no snapshot to apply them to. Database load
+    therefore grows with the number of users watching, not the number of
+    open tabs.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._subscribers: Dict[int, List[Union[WebSocket, asyncio.Queue]]] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+
+    def _start(self, user_id: int):
+        if user_id not in self._tasks:
+            self._tasks[user_id] = asyncio.create_task(self._run(user_id))
+
+    async def acquire(self, user_id: int, subscriber: Union[WebSocket, asyncio.Queue]):
+        """Join a socket or SSE queue to the user's ticker and send it the snapshot"""
+        self._start(user_id)
+        message = await self.snapshot(user_id)
+        # No awaits from here on, so no delta can reach the subscriber before its baseline
+        self._start(user_id)
+        self._subscribers.setdefault(user_id, []).append(subscriber)
+        if message:
+            self._send(subscriber, {**message, "data": self._snapshots.get(user_id, message["data"])})
+
+    def release(self, user_id: int, subscriber: Union[WebSocket, asyncio.Queue]):
+        subscribers = self._subscribers.get(user_id, [])
+        if subscriber in subscribers:
+            subscribers.remove(subscriber)
+        if subscribers:
+            return
+
+        self._subscribers.pop(user_id, None)
+        self._snapshots.pop(user_id, None)
+        task = self._tasks.pop(user_id, None)
+        if task:
+            task.cancel()
+
+    async def snapshot(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Full current stats message for a user, shared with the ticker's cache"""
+        snapshot = self._snapshots.get(user_id)
+        if snapshot is None:
+            try:
+                snapshot = await asyncio.to_thread(compute_user_stats, user_id)
+            except Exception as e:
+                logger.error(f"Error computing real-time stats for user {user_id}: {e}")
+                return None
+            if user_id in self._tasks:
+                self._snapshots.setdefault(user_id, snapshot)
+
+        return {
+            "type": "stats_update",
+            "data": snapshot,
+            "timestamp": datetime.now().isoformat()
+        }
 
-        await manager.send_user_stats(user_id, stats)
+    async def send_snapshot(self, user_id: int, subscriber: Union[WebSocket, asyncio.Queue]):
+        """Send the full current stats to a single socket or SSE queue"""
+        message = await self.snapshot(user_id)
+        if message:
+            self._send(subscriber, message)
+
+    @staticmethod
+    def _send(subscriber: Union[WebSocket, asyncio.Queue], message: Dict[str, Any]):
+        if isinstance(subscriber, asyncio.Queue):
+            manager.send_to_stream(subscriber, message)
+        else:
+            manager.send_to_connection(subscriber, message)
+
+    async def _run(self, user_id: int):
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                stats = await asyncio.to_thread(compute_user_stats, user_id)
+
+                delta = _stats_delta(self._snapshots.get(user_id, {}), stats)
+                self._snapshots[user_id] = stats
+                if delta:
+                    message = {
+                        "type": "stats_delta",
+                        "data": delta,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    for subscriber in list(self._subscribers.get(user_id, [])):
+                        self._send(subscriber, message)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in periodic updates for user {user_id}: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'users': len(self._tasks),
+            'dashboards': sum(len(subscribers) for subscribers in self._subscribers.values())
+        }
+
+stats_ticker = StatsTicker(settings.REALTIME_STATS_INTERVAL)
 
+async def send_realtime_stats(user_id: int):
+    """Send current statistics to user"""
+    try:
+        stats = await asyncio.to_thread(compute_user_stats, user_id)
+        await manager.send_user_stats(user_id, stats)
     except Exception as e:
         logger.error(f"Error sending real-time stats to user {user_id}: {e}")
-    finally:
-        if 'db' in locals():
-            db.close()
 
-async def send_periodic_updates(user_id: int):
-    """Send periodic updates every 30 seconds"""
-    while True:
+class NotificationCoalescer:
+    """Buffers new-post events per user and emits them as one batch message.
+
+    A batch is flushed ``window`` seconds after its first post or as soon as
+    it reaches ``max_batch`` posts, whichever comes first, so a collection
+    run of hundreds of posts costs a handful of frames per socket.
+    """
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._buffers: Dict[int, List[Dict[str, Any]]] = {}
+        self._timers: Dict[int, asyncio.Task] = {}
+
+    async def add(self, user_id: int, post_data: Dict[str, Any]):
+        buffer = self._buffers.setdefault(user_id, [])
+        buffer.append(post_data)
+
+        if len(buffer) >= self.max_batch:
+            await self.flush(user_id)
+        elif user_id not in self._timers:
+            self._timers[user_id] = asyncio.create_task(self._flush_later(user_id))
+
+    async def _flush_later(self, user_id: int):
         try:
-            await asyncio.sleep(30)  # Update every 30 seconds
-            await send_realtime_stats(user_id)
+            await asyncio.sleep(self.window)
         except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Error in periodic updates for user {user_id}: {e}")
-            break
+            return
+        self._timers.pop(user_id, None)
+        await self.flush(user_id)
+
+    async def flush(self, user_id: int):
+        """Emit any buffered posts for a user immediately"""
+        timer = self._timers.pop(user_id, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        posts = self._buffers.pop(user_id, None)
+        if posts:
+            await manager.send_new_posts_batch(user_id, posts)
+
+notification_coalescer = NotificationCoalescer(
+    settings.REALTIME_BATCH_WINDOW_MS / 1000,
+    settings.REALTIME_BATCH_MAX_POSTS
+)
 
 # Utility functions for external use
 async def notify_new_post(user_id: int, post_data: Dict[str, Any]):
-    """Notify user of new post (called from other services)"""
-    await manager.send_new_post_alert(user_id, post_data)
+    """Notify user of new post (called from other services); coalesced into batches"""
+    await notification_coalescer.add(user_id, post_data)
+
+async def flush_new_post_notifications(user_id: int):
+    """Send buffered new-post notifications without waiting for the batch window"""
+    await notification_coalescer.flush(user_id)
 
 async def notify_sentiment_alert(user_id: int, alert_data: Dict[str, Any]):
     """Notify user of sentiment alert"""
@@ -1,42 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc
 from typing import List, Optional
 from datetime import datetime, timedelta
+import asyncio
 
 from app.core.database import get_db
-from app.services.auth import verify_token, get_user_by_email
+from app.api.auth import get_current_user
 from app.services.ai_analytics import AIAnalyticsService
 from app.services.user_social_analytics import UserSocialAnalyticsService
 from app.services.email_service import EmailService
+from app.services.email_outbox import email_outbox, enqueue_emails, outbox_row
+from app.services.email_templates import RenderedEmail
+from app.services.report_engine import build_user_report, rollup_range
+from app.services.trending import trending_engine
 from app.models.social_data import Report, AnalyticsData, SocialPost
 from app.schemas.social_data import Report as ReportSchema, ReportCreate
 
 router = APIRouter()
-security = HTTPBearer()
 ai_service = AIAnalyticsService()
 user_social_service = UserSocialAnalyticsService()
 email_service = EmailService()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-):
-    email = verify_token(credentials.credentials)
-    if email is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = await get_user_by_email(db, email)
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-
-    return user
-
 @router.post("/generate", response_model=ReportSchema)
 async def generate_report(
     report_data: ReportCreate,
-    background_tasks: BackgroundTasks,
     current_user = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -53,36 +41,18 @@ async def generate_report(
         else:
             start_date = report_data.date_range_start or (end_date - timedelta(days=7))
             end_date = report_data.date_range_end or end_date
-
-        # Fetch data for the period
-        posts_result = await db.execute(
-            select(SocialPost).where(
-                and_(
-                    SocialPost.user_id == current_user.id,
-                    SocialPost.posted_at >= start_date,
-                    SocialPost.posted_at <= end_date
-                )
-            )
+        # Store the whole-day UTC period the rollups actually cover
+        start_date, end_date = rollup_range(start_date, end_date)
+
+        # Compose from daily rollups; only the current day is aggregated from posts
+        insights, report_content = await asyncio.to_thread(
+            build_user_report,
+            current_user.id,
+            report_data.report_type,
+            start_date,
+            end_date,
+            trending_engine.trending(current_user.id, "24h", limit=5) or None
         )
-        posts = posts_result.scalars().all()
-
-        # Generate insights
-        posts_data = [
-            {
-                'content': post.content,
-                'platform': post.platform,
-                'likes': post.likes,
-                'shares': post.shares,
-                'comments': post.comments,
-                'sentiment': post.sentiment
-            }
-            for post in posts
-        ]
-
-        insights = ai_service.generate_insights(posts_data)
-
-        # Generate AI report
-        report_content = ai_service.generate_business_report(insights, report_data.report_type)
 
         # Create report record
         db_report = Report(
@@ -92,23 +62,16 @@ async def generate_report(
             date_range_start=start_date,
             date_range_end=end_date,
             summary=insights.get('summary', ''),
-            insights=insights.get('recommendations', []),
+            insights=insights.get('key_insights', []),
             recommendations=insights.get('recommendations', []),
             data_snapshot=insights
         )
 
-        db.add(db_report)
-        await db.commit()
-        await db.refresh(db_report)
-
-        # Send email in background if user has email reports enabled
-        background_tasks.add_task(
-            send_report_email,
-            current_user.email,
-            report_content,
-            report_data.title,
-            report_data.report_type
-        )
+        # The email is queued in the report's transaction; the outbox worker
+        # delivers it and marks the report sent
+        email = email_service.build_report_email(report_data.title, report_content, report_data.report_type)
+        await asyncio.to_thread(save_report_with_email, db, db_report, current_user.email, email)
+        email_outbox.wake()
 
         return db_report
 
@@ -200,7 +163,6 @@ async def delete_report(
 
 @router.post("/personal-social-analysis", response_model=ReportSchema)
 async def generate_personal_social_analysis(
-    background_tasks: BackgroundTasks,
     current_user = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -243,18 +205,14 @@ async def generate_personal_social_analysis(
             data_snapshot=analysis_result
         )
 
-        db.add(db_report)
-        await db.commit()
-        await db.refresh(db_report)
-
-        # Send email in background
-        background_tasks.add_task(
-            send_personal_report_email,
-            current_user.email,
+        # Queue the email for the outbox worker in the report's transaction
+        email = email_service.build_personal_report_email(
             report_content,
             current_user.full_name or "User",
             len(active_profiles)
         )
+        await asyncio.to_thread(save_report_with_email, db, db_report, current_user.email, email)
+        email_outbox.wake()
 
         return db_report
 
@@ -281,52 +239,12 @@ async def schedule_daily_report(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to schedule reports: {str(e)}")
 
-# Background task for sending emails
-async def send_report_email(email: str, report_content: str, title: str, report_type: str):
-    """Send report via email"""
-    try:
-        subject = f"AI Social Intelligence - {title} ({report_type.title()} Report)"
-        await email_service.send_email(
-            to_email=email,
-            subject=subject,
-            content=report_content,
-            content_type="html"
-        )
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-        # In a production app, you'd want to log this and possibly retry
-
-async def send_personal_report_email(email: str, report_content: str, user_name: str, profiles_count: int):
-    """Send personal social analysis report via email"""
-    try:
-        subject = f"Your Personal Social Media Analysis Report - AI Social Intelligence"
-        html_content = f"""
-        <html>
-        <body>
-        <h2>Hello {user_name}!</h2>
-
-        <p>Your personal social media analysis report is ready. We've analyzed your presence across {profiles_count} social media platforms.</p>
-
-        <div style="background-color: #f5f5f5; padding: 20px; margin: 20px 0; border-radius: 5px;">
-        <pre style="white-space: pre-wrap; font-family: monospace; font-size: 14px;">{report_content}</pre>
-        </div>
-
-        <p>This analysis helps you understand your social media presence and provides personalized recommendations for growth.</p>
-
-        <p>Keep building your online presence!</p>
-
-        <br>
-        <p>Best regards,<br>AI Social Intelligence Team</p>
-        </body>
-        </html>
-        """
-
-        await email_service.send_email(
-            to_email=email,
-            subject=subject,
-            content=html_content,
-            content_type="html"
-        )
-    except Exception as e:
-        print(f"Failed to send personal report email: {e}")
-        # In a production app, you'd want to log this and possibly retry
\ No newline at end of file
+# Emails go through the persistent outbox, so SMTP failures are retried, not lost
+def save_report_with_email(db, report: Report, to_email: str, email: RenderedEmail) -> Report:
+    """Insert a report and its outbox email in one transaction (blocking)"""
+    db.add(report)
+    db.flush()
+    enqueue_emails([outbox_row(to_email, email.subject, email.html, "html", report.id, email.text)], db)
+    db.commit()
+    db.refresh(report)
+    return report
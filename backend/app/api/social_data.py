@@ -1,36 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc, func
 from typing import List, Optional
 from datetime import datetime, timedelta
 
 from app.core.database import get_db
-from app.services.auth import verify_token, get_user_by_email
+from app.api.auth import get_current_user
 from app.services.ai_analytics import AIAnalyticsService
 from app.services.social_collector import SocialDataCollector
+from app.services.response_cache import cached_endpoint
+from app.services.post_stats import post_stats
 from app.models.social_data import SocialPost, AnalyticsData
 from app.schemas.social_data import SocialPost as SocialPostSchema, SocialPostCreate
 
 router = APIRouter()
-security = HTTPBearer()
 ai_service = AIAnalyticsService()
 social_collector = SocialDataCollector()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-):
-    email = verify_token(credentials.credentials)
-    if email is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = await get_user_by_email(db, email)
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-
-    return user
-
 @router.get("/posts", response_model=List[SocialPostSchema])
 async def get_social_posts(
     platform: Optional[str] = None,
@@ -131,7 +117,9 @@ async def collect_social_data(
         raise HTTPException(status_code=500, detail=f"Data collection failed: {str(e)}")
 
 @router.get("/stats", response_model=dict)
+@cached_endpoint("social_data.stats")
 async def get_social_data_stats(
+    request: Request,
     days: int = Query(30, description="Number of days to analyze"),
     current_user = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -141,64 +129,14 @@ async def get_social_data_stats(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
 
-        # Get post counts by platform
-        platform_stats_result = await db.execute(
-            select(
-                SocialPost.platform,
-                func.count(SocialPost.id).label('count'),
-                func.avg(SocialPost.likes + SocialPost.shares + SocialPost.comments).label('avg_engagement')
-            ).where(
-                and_(
-                    SocialPost.user_id == current_user.id,
-                    SocialPost.posted_at >= start_date,
-                    SocialPost.posted_at <= end_date
-                )
-            ).group_by(SocialPost.platform)
-        )
-
-        platform_stats = {}
-        for row in platform_stats_result:
-            platform_stats[row.platform] = {
-                'count': row.count,
-                'avg_engagement': float(row.avg_engagement or 0)
-            }
-
-        # Get sentiment distribution
-        sentiment_stats_result = await db.execute(
-            select(
-                SocialPost.sentiment,
-                func.count(SocialPost.id).label('count')
-            ).where(
-                and_(
-                    SocialPost.user_id == current_user.id,
-                    SocialPost.posted_at >= start_date,
-                    SocialPost.posted_at <= end_date,
-                    SocialPost.sentiment.isnot(None)
-                )
-            ).group_by(SocialPost.sentiment)
-        )
-
-        sentiment_stats = {}
-        for row in sentiment_stats_result:
-            sentiment_stats[row.sentiment] = row.count
-
-        # Get total counts
-        total_result = await db.execute(
-            select(func.count(SocialPost.id)).where(
-                and_(
-                    SocialPost.user_id == current_user.id,
-                    SocialPost.posted_at >= start_date,
-                    SocialPost.posted_at <= end_date
-                )
-            )
-        )
-        total_posts = total_result.scalar()
+        # Platform, sentiment and total figures from one grouped scan
+        stats = post_stats(db, current_user.id, start_date, end_date)
 
         return {
             'period': f"{days} days",
-            'total_posts': total_posts,
-            'platform_stats': platform_stats,
-            'sentiment_stats': sentiment_stats,
+            'total_posts': stats['total_posts'],
+            'platform_stats': stats['platform_stats'],
+            'sentiment_stats': stats['sentiment_stats'],
             'data_freshness': 'current'
         }
 
@@ -1,29 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from sqlalchemy import update
 
 from app.core.database import get_db
-from app.services.auth import verify_token, get_user_by_email
+from app.services.auth import get_user_by_email, auth_cache
+from app.api.auth import get_current_user
 from app.schemas.user import User, UserUpdate, SocialProfiles
 from app.models.user import User as UserModel
 
 router = APIRouter()
-security = HTTPBearer()
-
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    email = verify_token(credentials.credentials)
-    if email is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = get_user_by_email(db, email)
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-
-    return user
 
 @router.get("/profile", response_model=User)
 def get_user_profile(current_user = Depends(get_current_user)):
@@ -55,6 +40,7 @@ def update_user_profile(
                 .values(**update_data)
             )
             db.commit()
+            auth_cache.invalidate_user(current_user.id)
 
             # Refresh the user data
             updated_user = get_user_by_email(db, current_user.email)
@@ -97,6 +83,7 @@ def update_social_profiles(
                 .values(**update_data)
             )
             db.commit()
+            auth_cache.invalidate_user(current_user.id)
 
             # Refresh the user data
             updated_user = get_user_by_email(db, current_user.email)
@@ -128,6 +115,7 @@ def clear_social_profiles(
             )
         )
         db.commit()
+        auth_cache.invalidate_user(current_user.id)
 
         return {"message": "Social profiles cleared successfully"}
 
@@ -9,6 +9,13 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_TTL: int = int(os.getenv("AUTH_CACHE_TTL", "60"))  # seconds a decoded token or user record is reused
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # hashes with another cost are upgraded on login
+    AUTH_WORKERS: int = int(os.getenv("AUTH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))  # threads hashing passwords
+    AUTH_MAX_PENDING: int = int(os.getenv("AUTH_MAX_PENDING", "64"))  # queued password operations before 503
+    LOGIN_RATE_PER_MINUTE: int = int(os.getenv("LOGIN_RATE_PER_MINUTE", "10"))  # login/register attempts per client IP
+    LOGIN_RATE_BURST: int = int(os.getenv("LOGIN_RATE_BURST", "5"))
 
     # Database - Use SQLite for development, PostgreSQL for production
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./ai_social_dev.db")
@@ -24,12 +31,27 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
+    AI_PREWARM_MODELS: str = os.getenv("AI_PREWARM_MODELS", "")  # comma-separated vader,sentiment,summarizer or all; loaded after startup
 
     # Email Settings
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
     SMTP_USERNAME: str = os.getenv("SMTP_USERNAME", "")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", "5"))  # concurrent SMTP sessions
+    SMTP_MESSAGES_PER_CONNECTION: int = int(os.getenv("SMTP_MESSAGES_PER_CONNECTION", "100"))
+    SMTP_IDLE_TIMEOUT: int = int(os.getenv("SMTP_IDLE_TIMEOUT", "60"))  # seconds before an idle session is dropped
+    SMTP_TIMEOUT: int = int(os.getenv("SMTP_TIMEOUT", "30"))  # seconds
+    SMTP_MAX_RETRIES: int = int(os.getenv("SMTP_MAX_RETRIES", "3"))
+    EMAIL_TEMPLATE_DIR: str = os.getenv("EMAIL_TEMPLATE_DIR", "")  # empty = bundled app/templates/email
+    EMAIL_DEFAULT_LOCALE: str = os.getenv("EMAIL_DEFAULT_LOCALE", "en")
+    EMAIL_TEMPLATE_CACHE_SIZE: int = int(os.getenv("EMAIL_TEMPLATE_CACHE_SIZE", "1024"))  # cached static renders
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "100"))
+    EMAIL_OUTBOX_POLL_INTERVAL: int = int(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "5"))  # seconds
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))  # then dead-lettered
+    EMAIL_OUTBOX_BACKOFF: int = int(os.getenv("EMAIL_OUTBOX_BACKOFF", "30"))  # seconds, doubled per attempt
+    EMAIL_OUTBOX_BACKOFF_MAX: int = int(os.getenv("EMAIL_OUTBOX_BACKOFF_MAX", "3600"))  # seconds
+    EMAIL_OUTBOX_LEASE: int = int(os.getenv("EMAIL_OUTBOX_LEASE", "600"))  # seconds a claimed email is held
 
     # Social Media APIs
     TWITTER_BEARER_TOKEN: str = os.getenv("TWITTER_BEARER_TOKEN", "")
@@ -39,6 +61,69 @@ class Settings(BaseSettings):
     # Redis/Celery
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
 
+    # Per-user cache of analytics responses: memory, redis or off
+    RESPONSE_CACHE_BACKEND: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+    RESPONSE_CACHE_MAX_AGE: int = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "300"))  # seconds; bounds rolling-window drift
+
+    # Realtime fan-out backend across workers: memory, redis or postgres
+    REALTIME_BROKER: str = os.getenv("REALTIME_BROKER", "memory")
+    REALTIME_SEND_QUEUE_SIZE: int = int(os.getenv("REALTIME_SEND_QUEUE_SIZE", "100"))
+    REALTIME_STATS_INTERVAL: int = int(os.getenv("REALTIME_STATS_INTERVAL", "30"))  # seconds
+    REALTIME_BATCH_WINDOW_MS: int = int(os.getenv("REALTIME_BATCH_WINDOW_MS", "500"))
+    REALTIME_BATCH_MAX_POSTS: int = int(os.getenv("REALTIME_BATCH_MAX_POSTS", "50"))
+    REALTIME_SLOW_CONSUMER_POLICY: str = os.getenv("REALTIME_SLOW_CONSUMER_POLICY", "drop_oldest")  # drop_oldest, disconnect
+    # Only read by `python -m app.main`; under the uvicorn CLI pass --ws-per-message-deflate instead
+    REALTIME_WS_DEFLATE: bool = os.getenv("REALTIME_WS_DEFLATE", "True").lower() == "true"
+    REALTIME_REPLAY_BUFFER_SIZE: int = int(os.getenv("REALTIME_REPLAY_BUFFER_SIZE", "200"))  # events per user
+    REALTIME_REPLAY_MAX_EVENTS: int = int(os.getenv("REALTIME_REPLAY_MAX_EVENTS", "1000"))  # larger gaps resync
+    REALTIME_EVENT_LOG_SPILL: bool = os.getenv("REALTIME_EVENT_LOG_SPILL", "False").lower() == "true"
+    REALTIME_EVENT_LOG_RETENTION_HOURS: int = int(os.getenv("REALTIME_EVENT_LOG_RETENTION_HOURS", "24"))
+
+    # Dataset import
+    DATASET_CHUNK_SIZE: int = int(os.getenv("DATASET_CHUNK_SIZE", "50000"))
+    DATASET_INSERT_BATCH_SIZE: int = int(os.getenv("DATASET_INSERT_BATCH_SIZE", "1000"))
+    DATASET_PARALLEL_INGEST: bool = os.getenv("DATASET_PARALLEL_INGEST", "False").lower() == "true"
+    DATASET_INGEST_WORKERS: int = int(os.getenv("DATASET_INGEST_WORKERS", "0"))  # 0 = one per CPU core
+    DATASET_SHARD_BYTES: int = int(os.getenv("DATASET_SHARD_BYTES", str(16 * 1024 * 1024)))  # per parallel-ingest shard
+    DATASET_WRITER_QUEUE_SIZE: int = int(os.getenv("DATASET_WRITER_QUEUE_SIZE", "8"))
+    DATASET_CACHE_ENABLED: bool = os.getenv("DATASET_CACHE_ENABLED", "True").lower() == "true"
+    DATASET_CACHE_DIR: str = os.getenv("DATASET_CACHE_DIR", "data/cache")
+
+    # Kaggle API
+    KAGGLE_CACHE_TTL: int = int(os.getenv("KAGGLE_CACHE_TTL", "600"))  # seconds
+    KAGGLE_CREDENTIALS_TTL: int = int(os.getenv("KAGGLE_CREDENTIALS_TTL", "300"))  # seconds
+
+    # Streaming alerts
+    ALERT_EWMA_ALPHA: float = float(os.getenv("ALERT_EWMA_ALPHA", "0.1"))
+    ALERT_MIN_POSTS: int = int(os.getenv("ALERT_MIN_POSTS", "10"))  # before sentiment alerts fire
+    ALERT_WINDOW: int = int(os.getenv("ALERT_WINDOW", "3600"))  # seconds of engagement/keyword history
+    ALERT_COOLDOWN: int = int(os.getenv("ALERT_COOLDOWN", "3600"))  # seconds between repeats of one alert
+    ALERT_SETTINGS_TTL: int = int(os.getenv("ALERT_SETTINGS_TTL", "300"))  # seconds
+
+    # Anomaly detection
+    ANOMALY_BUCKET_SECONDS: int = int(os.getenv("ANOMALY_BUCKET_SECONDS", "900"))
+    ANOMALY_EWMA_ALPHA: float = float(os.getenv("ANOMALY_EWMA_ALPHA", "0.05"))
+    ANOMALY_Z_THRESHOLD: float = float(os.getenv("ANOMALY_Z_THRESHOLD", "4.0"))
+    ANOMALY_WARMUP_BUCKETS: int = int(os.getenv("ANOMALY_WARMUP_BUCKETS", "12"))
+    ANOMALY_MAX_SERIES: int = int(os.getenv("ANOMALY_MAX_SERIES", "100000"))
+    ANOMALY_CHECKPOINT_PATH: str = os.getenv("ANOMALY_CHECKPOINT_PATH", "data/anomaly_state.npz")
+    ANOMALY_CHECKPOINT_INTERVAL: int = int(os.getenv("ANOMALY_CHECKPOINT_INTERVAL", "300"))  # seconds
+
+    # Trending keywords
+    TRENDING_SKETCH_SIZE: int = int(os.getenv("TRENDING_SKETCH_SIZE", "100"))  # terms per sketch pane
+    TRENDING_MAX_USERS: int = int(os.getenv("TRENDING_MAX_USERS", "5000"))
+    TRENDING_MIN_COUNT: int = int(os.getenv("TRENDING_MIN_COUNT", "3"))
+
+    # Background jobs (daily reports, collection, alert sweeps); enable on one worker only
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "True").lower() == "true"
+
+    # Scheduled reports
+    REPORT_BATCH_CHUNK_SIZE: int = int(os.getenv("REPORT_BATCH_CHUNK_SIZE", "500"))  # users per aggregation query
+    REPORT_RENDER_WORKERS: int = int(os.getenv("REPORT_RENDER_WORKERS", "0"))  # 0 = one per CPU core
+    REPORT_BATCH_TIME_BUDGET: int = int(os.getenv("REPORT_BATCH_TIME_BUDGET", "1800"))  # seconds
+    REPORT_INSERT_BATCH_SIZE: int = int(os.getenv("REPORT_INSERT_BATCH_SIZE", "1000"))  # Report rows per INSERT
+
     # App Settings
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
 
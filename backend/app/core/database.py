@@ -29,6 +29,22 @@ def get_db():
     finally:
         db.close()
 
+def dialect_insert(model):
+    """INSERT for the configured dialect, supporting ``ON CONFLICT`` clauses"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def insert_ignore(model, index_elements=None):
+    """Dialect-aware bulk INSERT that skips rows hitting a unique constraint.
+
+    ``index_elements`` names the columns of the constraint to check; by
+    default a conflict on any unique constraint skips the row.
+    """
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
 
@@ -3,10 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import uvicorn
 import os
+import asyncio
 from dotenv import load_dotenv
 
-from app.api import auth, analytics, reports, social_data, users
+from app.api import auth, analytics, reports, social_data, users, realtime
 from app.core.config import settings
+from app.services.email_outbox import email_outbox
+from app.services.response_cache import response_cache
+from app.services.ai_analytics import prewarm_models
+from app.services.scheduler import start_scheduler, stop_scheduler
 
 # Load environment variables
 load_dotenv()
@@ -36,7 +41,24 @@ app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"]
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 app.include_router(social_data.router, prefix="/api/social-data", tags=["Social Data"])
 # app.include_router(datasets.router, prefix="/api/datasets", tags=["Datasets"])  # Temporarily disabled
-# app.include_router(realtime.router, prefix="/api/realtime", tags=["Real-time"])  # Temporarily disabled
+app.include_router(realtime.router, prefix="/api/realtime", tags=["Real-time"])
+
+@app.on_event("startup")
+async def start_background_workers():
+    email_outbox.start()
+    # Ingestion threads hand response cache bumps to this loop
+    response_cache.start()
+    # Scheduled jobs run as tasks on this loop
+    if settings.SCHEDULER_ENABLED:
+        start_scheduler()
+    # Loads in a background thread; requests are served meanwhile
+    if settings.AI_PREWARM_MODELS:
+        prewarm_models([name.strip() for name in settings.AI_PREWARM_MODELS.split(",") if name.strip()])
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await asyncio.to_thread(stop_scheduler)
+    await email_outbox.stop()
 
 @app.get("/")
 async def root():
@@ -57,5 +79,8 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         reload=True,
-        log_level="info"
+        log_level="info",
+        # Negotiate permessage-deflate compression with WebSocket clients that offer it;
+        # the uvicorn CLI takes --ws-per-message-deflate instead
+        ws_per_message_deflate=settings.REALTIME_WS_DEFLATE
     )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, JSON, Boolean, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -6,10 +6,12 @@ from app.models.user import User
 
 class SocialPost(Base):
     __tablename__ = "social_posts"
+    # Source post ids are only unique per platform, and each tenant keeps its own copy
+    __table_args__ = (UniqueConstraint("user_id", "platform", "post_id", name="uq_social_posts_user_platform_post"),)
 
     id = Column(Integer, primary_key=True, index=True)
     platform = Column(String, nullable=False)  # twitter, linkedin, facebook, instagram
-    post_id = Column(String, unique=True, nullable=False)
+    post_id = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     author = Column(String)
     author_id = Column(String)
@@ -100,4 +102,42 @@ class NotificationSettings(Base):
 
     # Schedule
     report_frequency = Column(String, default="daily")  # daily, weekly, monthly
-    timezone = Column(String, default="UTC")
\ No newline at end of file
+    timezone = Column(String, default="UTC")
+
+class RealtimeEvent(Base):
+    __tablename__ = "realtime_events"
+    __table_args__ = (UniqueConstraint("user_id", "seq"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    seq = Column(Integer, nullable=False)  # Per-user, monotonically increasing
+    event_type = Column(String, nullable=False)  # new_post, new_posts_batch, sentiment_alert
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RealtimeEventSequence(Base):
+    __tablename__ = "realtime_event_sequences"
+
+    # Last seq handed out for the user, shared by every worker
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    seq = Column(Integer, nullable=False)
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (Index("ix_email_outbox_due", "status", "next_attempt_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id"))  # Report to mark sent/failed, if any
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    content_type = Column(String, default="html")
+    text_content = Column(Text)  # Plain-text alternative of an HTML email
+
+    # Delivery
+    status = Column(String, default="pending")  # pending, sent, dead
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
@@ -1,80 +1,118 @@
-import os
-from typing import List, Dict, Any, Optional
 import re
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import threading
+import importlib.util
+from typing import List, Dict, Any, Optional
 
 from app.core.config import settings
 
-# Try to import NLTK components, fall back gracefully
-try:
+# NLTK, transformers and torch are imported on first use, not here: most
+# routers import this module, and loading them took most of the boot time
+HAS_NLTK = importlib.util.find_spec("nltk") is not None
+
+# NLTK data is looked up locally only - on NLTK_DATA or NLTK's default
+# paths - and never downloaded at runtime. Install it at image build time:
+#   python -m nltk.downloader -d /usr/local/share/nltk_data vader_lexicon
+NLTK_RESOURCES = {"vader_lexicon": "sentiment/vader_lexicon.zip"}
+
+STOP_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her'
+])
+
+def _load_vader():
+    if not HAS_NLTK:
+        raise ImportError("nltk is not installed")
     import nltk
     from nltk.sentiment.vader import SentimentIntensityAnalyzer
-    HAS_NLTK = True
-    try:
-        # Disable SSL verification for NLTK downloads (common in corporate environments)
-        import ssl
-        try:
-            _create_unverified_https_context = ssl._create_unverified_context
-        except AttributeError:
-            pass
-        else:
-            ssl._create_default_https_context = _create_unverified_https_context
 
-        nltk.download('vader_lexicon', quiet=True)
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
-    except Exception as e:
-        print(f"Warning: NLTK download failed: {e}. Sentiment analysis will use fallback methods.")
-        pass
-except ImportError:
-    HAS_NLTK = False
+    try:
+        nltk.data.find(NLTK_RESOURCES["vader_lexicon"])
+    except LookupError:
+        raise LookupError(
+            "NLTK vader_lexicon not found; install it with "
+            "'python -m nltk.downloader vader_lexicon' or point NLTK_DATA at vendored data"
+        )
+    return SentimentIntensityAnalyzer()
+
+def _load_sentiment_pipeline():
+    from transformers import pipeline
+
+    return pipeline(
+        "sentiment-analysis",
+        model="cardiffnlp/twitter-roberta-base-sentiment-latest",
+        tokenizer="cardiffnlp/twitter-roberta-base-sentiment-latest",
+        top_k=None  # Updated parameter
+    )
+
+def _load_summarizer():
+    from transformers import pipeline
+
+    return pipeline(
+        "summarization",
+        model="facebook/bart-large-cnn",
+        tokenizer="facebook/bart-large-cnn"
+    )
+
+MODEL_LOADERS = {
+    "vader": _load_vader,
+    "sentiment": _load_sentiment_pipeline,
+    "summarizer": _load_summarizer,
+}
+
+# Models are shared by every AIAnalyticsService in the process; False marks
+# a model that failed to load, so it is not retried on every call
+_models: Dict[str, Any] = {}
+_model_locks = {name: threading.Lock() for name in MODEL_LOADERS}
+
+def get_model(name: str) -> Optional[Any]:
+    """Shared model, loaded on first use; None if it is unavailable"""
+    model = _models.get(name)
+    if model is None:
+        with _model_locks[name]:
+            model = _models.get(name)
+            if model is None:
+                try:
+                    model = MODEL_LOADERS[name]()
+                except Exception as e:
+                    print(f"Warning: Could not load {name} model: {e}")
+                    model = False  # Mark as tried and failed
+                _models[name] = model
+    return model or None
+
+def prewarm_models(names: List[str]) -> threading.Thread:
+    """Load models in a background thread, so the first requests do not wait for them.
+
+    ``names`` are MODEL_LOADERS keys, or ``all``.
+    """
+    if "all" in names:
+        names = list(MODEL_LOADERS)
+    for name in names:
+        if name not in MODEL_LOADERS:
+            print(f"Warning: Unknown model '{name}' in AI_PREWARM_MODELS")
+    thread = threading.Thread(
+        target=lambda: [get_model(name) for name in names if name in MODEL_LOADERS],
+        name="model-prewarm",
+        daemon=True
+    )
+    thread.start()
+    return thread
 
 class AIAnalyticsService:
-    def __init__(self):
-        # Lazy loading - models will be loaded when first needed
-        self._sentiment_analyzer = None
-        self._sentiment_pipeline = None
-        self._summarizer = None
+    # Models load lazily through get_model and are shared between instances
 
     @property
     def sentiment_analyzer(self):
-        if self._sentiment_analyzer is None and HAS_NLTK:
-            try:
-                self._sentiment_analyzer = SentimentIntensityAnalyzer()
-            except Exception as e:
-                print(f"Warning: Could not load NLTK sentiment analyzer: {e}")
-                self._sentiment_analyzer = False  # Mark as tried and failed
-        return self._sentiment_analyzer if self._sentiment_analyzer else None
+        return get_model("vader")
 
     @property
     def sentiment_pipeline(self):
-        if self._sentiment_pipeline is None:
-            try:
-                self._sentiment_pipeline = pipeline(
-                    "sentiment-analysis",
-                    model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                    tokenizer="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                    top_k=None  # Updated parameter
-                )
-            except Exception as e:
-                print(f"Warning: Could not load transformer sentiment model: {e}")
-                self._sentiment_pipeline = False  # Mark as tried and failed
-        return self._sentiment_pipeline if self._sentiment_pipeline else None
+        return get_model("sentiment")
 
     @property
     def summarizer(self):
-        if self._summarizer is None:
-            try:
-                self._summarizer = pipeline(
-                    "summarization",
-                    model="facebook/bart-large-cnn",
-                    tokenizer="facebook/bart-large-cnn"
-                )
-            except Exception as e:
-                print(f"Warning: Could not load summarization model: {e}")
-                self._summarizer = False  # Mark as tried and failed
-        return self._summarizer if self._summarizer else None
+        return get_model("summarizer")
 
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of text using available methods"""
@@ -153,14 +191,7 @@ class AIAnalyticsService:
         """Extract key topics/themes from text"""
         # Simple word frequency analysis
         words = re.findall(r'\b\w+\b', text.lower())
-        stop_words = set([
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-            'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
-            'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her'
-        ])
-
-        filtered_words = [word for word in words if len(word) > 3 and word.isalnum() and word not in stop_words]
+        filtered_words = [word for word in words if len(word) > 3 and word.isalnum() and word not in STOP_WORDS]
 
         # Count word frequency
         word_freq = {}
@@ -196,7 +227,11 @@ class AIAnalyticsService:
         summary = '. '.join([s.strip() for s in summary_sentences if s.strip()])
         return summary + ('.' if summary and not summary.endswith('.') else '')
 
-    def generate_insights(self, posts_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def generate_insights(
+        self,
+        posts_data: List[Dict[str, Any]],
+        trending_keywords: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """Generate comprehensive insights from social media posts"""
         if not posts_data:
             return {"error": "No data provided"}
@@ -244,8 +279,9 @@ class AIAnalyticsService:
             'total_engagement': engagement_total,
             'avg_engagement_per_post': engagement_total / len(posts_data) if posts_data else 0,
             'top_topics': top_topics,
+            'trending_keywords': trending_keywords or [],
             'sentiment_trend': self._calculate_sentiment_trend(sentiments),
-            'recommendations': self._generate_recommendations(sentiment_counts, platforms, top_topics)
+            'recommendations': self._generate_recommendations(sentiment_counts, platforms, top_topics, trending_keywords)
         }
 
         return insights
@@ -267,7 +303,8 @@ class AIAnalyticsService:
 
     def _generate_recommendations(self, sentiment_counts: Dict[str, int],
                                 platforms: Dict[str, int],
-                                top_topics: List[tuple]) -> List[str]:
+                                top_topics: List[tuple],
+                                trending_keywords: Optional[List[Dict[str, Any]]] = None) -> List[str]:
         """Generate AI-powered recommendations"""
         recommendations = []
 
@@ -286,10 +323,13 @@ class AIAnalyticsService:
             top_platform = max(platforms.items(), key=lambda x: x[1])[0]
             recommendations.append(f"Focus content strategy on {top_platform} for maximum reach")
 
-            # Topic recommendations
-            if top_topics:
+            # Topic recommendations - prefer terms that are actually accelerating
+            if trending_keywords:
+                top_trend = trending_keywords[0]['keyword']
+                recommendations.append(f"Create more content around '{top_trend}' as it's trending")
+            elif top_topics:
                 top_topic = top_topics[0][0]
-                recommendations.append(f"Create more content around '{top_topic}' as it's trending")
+                recommendations.append(f"Create more content around '{top_topic}', your most discussed topic")
 
         return recommendations
 
@@ -313,6 +353,7 @@ This report provides insights from {insights.get('total_posts', 0)} social media
 
 ## Sentiment Analysis
 {self._format_sentiment_section(insights.get('sentiment_distribution', {}))}
+- Trend: {insights.get('sentiment_trend', 'insufficient_data').replace('_', ' ')}
 
 ## Platform Performance
 {self._format_platform_section(insights.get('platform_breakdown', {}))}
@@ -320,6 +361,9 @@ This report provides insights from {insights.get('total_posts', 0)} social media
 ## Top Topics
 {self._format_topics_section(insights.get('top_topics', []))}
 
+## Trending Keywords
+{self._format_trending_section(insights.get('trending_keywords', []))}
+
 ## Recommendations
 {chr(10).join(f"- {rec}" for rec in insights.get('recommendations', []))}
 
@@ -362,4 +406,15 @@ This report provides insights from {insights.get('total_posts', 0)} social media
         for topic, count in topics[:5]:  # Top 5 topics
             lines.append(f"- {topic}: {count} mentions")
 
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
+
+    def _format_trending_section(self, trending: List[Dict[str, Any]]) -> str:
+        """Format trending keywords for report"""
+        if not trending:
+            return "No trending keywords detected."
+
+        lines = []
+        for item in trending[:5]:
+            lines.append(f"- {item['keyword']}: {item.get('count', 0)} mentions (score {item.get('score', 0)})")
+
+        return "\n".join(lines)
@@ -0,0 +1,274 @@
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from app.services.email_service import EmailService
+from app.services.email_outbox import queue_rendered
+from app.api.realtime import notify_sentiment_alert
+
+logger = logging.getLogger(__name__)
+
+class SlidingWindowCounter:
+    """Sum of values over the last ``window`` seconds, kept in fixed time buckets"""
+
+    __slots__ = ("bucket_seconds", "values", "stamps")
+
+    def __init__(self, window: float, buckets: int = 60):
+        self.bucket_seconds = window / buckets
+        self.values = [0.0] * buckets
+        self.stamps = [-1] * buckets
+
+    def add(self, value: float, now: float):
+        stamp = int(now // self.bucket_seconds)
+        slot = stamp % len(self.values)
+        if self.stamps[slot] != stamp:
+            self.stamps[slot] = stamp
+            self.values[slot] = 0.0
+        self.values[slot] += value
+
+    def total(self, now: float) -> float:
+        current = int(now // self.bucket_seconds)
+        size = len(self.values)
+        return sum(value for value, stamp in zip(self.values, self.stamps) if current - stamp < size)
+
+class UserAlertState:
+    """Incremental aggregates of one user's post stream"""
+
+    def __init__(self, window: float):
+        self.posts = 0
+        # EWMA of the share of non-negative posts, compared to sentiment_threshold
+        self.sentiment_health: Optional[float] = None
+        # EWMA of the VADER compound score, reported alongside for context
+        self.sentiment_score: Optional[float] = None
+        self.engagement = SlidingWindowCounter(window)
+        self.keyword_hits: Dict[str, SlidingWindowCounter] = {}
+        self.window = window
+
+    def update(self, post: Dict[str, Any], keywords: List[str], alpha: float, now: float):
+        self.posts += 1
+
+        healthy = 0.0 if post.get("sentiment") == "negative" else 1.0
+        self.sentiment_health = healthy if self.sentiment_health is None else \
+            alpha * healthy + (1 - alpha) * self.sentiment_health
+
+        score = post.get("sentiment_score")
+        if score is not None:
+            self.sentiment_score = score if self.sentiment_score is None else \
+                alpha * score + (1 - alpha) * self.sentiment_score
+
+        self.engagement.add(post.get("engagement", 0), now)
+
+        content = (post.get("content") or "").lower()
+        for keyword in keywords:
+            if keyword in content:
+                counter = self.keyword_hits.get(keyword)
+                if counter is None:
+                    counter = self.keyword_hits[keyword] = SlidingWindowCounter(self.window)
+                counter.add(1, now)
+
+class AlertEngine:
+    """Evaluates alert thresholds incrementally as posts are ingested.
+
+    Each saved post updates its user's EWMA sentiment, sliding-window
+    engagement and keyword hit counts in O(1); thresholds from
+    NotificationSettings are checked once per ingested batch, so alerts go
+    out seconds after collection without rescanning the posts table. An
+    alert fires when its condition is first breached, re-arms only once the
+    condition clears, and never repeats within the cool-down.
+    """
+
+    def __init__(
+        self,
+        alpha: float,
+        min_posts: int,
+        window: float,
+        cooldown: float,
+        settings_ttl: float,
+        email_service: Optional[EmailService] = None
+    ):
+        self.alpha = alpha
+        self.min_posts = min_posts
+        self.window = window
+        self.cooldown = cooldown
+        self.settings_ttl = settings_ttl
+        self.email_service = email_service or EmailService()
+        self._states: Dict[int, UserAlertState] = {}
+        self._settings: Dict[int, tuple] = {}  # user_id -> (loaded_at, settings or None)
+        self._active: set = set()
+        self._last_fired: Dict[tuple, float] = {}
+
+    async def _user_settings(self, user_id: int) -> Optional[Dict[str, Any]]:
+        cached = self._settings.get(user_id)
+        if cached and time.monotonic() - cached[0] < self.settings_ttl:
+            return cached[1]
+
+        try:
+            user_settings = await asyncio.to_thread(load_alert_settings, user_id)
+        except Exception as e:
+            logger.error(f"Failed to load alert settings for user {user_id}: {e}")
+            user_settings = cached[1] if cached else None
+        self._settings[user_id] = (time.monotonic(), user_settings)
+        return user_settings
+
+    def invalidate_settings(self, user_id: int):
+        """Drop cached thresholds after a user changes their notification settings"""
+        self._settings.pop(user_id, None)
+
+    async def observe_post(self, user_id: int, post: Dict[str, Any]):
+        """Fold one ingested post into the user's aggregates"""
+        user_settings = await self._user_settings(user_id)
+        if not user_settings:
+            return
+
+        state = self._states.get(user_id)
+        if state is None:
+            state = self._states[user_id] = UserAlertState(self.window)
+        state.update(post, user_settings["keywords"], self.alpha, time.time())
+
+    async def evaluate(self, user_id: int):
+        """Check the user's aggregates against their thresholds and fire new alerts"""
+        state = self._states.get(user_id)
+        user_settings = await self._user_settings(user_id)
+        if state is None or not user_settings:
+            return
+
+        now = time.time()
+        threshold = user_settings["sentiment_threshold"]
+        if state.posts >= self.min_posts:
+            await self._check(
+                user_id, user_settings, ("sentiment_drop",),
+                state.sentiment_health < threshold,
+                {
+                    "alert_type": "sentiment_drop",
+                    "severity": "high" if state.sentiment_health < threshold / 2 else "medium",
+                    "message": f"Non-negative sentiment share fell to {state.sentiment_health:.0%} "
+                               f"(threshold {threshold:.0%})",
+                    "value": round(state.sentiment_health, 4),
+                    "sentiment_score": round(state.sentiment_score, 4) if state.sentiment_score is not None else None,
+                    "threshold": threshold
+                }
+            )
+
+        engagement = state.engagement.total(now)
+        engagement_threshold = user_settings["engagement_threshold"]
+        await self._check(
+            user_id, user_settings, ("engagement_spike",),
+            engagement >= engagement_threshold,
+            {
+                "alert_type": "engagement_spike",
+                "severity": "medium",
+                "message": f"Engagement reached {int(engagement)} in the last {int(self.window / 60)} minutes "
+                           f"(threshold {engagement_threshold})",
+                "value": int(engagement),
+                "threshold": engagement_threshold
+            }
+        )
+
+        for keyword, counter in state.keyword_hits.items():
+            hits = int(counter.total(now))
+            await self._check(
+                user_id, user_settings, ("keyword", keyword),
+                hits > 0,
+                {
+                    "alert_type": "keyword_mention",
+                    "severity": "low",
+                    "message": f"'{keyword}' was mentioned in {hits} posts in the last {int(self.window / 60)} minutes",
+                    "keyword": keyword,
+                    "value": hits
+                }
+            )
+
+    async def _check(self, user_id: int, user_settings: Dict[str, Any], kind: tuple, breached: bool, alert: Dict[str, Any]):
+        key = (user_id,) + kind
+        if not breached:
+            self._active.discard(key)
+            return
+        if key in self._active:
+            return
+
+        self._active.add(key)
+        if self._cooling_down(key):
+            return
+
+        try:
+            await notify_sentiment_alert(user_id, alert)
+        except Exception as e:
+            logger.error(f"Failed to send real-time alert to user {user_id}: {e}")
+
+        # Email delivery is slow; queue it in the outbox rather than wait on SMTP
+        email = self.email_service.build_alert_email(
+            alert_type=alert["alert_type"].replace("_", " ").title(),
+            alert_message=alert["message"],
+            severity=alert["severity"]
+        )
+        try:
+            await queue_rendered(user_settings["email"], email)
+        except Exception as e:
+            logger.error(f"Failed to queue alert email for user {user_id}: {e}")
+
+    def _cooling_down(self, key: tuple) -> bool:
+        """True if this alert fired within the cool-down; otherwise marks it fired"""
+        now = time.monotonic()
+        if now - self._last_fired.get(key, -self.cooldown) < self.cooldown:
+            return True
+        self._last_fired[key] = now
+        return False
+
+    async def report_anomaly(self, anomaly: Dict[str, Any]):
+        """Send a detected spike or drop to the user's realtime alert channel"""
+        user_id = anomaly["user_id"]
+        if not await self._user_settings(user_id):
+            return
+        if self._cooling_down((user_id, "anomaly", anomaly["series"], anomaly["name"], anomaly["metric"])):
+            return
+
+        subject = anomaly["name"] or "all posts"
+        try:
+            await notify_sentiment_alert(user_id, {
+                "alert_type": f"{anomaly['metric']}_{anomaly['direction']}",
+                "message": f"Unusual {anomaly['metric'].replace('_', ' ')} {anomaly['direction']} for "
+                           f"{anomaly['series']} '{subject}': {anomaly['value']:.4g} vs baseline {anomaly['baseline']:.4g}",
+                **{k: v for k, v in anomaly.items() if k != "user_id"}
+            })
+        except Exception as e:
+            logger.error(f"Failed to send anomaly alert to user {user_id}: {e}")
+
+def load_alert_settings(user_id: int) -> Optional[Dict[str, Any]]:
+    """Alert thresholds for a user, or None when real-time alerts are off"""
+    from app.core.database import SessionLocal
+    from app.models.user import User
+    from app.models.social_data import NotificationSettings
+
+    db = SessionLocal()
+    try:
+        row = db.query(
+            User.email,
+            NotificationSettings.sentiment_threshold,
+            NotificationSettings.engagement_threshold,
+            NotificationSettings.keywords
+        ).join(NotificationSettings, NotificationSettings.user_id == User.id).filter(
+            User.id == user_id,
+            User.is_active == True,
+            NotificationSettings.real_time_alerts == True
+        ).first()
+        if row is None:
+            return None
+
+        return {
+            "email": row.email,
+            "sentiment_threshold": row.sentiment_threshold if row.sentiment_threshold is not None else 0.7,
+            "engagement_threshold": row.engagement_threshold if row.engagement_threshold is not None else 1000,
+            "keywords": [keyword.lower() for keyword in (row.keywords or []) if keyword]
+        }
+    finally:
+        db.close()
+
+alert_engine = AlertEngine(
+    settings.ALERT_EWMA_ALPHA,
+    settings.ALERT_MIN_POSTS,
+    settings.ALERT_WINDOW,
+    settings.ALERT_COOLDOWN,
+    settings.ALERT_SETTINGS_TTL
+)
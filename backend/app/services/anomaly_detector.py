@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("volume", "negative_share", "engagement")
+# Floor on the baseline deviation per metric, so a perfectly flat history
+# doesn't turn the first small change into an infinite z-score
+MIN_STD = np.array([1.0, 0.05, 5.0])
+# Empty buckets replayed at most when the stream resumes after a long gap
+MAX_GAP_BUCKETS = 96
+MAX_TOPICS_PER_POST = 5
+
+SeriesKey = Tuple[int, str, str]  # (user_id, kind, name) - kind is all, platform or topic
+
+class AnomalyDetector:
+    """Incremental spike/drop detection over per-user time series.
+
+    Posts are counted into fixed time buckets per series - the user's whole
+    stream, each platform and each topic. When a bucket closes, every series
+    is scored at once against an exponentially weighted mean and variance of
+    its own history, and values more than ``threshold`` deviations away are
+    reported. State lives in flat numpy arrays indexed by series, so an event
+    costs a few array increments no matter how many series exist, and the
+    whole detector checkpoints to a single ``.npz`` file.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float,
+        alpha: float,
+        threshold: float,
+        warmup: int,
+        max_series: int,
+        checkpoint_path: Optional[str] = None
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.max_series = max_series
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+
+        self.bucket: Optional[int] = None
+        self._keys: List[SeriesKey] = []
+        self._index: Dict[SeriesKey, int] = {}
+        self._allocate(1024)
+        self._full_warned = False
+
+        if self.checkpoint_path and self.checkpoint_path.exists():
+            try:
+                self._load(self.checkpoint_path)
+            except Exception as e:
+                logger.error(f"Ignoring unreadable anomaly checkpoint {self.checkpoint_path}: {e}")
+
+    def _allocate(self, capacity: int):
+        self._mean = np.zeros((capacity, len(METRICS)))
+        self._var = np.zeros((capacity, len(METRICS)))
+        self._observations = np.zeros((capacity, len(METRICS)), dtype=np.int32)
+        # Accumulators of the open bucket: posts, negative posts, engagement
+        self._current = np.zeros((capacity, 3))
+
+    def _grow(self):
+        capacity = min(len(self._mean) * 2, self.max_series)
+        for name in ("_mean", "_var", "_observations", "_current"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _slot(self, key: SeriesKey) -> Optional[int]:
+        slot = self._index.get(key)
+        if slot is not None:
+            return slot
+
+        if len(self._keys) >= self.max_series:
+            if not self._full_warned:
+                logger.warning(f"Anomaly detector is tracking {self.max_series} series; ignoring new ones")
+                self._full_warned = True
+            return None
+        if len(self._keys) == len(self._mean):
+            self._grow()
+
+        slot = len(self._keys)
+        self._keys.append(key)
+        self._index[key] = slot
+        return slot
+
+    def observe(
+        self,
+        user_id: int,
+        platform: str,
+        topics: List[str],
+        sentiment: Optional[str],
+        engagement: int,
+        now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Count one post; returns anomalies from any bucket this closes"""
+        anomalies = self.advance(now)
+
+        keys = [(user_id, "all", ""), (user_id, "platform", platform or "unknown")]
+        keys.extend((user_id, "topic", topic) for topic in (topics or [])[:MAX_TOPICS_PER_POST])
+        negative = 1.0 if sentiment == "negative" else 0.0
+        for key in keys:
+            slot = self._slot(key)
+            if slot is not None:
+                self._current[slot] += (1.0, negative, engagement)
+
+        return anomalies
+
+    def advance(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Close every bucket that ended before ``now``"""
+        bucket = int((now if now is not None else time.time()) // self.bucket_seconds)
+        if self.bucket is None:
+            self.bucket = bucket
+            return []
+
+        anomalies = []
+        closing = min(bucket - self.bucket, MAX_GAP_BUCKETS)
+        for _ in range(max(closing, 0)):
+            anomalies.extend(self._close_bucket())
+        if bucket > self.bucket:
+            self.bucket = bucket
+        return anomalies
+
+    def _close_bucket(self) -> List[Dict[str, Any]]:
+        count = len(self._keys)
+        if count == 0:
+            return []
+
+        current = self._current[:count]
+        posts = current[:, 0]
+        values = np.column_stack([
+            posts,
+            np.divide(current[:, 1], posts, out=np.zeros(count), where=posts > 0),
+            current[:, 2]
+        ])
+        # Sentiment share is undefined for a bucket without posts
+        valid = np.ones_like(values, dtype=bool)
+        valid[:, 1] = posts > 0
+
+        mean = self._mean[:count]
+        var = self._var[:count]
+        observations = self._observations[:count]
+
+        deviation = values - mean
+        z = deviation / np.maximum(np.sqrt(var), MIN_STD)
+        flagged = valid & (observations >= self.warmup) & (np.abs(z) >= self.threshold)
+
+        # Welford-style EWMA update; the first observation seeds the mean
+        first = valid & (observations == 0)
+        step = self.alpha * deviation
+        mean[:] = np.where(first, values, np.where(valid, mean + step, mean))
+        var[:] = np.where(valid & ~first, (1 - self.alpha) * (var + deviation * step), var)
+        observations += valid
+
+        anomalies = []
+        bucket_start = datetime.fromtimestamp(self.bucket * self.bucket_seconds)
+        for slot, metric in zip(*np.nonzero(flagged)):
+            user_id, kind, name = self._keys[slot]
+            score = float(z[slot, metric])
+            anomalies.append({
+                "user_id": user_id,
+                "series": kind,
+                "name": name,
+                "metric": METRICS[metric],
+                "direction": "spike" if score > 0 else "drop",
+                "value": float(values[slot, metric]),
+                "baseline": float(values[slot, metric] - deviation[slot, metric]),
+                "z_score": round(score, 2),
+                "severity": "high" if abs(score) >= 2 * self.threshold else "medium",
+                "bucket_start": bucket_start.isoformat()
+            })
+
+        current[:] = 0
+        self.bucket += 1
+        return anomalies
+
+    def state(self) -> Dict[str, Any]:
+        """Copy of the detector state, cheap enough to take on the event loop"""
+        count = len(self._keys)
+        return {
+            "bucket": self.bucket if self.bucket is not None else -1,
+            "keys": json.dumps(self._keys),
+            "mean": self._mean[:count].copy(),
+            "var": self._var[:count].copy(),
+            "observations": self._observations[:count].copy(),
+            "current": self._current[:count].copy()
+        }
+
+    def write_checkpoint(self, state: Dict[str, Any]):
+        """Atomically write a state copy to the checkpoint file (blocking)"""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".tmp.npz")
+        np.savez_compressed(tmp_path, **state)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _load(self, path: Path):
+        with np.load(path) as data:
+            keys = [tuple(key) for key in json.loads(str(data["keys"]))]
+            self._allocate(max(len(keys), 1024))
+            count = len(keys)
+            self._mean[:count] = data["mean"]
+            self._var[:count] = data["var"]
+            self._observations[:count] = data["observations"]
+            self._current[:count] = data["current"]
+            bucket = int(data["bucket"])
+
+        self._keys = keys
+        self._index = {key: slot for slot, key in enumerate(keys)}
+        self.bucket = bucket if bucket >= 0 else None
+        logger.info(f"Restored anomaly detector state for {len(keys)} series from {path}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "series": len(self._keys),
+            "capacity": len(self._mean),
+            "bytes": sum(getattr(self, name).nbytes for name in ("_mean", "_var", "_observations", "_current"))
+        }
+
+anomaly_detector = AnomalyDetector(
+    settings.ANOMALY_BUCKET_SECONDS,
+    settings.ANOMALY_EWMA_ALPHA,
+    settings.ANOMALY_Z_THRESHOLD,
+    settings.ANOMALY_WARMUP_BUCKETS,
+    settings.ANOMALY_MAX_SERIES,
+    settings.ANOMALY_CHECKPOINT_PATH
+)
+_last_checkpoint = time.monotonic()
+
+async def process_anomalies(anomalies: List[Dict[str, Any]]):
+    """Route detected anomalies to realtime alerts and trending keywords,
+    and checkpoint the detector when due"""
+    global _last_checkpoint
+    from app.services.alert_engine import alert_engine
+    from app.services.trending import save_trending_keywords
+
+    spikes_by_user: Dict[int, List[Dict[str, Any]]] = {}
+    for anomaly in anomalies:
+        await alert_engine.report_anomaly(anomaly)
+        if anomaly["series"] == "topic" and anomaly["metric"] == "volume" and anomaly["direction"] == "spike":
+            spikes_by_user.setdefault(anomaly["user_id"], []).append(anomaly)
+
+    for user_id, spikes in spikes_by_user.items():
+        items = [
+            {
+                "keyword": spike["name"],
+                "score": spike["z_score"],
+                "count": int(spike["value"]),
+                "baseline_count": round(spike["baseline"], 2),
+                "detected_at": spike["bucket_start"]
+            }
+            for spike in spikes
+        ]
+        try:
+            await asyncio.to_thread(save_trending_keywords, user_id, items, "anomaly")
+        except Exception as e:
+            logger.error(f"Failed to save trending keywords for user {user_id}: {e}")
+
+    if anomaly_detector.checkpoint_path and time.monotonic() - _last_checkpoint >= settings.ANOMALY_CHECKPOINT_INTERVAL:
+        _last_checkpoint = time.monotonic()
+        try:
+            await asyncio.to_thread(anomaly_detector.write_checkpoint, anomaly_detector.state())
+        except Exception as e:
+            logger.error(f"Failed to checkpoint anomaly detector: {e}")
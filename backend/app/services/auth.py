@@ -1,5 +1,11 @@
+import time
+import asyncio
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 import bcrypt
 import jwt
 from sqlalchemy.orm import Session
@@ -10,11 +16,107 @@ from app.models.user import User
 from app.schemas.user import UserCreate
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(settings.BCRYPT_ROUNDS)).decode('utf-8')
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash was made with other bcrypt parameters than the configured ones"""
+    try:
+        _, prefix, rounds, _ = hashed_password.split('$', 3)
+        return prefix != '2b' or int(rounds) != settings.BCRYPT_ROUNDS
+    except ValueError:
+        return True
+
+@functools.lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    return hash_password("not-a-password")
+
+def _check_password(plain_password: str, hashed_password: Optional[str]) -> bool:
+    # Unknown users are checked against a dummy hash, so response time does
+    # not reveal which emails are registered
+    if hashed_password is None:
+        verify_password(plain_password, _dummy_hash())
+        return False
+    return verify_password(plain_password, hashed_password)
+
+class PasswordWorkersBusy(Exception):
+    """Raised when too many password operations are already waiting"""
+
+class PasswordWorkers:
+    """Bounded pool running bcrypt off the event loop and the request threads.
+
+    bcrypt releases the GIL, so ``workers`` threads hash in parallel while
+    requests keep being served. Up to ``max_pending`` more operations wait
+    for a worker; beyond that callers get PasswordWorkersBusy rather than
+    queueing behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.stats = {"hashed": 0, "verified": 0, "rejected": 0}
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_pending:
+                self.stats["rejected"] += 1
+                raise PasswordWorkersBusy()
+            self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(hash_password, password)
+        self.stats["hashed"] += 1
+        return hashed
+
+    async def verify(self, password: str, hashed_password: Optional[str]) -> bool:
+        """Check a password; ``None`` stands for an unknown user and never matches"""
+        valid = await self._run(_check_password, password, hashed_password)
+        self.stats["verified"] += 1
+        return valid
+
+class LoginThrottle:
+    """Per-client token bucket for login and registration attempts.
+
+    Each client may make ``burst`` attempts at once, refilled at
+    ``per_minute``. It is checked before any bcrypt work, so a flood from
+    one address costs a dict lookup per request. Clients are keyed by the
+    connecting IP; behind a proxy, run the server with forwarded-IP support
+    so that is the real client.
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_clients: int = 100000):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client: str) -> float:
+        """Take an attempt for client; returns 0, or seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate if self.rate > 0 else 60.0
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -36,19 +138,35 @@ def verify_token(token: str) -> Optional[str]:
     except jwt.PyJWTError:
         return None
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    result = db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+def _load_password_hash(db: Session, email: str) -> Tuple[Optional[User], Optional[str]]:
+    user = get_user_by_email(db, email)
+    hashed_password = user.hashed_password if user else None
+    # Return the connection to the pool while bcrypt runs; nothing was written
+    db.rollback()
+    return user, hashed_password
 
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
-        return None
-
-    # Update last login
+def _record_login(db: Session, user: User, new_hash: Optional[str]) -> None:
+    if new_hash:
+        user.hashed_password = new_hash
     user.last_login = datetime.utcnow()
     db.add(user)
     db.commit()
+    # Reload here, so callers on the event loop never touch expired attributes
+    db.refresh(user)
+
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    # Queries run in threads; only bcrypt is awaited on the loop, in the password workers
+    user, hashed_password = await asyncio.to_thread(_load_password_hash, db, email)
+
+    if not await password_workers.verify(password, hashed_password):
+        return None
+
+    # Upgrade hashes made with an older cost while the password is at hand
+    new_hash = await password_workers.hash(password) if needs_rehash(hashed_password) else None
+
+    # Update last login
+    await asyncio.to_thread(_record_login, db, user, new_hash)
+    auth_cache.invalidate_user(user.id)
 
     return user
 
@@ -56,8 +174,7 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     result = db.execute(select(User).where(User.email == email))
     return result.scalar_one_or_none()
 
-def create_user(db: Session, user: UserCreate) -> User:
-    hashed_password = hash_password(user.password)
+def _insert_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -68,4 +185,92 @@ def create_user(db: Session, user: UserCreate) -> User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    return db_user
+
+async def create_user(db: Session, user: UserCreate) -> User:
+    # Return the connection to the pool while bcrypt runs; nothing was written
+    await asyncio.to_thread(db.rollback)
+    hashed_password = await password_workers.hash(user.password)
+    return await asyncio.to_thread(_insert_user, db, user, hashed_password)
+
+class AuthCache:
+    """Short-lived cache of decoded tokens and current-user records.
+
+    A token is decoded once and its subject reused until the token expires
+    or ``ttl`` passes, whichever is first. User records are cached by id as
+    detached copies, so they can be shared across requests and threads.
+    Writers to a user row call ``invalidate_user``; ``ttl`` bounds how long
+    changes made elsewhere - another worker, a manual UPDATE - take to show.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._tokens: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._users: "OrderedDict[int, Tuple[User, float]]" = OrderedDict()
+        self._user_ids = {}  # email -> user id
+        self._lock = threading.Lock()
+        self.stats = {"token_hits": 0, "token_misses": 0, "user_hits": 0, "user_misses": 0}
+
+    def verify_token(self, token: str) -> Optional[str]:
+        """Subject of a valid token, decoding it only on a cache miss"""
+        now = time.time()
+        with self._lock:
+            cached = self._tokens.get(token)
+            if cached is not None and cached[1] > now:
+                self.stats["token_hits"] += 1
+                return cached[0]
+
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        except jwt.PyJWTError:
+            return None
+        email = payload.get("sub")
+        if email is None:
+            return None
+
+        expires = min(now + self.ttl, payload.get("exp", now + self.ttl))
+        with self._lock:
+            self.stats["token_misses"] += 1
+            self._tokens[token] = (email, expires)
+            self._tokens.move_to_end(token)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+        return email
+
+    def get_user(self, db: Session, email: str) -> Optional[User]:
+        """User record for a token subject, read from the database on a cache miss"""
+        now = time.time()
+        with self._lock:
+            user_id = self._user_ids.get(email)
+            cached = self._users.get(user_id) if user_id is not None else None
+            if cached is not None and cached[1] > now:
+                self._users.move_to_end(user_id)
+                self.stats["user_hits"] += 1
+                return cached[0]
+
+        user = get_user_by_email(db, email)
+        if user is None:
+            return None
+
+        snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+        with self._lock:
+            self.stats["user_misses"] += 1
+            self._user_ids[email] = user.id
+            self._users[user.id] = (snapshot, now + self.ttl)
+            self._users.move_to_end(user.id)
+            while len(self._users) > self.max_entries:
+                _, (evicted, _) = self._users.popitem(last=False)
+                self._user_ids.pop(evicted.email, None)
+        return snapshot
+
+    def invalidate_user(self, user_id: int):
+        """Drop a user's cached record after their row changes"""
+        with self._lock:
+            cached = self._users.pop(user_id, None)
+            if cached is not None:
+                self._user_ids.pop(cached[0].email, None)
+
+auth_cache = AuthCache(settings.AUTH_CACHE_TTL, settings.AUTH_CACHE_MAX_ENTRIES)
+password_workers = PasswordWorkers(settings.AUTH_WORKERS, settings.AUTH_MAX_PENDING)
+login_throttle = LoginThrottle(settings.LOGIN_RATE_PER_MINUTE, settings.LOGIN_RATE_BURST)
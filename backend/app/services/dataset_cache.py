@@ -0,0 +1,118 @@
+import os
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, Optional
+import pandas as pd
+
+from app.core.config import settings
+
+# pyarrow is optional - without it imports fall back to re-parsing raw files
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+# Bump when DatasetSchema.normalize output changes so stale caches are rebuilt
+CACHE_FORMAT_VERSION = 1
+
+# Per-import columns that are filled in on read instead of being cached
+VOLATILE_COLUMNS = ['collected_at', 'topics', 'entities', 'user_id']
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 of a file, streamed in 1MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class DatasetCache:
+    """Columnar Parquet cache of normalized dataset files, keyed by slug and checksum"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or settings.DATASET_CACHE_DIR)
+        self.enabled = HAS_PYARROW and settings.DATASET_CACHE_ENABLED
+
+    def _slug_dir(self, slug: str) -> Path:
+        return self.cache_dir / slug.replace('/', '__')
+
+    def cache_path(self, slug: str, data_file: Path, checksum: str) -> Path:
+        """Location of the cached Parquet file for one raw data file"""
+        return self._slug_dir(slug) / f"{data_file.stem}-{checksum[:16]}-v{CACHE_FORMAT_VERSION}.parquet"
+
+    def ensure_cached(self, schema, data_file: Path, chunk_size: int) -> Path:
+        """Convert a raw data file to Parquet once, returning the cached path"""
+        checksum = file_checksum(data_file)
+        path = self.cache_path(schema.slug, data_file, checksum)
+        if path.exists():
+            logger.info(f"Using cached Parquet for {data_file}: {path}")
+            return path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.parquet.tmp')
+        writer = None
+        rows = 0
+        try:
+            for chunk in schema.read_chunks(data_file, chunk_size):
+                frame = schema.normalize(chunk, None, source=data_file.stem).drop(columns=VOLATILE_COLUMNS)
+                if writer is None:
+                    table = pa.Table.from_pandas(frame, preserve_index=False)
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                else:
+                    table = pa.Table.from_pandas(frame, schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+                rows += len(frame)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None:
+            # Empty source file - nothing to cache
+            return path
+        os.replace(tmp_path, path)
+        self._write_manifest(schema.slug, data_file, checksum, path, rows)
+        logger.info(f"Cached {rows} rows of {data_file} as {path}")
+        return path
+
+    def _write_manifest(self, slug: str, data_file: Path, checksum: str, path: Path, rows: int):
+        manifest_path = self._slug_dir(slug) / "manifest.json"
+        manifest = self.manifest(slug)
+        manifest[data_file.name] = {
+            'checksum': checksum,
+            'parquet': path.name,
+            'rows': rows,
+            'format_version': CACHE_FORMAT_VERSION
+        }
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    def manifest(self, slug: str) -> Dict[str, Any]:
+        """Cached files of a dataset, keyed by raw file name"""
+        manifest_path = self._slug_dir(slug) / "manifest.json"
+        if not manifest_path.exists():
+            return {}
+        return json.loads(manifest_path.read_text())
+
+    def cached_files(self, slug: str) -> List[Path]:
+        """Parquet files for a dataset, for readers outside the import path (e.g. R reports)"""
+        return [self._slug_dir(slug) / entry['parquet'] for entry in self.manifest(slug).values()]
+
+    def iter_frames(self, path: Path, user_id: Optional[int], batch_size: int) -> Iterator[pd.DataFrame]:
+        """Yield SocialPost-ready frames from a memory-mapped Parquet file"""
+        if not path.exists():
+            return
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            frame = batch.to_pandas()
+            frame['collected_at'] = pd.Timestamp.now(tz='UTC')
+            frame['topics'] = [[]] * len(frame)
+            frame['entities'] = [[]] * len(frame)
+            frame['user_id'] = user_id
+            yield frame
+
+dataset_cache = DatasetCache()
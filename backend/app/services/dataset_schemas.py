@@ -0,0 +1,385 @@
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+from pathlib import Path
+import io
+import pandas as pd
+
+SENTIMENT_SCORES = {
+    'positive': 0.5,
+    'neutral': 0.0,
+    'negative': -0.5
+}
+
+# SocialPost text columns filled from a dataset, with their fallback values
+TEXT_FIELDS = {
+    'post_id': '',
+    'content': '',
+    'author': 'Unknown',
+    'author_id': '',
+    'url': ''
+}
+
+ENGAGEMENT_FIELDS = ['likes', 'shares', 'comments', 'views']
+
+def parse_datetime(values: pd.Series) -> pd.Series:
+    """Parse free-form timestamp strings (with or without offsets) to UTC"""
+    return pd.to_datetime(values, errors='coerce', utc=True)
+
+def parse_unix_seconds(values: pd.Series) -> pd.Series:
+    """Parse epoch-second timestamps to UTC"""
+    return pd.to_datetime(pd.to_numeric(values, errors='coerce'), unit='s', errors='coerce', utc=True)
+
+def parse_sentiment140_date(values: pd.Series) -> pd.Series:
+    """Parse Sentiment140 dates such as 'Mon Apr 06 22:19:45 PDT 2009' to UTC"""
+    naive = pd.to_datetime(
+        values.astype('string').str.replace(' PDT ', ' ', regex=False),
+        format='%a %b %d %H:%M:%S %Y',
+        errors='coerce'
+    )
+    # Every row in the dataset is stamped PDT (UTC-7)
+    return naive.dt.tz_localize('Etc/GMT+7').dt.tz_convert('UTC')
+
+class DatasetSchema:
+    """Declarative mapping from one Kaggle dataset layout onto SocialPost columns"""
+
+    def __init__(
+        self,
+        slug: str,
+        name: str,
+        description: str,
+        platform: str,
+        dtypes: Dict[str, Any],
+        renames: Dict[str, str],
+        sentiment_column: Optional[str] = None,
+        sentiment_labels: Optional[Dict[str, str]] = None,
+        timestamp_column: Optional[str] = None,
+        timestamp_parser: Callable[[pd.Series], pd.Series] = parse_datetime,
+        url_builder: Optional[Callable[[pd.DataFrame], pd.Series]] = None,
+        file_pattern: str = "*.csv",
+        file_format: str = "csv",
+        read_options: Optional[Dict[str, Any]] = None,
+        splittable: bool = True,
+        size: str = "Unknown",
+        records: str = "Unknown"
+    ):
+        self.slug = slug
+        self.name = name
+        self.description = description
+        self.platform = platform
+        self.dtypes = dtypes
+        self.renames = renames
+        self.sentiment_column = sentiment_column
+        self.sentiment_labels = sentiment_labels or {}
+        self.timestamp_column = timestamp_column
+        self.timestamp_parser = timestamp_parser
+        self.url_builder = url_builder
+        self.file_pattern = file_pattern
+        self.file_format = file_format
+        self.read_options = read_options or {}
+        # CSV files are sharded by byte ranges starting at record boundaries
+        self.splittable = splittable and file_format == "csv"
+        self.size = size
+        self.records = records
+
+    def find_files(self, dataset_path: str) -> List[Path]:
+        """Return the data files of this layout under a download directory"""
+        return sorted(Path(dataset_path).glob(self.file_pattern))
+
+    def _csv_options(self) -> Dict[str, Any]:
+        options = {
+            'usecols': lambda column: column in self.dtypes,
+            'dtype': self.dtypes,
+            **self.read_options
+        }
+        if 'names' in options:
+            # Headerless files name every column, so usecols must follow them
+            options['usecols'] = list(self.dtypes)
+        return options
+
+    def read_chunks(self, path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Yield raw chunks of a data file using only the mapped columns"""
+        if self.file_format == "jsonl":
+            reader = pd.read_json(path, lines=True, dtype=self.dtypes, chunksize=chunk_size)
+            for chunk in reader:
+                yield chunk.reindex(columns=list(self.dtypes))
+            return
+
+        yield from pd.read_csv(path, chunksize=chunk_size, **self._csv_options())
+
+    @property
+    def has_header(self) -> bool:
+        return self.read_options.get('header', 'infer') is not None
+
+    def shard_offsets(self, path: Path, shard_bytes: int) -> List[Tuple[int, int, int]]:
+        """Split a CSV file into ``(start, end, first_row)`` byte ranges of
+        about ``shard_bytes`` each, in one pass over the file.
+
+        Ranges start right after a newline outside any quoted field, so a
+        record whose text contains newlines is never split. ``first_row``
+        is the number of records before the range, keeping generated post
+        ids identical to a sequential import.
+        """
+        size = path.stat().st_size
+        shards = []
+        with open(path, 'rb') as f:
+            position = len(f.readline()) if self.has_header else 0
+            start, first_row = position, 0
+            target = start + shard_bytes
+            rows = 0
+            in_quotes = False
+            for block in iter(lambda: f.read(1 << 20), b''):
+                # Text between quote characters alternates outside/inside a field;
+                # doubled quotes inside a field toggle twice and cancel out
+                for index, segment in enumerate(block.split(b'"')):
+                    if index:
+                        position += 1  # The quote character itself
+                        in_quotes = not in_quotes
+                    if not in_quotes:
+                        while target < position + len(segment):
+                            newline = segment.find(b'\n', max(target - position, 0))
+                            if newline < 0:
+                                break
+                            boundary = position + newline + 1
+                            row = rows + segment.count(b'\n', 0, newline + 1)
+                            if boundary < size:
+                                shards.append((start, boundary, first_row))
+                                start, first_row = boundary, row
+                            target = boundary + shard_bytes
+                        rows += segment.count(b'\n')
+                    position += len(segment)
+        shards.append((start, size, first_row))
+        return shards
+
+    def read_range(self, path: Path, start: int = 0, end: Optional[int] = None, first_row: int = 0) -> pd.DataFrame:
+        """Read the records in bytes [start, end) of a data file, indexed by
+        absolute row number. The range must begin at a record start; the
+        whole file is read when ``end`` is None."""
+        if self.file_format == "jsonl":
+            chunk = pd.read_json(path, lines=True, dtype=self.dtypes).reindex(columns=list(self.dtypes))
+        elif end is None:
+            chunk = pd.read_csv(path, **self._csv_options())
+        else:
+            with open(path, 'rb') as f:
+                # Every shard is parsed under the file's own header line
+                header = f.readline() if self.has_header else b''
+                start = max(start, len(header))
+                f.seek(start)
+                data = f.read(max(end - start, 0))
+            chunk = pd.read_csv(io.BytesIO(header + data), **self._csv_options())
+        chunk.index = pd.RangeIndex(first_row, first_row + len(chunk))
+        return chunk
+
+    def normalize(self, chunk: pd.DataFrame, user_id: Optional[int], source: Optional[str] = None) -> pd.DataFrame:
+        """Map a raw chunk onto SocialPost columns in one vectorized pass.
+
+        ``source`` (usually the file stem) namespaces the row-number post ids
+        generated for rows without an id, so shards of different files of
+        the same dataset cannot collide.
+        """
+        chunk = chunk.reindex(columns=list(self.dtypes))
+        mapped = chunk.rename(columns=self.renames)
+        now = pd.Timestamp.now(tz='UTC')
+
+        frame = pd.DataFrame(index=chunk.index)
+        frame['platform'] = self.platform
+
+        for field, default in TEXT_FIELDS.items():
+            if field in mapped:
+                frame[field] = mapped[field].astype('string').fillna(default).astype(object)
+            else:
+                frame[field] = default
+
+        prefix = f"{self.platform}_{source}_" if source else f"{self.platform}_"
+        fallback_ids = prefix + chunk.index.astype(str)
+        frame['post_id'] = frame['post_id'].where(frame['post_id'] != '', fallback_ids)
+        if self.url_builder:
+            frame['url'] = self.url_builder(frame)
+
+        if self.timestamp_column:
+            posted_at = self.timestamp_parser(chunk[self.timestamp_column])
+            frame['posted_at'] = posted_at.fillna(now)
+        else:
+            frame['posted_at'] = now
+        frame['collected_at'] = now
+
+        for field in ENGAGEMENT_FIELDS:
+            if field in mapped:
+                frame[field] = pd.to_numeric(mapped[field], errors='coerce').fillna(0).astype('int64')
+            else:
+                frame[field] = 0
+
+        if self.sentiment_column:
+            labels = chunk[self.sentiment_column].astype('string').str.lower().map(self.sentiment_labels)
+            sentiment = labels.fillna('neutral').astype(object)
+        else:
+            sentiment = pd.Series('neutral', index=chunk.index, dtype=object)
+        frame['sentiment'] = sentiment
+        frame['sentiment_score'] = sentiment.map(SENTIMENT_SCORES)
+
+        frame['topics'] = [[]] * len(frame)  # Will be populated by NLP analysis
+        frame['entities'] = [[]] * len(frame)
+        frame['language'] = 'en'
+        frame['user_id'] = user_id
+        return frame
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public description used by the dataset listing endpoints"""
+        return {
+            'slug': self.slug,
+            'name': self.name,
+            'description': self.description,
+            'size': self.size,
+            'records': self.records
+        }
+
+DATASET_SCHEMAS: Dict[str, DatasetSchema] = {}
+
+def register_schema(schema: DatasetSchema) -> DatasetSchema:
+    """Add a dataset layout to the registry"""
+    DATASET_SCHEMAS[schema.slug] = schema
+    return schema
+
+DEFAULT_DATASET_SLUG = "crowdflower/twitter-airline-sentiment"
+
+def get_dataset_schema(slug: Optional[str] = None) -> Optional[DatasetSchema]:
+    """Look up the layout for a dataset slug (defaults to airline sentiment)"""
+    return DATASET_SCHEMAS.get(slug or DEFAULT_DATASET_SLUG)
+
+register_schema(DatasetSchema(
+    slug="crowdflower/twitter-airline-sentiment",
+    name="Twitter Airline Sentiment",
+    description="Twitter posts about airlines with sentiment labels",
+    platform="twitter",
+    dtypes={
+        'tweet_id': str,
+        'airline_sentiment': str,
+        'name': str,
+        'text': str,
+        'tweet_created': str,
+        'retweet_count': str,
+    },
+    renames={
+        'tweet_id': 'post_id',
+        'text': 'content',
+        'name': 'author',
+        'retweet_count': 'shares',
+    },
+    sentiment_column='airline_sentiment',
+    sentiment_labels={'positive': 'positive', 'negative': 'negative', 'neutral': 'neutral'},
+    timestamp_column='tweet_created',
+    url_builder=lambda frame: 'https://twitter.com/i/status/' + frame['post_id'],
+    size="~2MB",
+    records="~15000"
+))
+
+register_schema(DatasetSchema(
+    slug="kazanova/sentiment140",
+    name="Sentiment140",
+    description="Large Twitter sentiment dataset",
+    platform="twitter",
+    dtypes={
+        'target': str,
+        'ids': str,
+        'date': str,
+        'user': str,
+        'text': str,
+    },
+    renames={
+        'ids': 'post_id',
+        'text': 'content',
+        'user': 'author',
+    },
+    sentiment_column='target',
+    sentiment_labels={'0': 'negative', '2': 'neutral', '4': 'positive'},
+    timestamp_column='date',
+    timestamp_parser=parse_sentiment140_date,
+    url_builder=lambda frame: 'https://twitter.com/i/status/' + frame['post_id'],
+    read_options={
+        'header': None,
+        'names': ['target', 'ids', 'date', 'flag', 'user', 'text'],
+        'encoding': 'latin-1',
+    },
+    size="~80MB",
+    records="~1.6M"
+))
+
+register_schema(DatasetSchema(
+    slug="snap/amazon-fine-food-reviews",
+    name="Amazon Fine Food Reviews",
+    description="Product reviews with sentiment",
+    platform="amazon",
+    dtypes={
+        'Id': str,
+        'ProductId': str,
+        'UserId': str,
+        'ProfileName': str,
+        'HelpfulnessNumerator': str,
+        'Score': str,
+        'Time': str,
+        'Text': str,
+    },
+    renames={
+        'Id': 'post_id',
+        'Text': 'content',
+        'ProfileName': 'author',
+        'UserId': 'author_id',
+        'HelpfulnessNumerator': 'likes',
+        'ProductId': 'url',
+    },
+    sentiment_column='Score',
+    sentiment_labels={'1': 'negative', '2': 'negative', '3': 'neutral', '4': 'positive', '5': 'positive'},
+    timestamp_column='Time',
+    timestamp_parser=parse_unix_seconds,
+    url_builder=lambda frame: 'https://www.amazon.com/dp/' + frame['url'],
+    file_pattern="Reviews.csv",
+    size="~250MB",
+    records="~500K"
+))
+
+register_schema(DatasetSchema(
+    slug="rmisra/news-headlines-dataset-for-sarcasm-detection",
+    name="News Headlines for Sarcasm Detection",
+    description="News headlines with sarcasm labels",
+    platform="news",
+    dtypes={
+        'article_link': str,
+        'headline': str,
+        'is_sarcastic': str,
+    },
+    renames={
+        'headline': 'content',
+        'article_link': 'url',
+    },
+    # Sarcasm labels carry no polarity, so every headline imports as neutral
+    file_pattern="*.json",
+    file_format="jsonl",
+    splittable=False,
+    size="~3MB",
+    records="~28K"
+))
+
+register_schema(DatasetSchema(
+    slug="bwandowando/reddit-r-all-2015-2018-million-headlines",
+    name="Reddit Headlines 2015-2018",
+    description="Million Reddit headlines with scores and dates",
+    platform="reddit",
+    dtypes={
+        'id': str,
+        'title': str,
+        'author': str,
+        'score': str,
+        'num_comments': str,
+        'created_utc': str,
+    },
+    renames={
+        'id': 'post_id',
+        'title': 'content',
+        'author': 'author',
+        'score': 'likes',
+        'num_comments': 'comments',
+    },
+    timestamp_column='created_utc',
+    timestamp_parser=parse_unix_seconds,
+    url_builder=lambda frame: 'https://www.reddit.com/comments/' + frame['post_id'],
+    size="~25MB",
+    records="~1M"
+))
@@ -1,16 +1,54 @@
 import os
+import queue
+import threading
 # import kaggle  # Commented out to avoid authentication issues when not needed
 import pandas as pd
 import zipfile
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 
 from app.core.config import settings
+from app.services.dataset_schemas import DATASET_SCHEMAS, SENTIMENT_SCORES, get_dataset_schema
+from app.services.dataset_cache import dataset_cache, file_checksum
 
 logger = logging.getLogger(__name__)
 
+# Per-process analytics service used by ingest workers that score their shards
+_worker_ai_service = None
+
+def _score_frame(frame: pd.DataFrame) -> None:
+    """Run sentiment and topic analysis over a normalized shard in place"""
+    global _worker_ai_service
+    if _worker_ai_service is None:
+        from app.services.ai_analytics import AIAnalyticsService
+        _worker_ai_service = AIAnalyticsService()
+
+    analyses = [_worker_ai_service.analyze_sentiment(text) for text in frame['content']]
+    frame['sentiment'] = [analysis['sentiment'] for analysis in analyses]
+    frame['sentiment_score'] = [analysis['scores']['vader']['compound'] for analysis in analyses]
+    frame['topics'] = [_worker_ai_service.extract_topics(text) for text in frame['content']]
+
+def _ingest_shard(
+    dataset_slug: str,
+    path: str,
+    start: int,
+    end: Optional[int],
+    first_row: int,
+    user_id: int,
+    score: bool
+) -> List[Dict[str, Any]]:
+    """Parse, normalize and optionally score one shard (runs in a worker process)"""
+    schema = get_dataset_schema(dataset_slug)
+    chunk = schema.read_range(Path(path), start, end, first_row)
+    frame = schema.normalize(chunk, user_id, source=Path(path).stem)
+    if score:
+        _score_frame(frame)
+    return frame.to_dict('records')
+
 class DatasetService:
     """Service for downloading and processing Kaggle datasets"""
 
@@ -34,20 +72,22 @@ class DatasetService:
                 logger.error("Kaggle credentials not configured")
                 return None
 
-            # Download dataset
+            import kaggle
+
+            # Download the archive only; Kaggle skips the transfer when the
+            # local zip is already up to date
             logger.info(f"Downloading dataset: {dataset_slug}")
-            kaggle.api.dataset_download_files(dataset_slug, path=self.data_dir, unzip=True)
+            dataset_name = dataset_slug.split('/')[-1]
+            kaggle.api.dataset_download_files(dataset_slug, path=self.data_dir, unzip=False)
+
+            archive_path = self.data_dir / f"{dataset_name}.zip"
+            dataset_path = self.data_dir / dataset_name
 
-            # Find the downloaded files
-            dataset_path = self.data_dir / dataset_slug.split('/')[-1]
+            if archive_path.exists():
+                self._extract_if_changed(archive_path, dataset_path)
 
             if dataset_path.exists():
                 return str(dataset_path)
-            else:
-                # Look for any CSV files in the data directory
-                csv_files = list(self.data_dir.glob("**/*.csv"))
-                if csv_files:
-                    return str(csv_files[0].parent)
 
             logger.error(f"Dataset download failed or files not found for {dataset_slug}")
             return None
@@ -56,56 +96,42 @@ class DatasetService:
             logger.error(f"Error downloading dataset {dataset_slug}: {e}")
             return None
 
-    def process_twitter_sentiment_dataset(self, dataset_path: str) -> List[Dict[str, Any]]:
-        """Process Twitter airline sentiment dataset"""
-        try:
-            # Look for CSV files
-            csv_files = list(Path(dataset_path).glob("*.csv"))
+    def _extract_if_changed(self, archive_path: Path, dataset_path: Path) -> bool:
+        """Extract a dataset archive unless the same archive was already extracted"""
+        checksum = file_checksum(archive_path)
+        marker = dataset_path / ".archive_sha256"
 
-            if not csv_files:
-                logger.error(f"No CSV files found in {dataset_path}")
-                return []
+        if marker.exists() and marker.read_text().strip() == checksum:
+            logger.info(f"Archive {archive_path} unchanged, skipping extraction")
+            return False
+
+        logger.info(f"Extracting {archive_path} to {dataset_path}")
+        with zipfile.ZipFile(archive_path) as archive:
+            archive.extractall(dataset_path)
+        marker.write_text(checksum)
+        return True
 
-            csv_file = csv_files[0]  # Use the first CSV file
-            logger.info(f"Processing CSV file: {csv_file}")
+    def process_dataset(self, dataset_path: str, dataset_slug: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Load and normalize a whole dataset using its registered schema mapping"""
+        try:
+            schema = get_dataset_schema(dataset_slug)
+            if schema is None:
+                logger.error(f"No schema mapping registered for dataset {dataset_slug}")
+                return []
 
-            # Read the dataset
-            df = pd.read_csv(csv_file)
+            data_files = schema.find_files(dataset_path)
+            if not data_files:
+                logger.error(f"No data files matching {schema.file_pattern} found in {dataset_path}")
+                return []
 
-            # Convert to our format
             processed_data = []
-            for _, row in df.iterrows():
-                # Map sentiment labels
-                sentiment_mapping = {
-                    'positive': 'positive',
-                    'negative': 'negative',
-                    'neutral': 'neutral'
-                }
-
-                sentiment = sentiment_mapping.get(str(row.get('airline_sentiment', '')).lower(), 'neutral')
-
-                post_data = {
-                    'platform': 'twitter',
-                    'post_id': str(row.get('tweet_id', f"kaggle_{len(processed_data)}")),
-                    'content': str(row.get('text', '')),
-                    'author': str(row.get('name', 'Unknown')),
-                    'author_id': str(row.get('tweet_id', '')),
-                    'url': f"https://twitter.com/i/status/{row.get('tweet_id', '')}",
-                    'posted_at': pd.to_datetime(row.get('tweet_created', datetime.now())).isoformat(),
-                    'collected_at': datetime.now().isoformat(),
-                    'likes': 0,  # Not available in this dataset
-                    'shares': 0,
-                    'comments': 0,
-                    'views': 0,
-                    'sentiment': sentiment,
-                    'sentiment_score': self._map_sentiment_to_score(sentiment),
-                    'topics': [],  # Will be populated by NLP analysis
-                    'entities': [],
-                    'language': 'en',
-                    'user_id': None  # To be set when importing
-                }
-
-                processed_data.append(post_data)
+            for data_file in data_files:
+                logger.info(f"Processing data file: {data_file}")
+                for chunk in schema.read_chunks(data_file, settings.DATASET_CHUNK_SIZE):
+                    frame = schema.normalize(chunk, None, source=data_file.stem)
+                    frame['posted_at'] = frame['posted_at'].map(lambda ts: ts.isoformat())
+                    frame['collected_at'] = frame['collected_at'].map(lambda ts: ts.isoformat())
+                    processed_data.extend(frame.to_dict('records'))
 
             logger.info(f"Processed {len(processed_data)} posts from dataset")
             return processed_data
@@ -114,53 +140,276 @@ class DatasetService:
             logger.error(f"Error processing dataset: {e}")
             return []
 
+    def process_twitter_sentiment_dataset(self, dataset_path: str) -> List[Dict[str, Any]]:
+        """Process Twitter airline sentiment dataset"""
+        return self.process_dataset(dataset_path, "crowdflower/twitter-airline-sentiment")
+
     def _map_sentiment_to_score(self, sentiment: str) -> float:
         """Map sentiment label to numerical score"""
-        mapping = {
-            'positive': 0.5,
-            'neutral': 0.0,
-            'negative': -0.5
+        return SENTIMENT_SCORES.get(sentiment.lower(), 0.0)
+
+    def _iter_normalized(self, schema, data_file: Path, user_id: int, chunk_size: int):
+        """Yield normalized frames for a data file, via the Parquet cache when available"""
+        if dataset_cache.enabled:
+            cached_path = dataset_cache.ensure_cached(schema, data_file, chunk_size)
+            yield from dataset_cache.iter_frames(cached_path, user_id, chunk_size)
+            return
+
+        for chunk in schema.read_chunks(data_file, chunk_size):
+            yield schema.normalize(chunk, user_id, source=data_file.stem)
+
+    def _bulk_insert(self, db, records: List[Dict[str, Any]]) -> int:
+        """Insert records in batches, skipping posts the user already has.
+
+        The rollups of the days that received posts are cleared in the same
+        transaction, so historical imports show up in reports.
+        """
+        from app.core.database import insert_ignore
+        from app.models.social_data import SocialPost
+        from app.services.report_engine import stale_rollup_updates
+
+        posted_at: Dict[int, List[datetime]] = {}
+        batch_size = settings.DATASET_INSERT_BATCH_SIZE
+        statement = insert_ignore(
+            SocialPost, index_elements=[SocialPost.user_id, SocialPost.platform, SocialPost.post_id]
+        ).returning(SocialPost.user_id, SocialPost.posted_at)
+        for start in range(0, len(records), batch_size):
+            result = db.execute(
+                statement,
+                records[start:start + batch_size]
+            )
+            for user_id, moment in result:
+                posted_at.setdefault(user_id, []).append(moment)
+
+        for user_id, moments in posted_at.items():
+            for update in stale_rollup_updates(user_id, moments):
+                db.execute(update)
+        return sum(len(moments) for moments in posted_at.values())
+
+    def _import_progress(self, processed: int, imported: int, started: float) -> Dict[str, Any]:
+        """Build a progress/throughput snapshot for a running import"""
+        elapsed = time.perf_counter() - started
+        return {
+            'processed_count': processed,
+            'imported_count': imported,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(processed / elapsed, 1) if elapsed > 0 else 0.0
         }
-        return mapping.get(sentiment.lower(), 0.0)
+
+    def stream_dataset_to_db(
+        self,
+        dataset_path: str,
+        user_id: int,
+        dataset_slug: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Stream a dataset file into the database in bounded-memory chunks.
+
+        Only one chunk of ``chunk_size`` rows is held in memory at a time; each
+        chunk is normalized by the dataset's registered schema mapping and
+        written with bulk ``INSERT ... ON CONFLICT DO NOTHING`` statements,
+        then committed. When the Parquet cache is enabled, each raw file is
+        converted once and every later import reads the memory-mapped cache.
+        """
+        from app.core.database import SessionLocal
+        from app.services.response_cache import response_cache
+
+        schema = get_dataset_schema(dataset_slug)
+        if schema is None:
+            logger.error(f"No schema mapping registered for dataset {dataset_slug}")
+            return {'success': False, 'error': f'Unsupported dataset layout: {dataset_slug}'}
+
+        data_files = schema.find_files(dataset_path)
+        if not data_files:
+            logger.error(f"No data files matching {schema.file_pattern} found in {dataset_path}")
+            return {'success': False, 'error': 'No data files found'}
+
+        chunk_size = chunk_size or settings.DATASET_CHUNK_SIZE
+        db = SessionLocal()
+        processed = imported = chunks = 0
+        started = time.perf_counter()
+
+        try:
+            for data_file in data_files:
+                logger.info(f"Streaming {schema.slug} file {data_file} in chunks of {chunk_size} rows")
+                for frame in self._iter_normalized(schema, data_file, user_id, chunk_size):
+                    inserted = self._bulk_insert(db, frame.to_dict('records'))
+                    db.commit()
+                    if inserted:
+                        response_cache.invalidate_user_sync(user_id)
+                    imported += inserted
+
+                    processed += len(frame)
+                    chunks += 1
+                    progress = self._import_progress(processed, imported, started)
+                    logger.info(
+                        f"Chunk {chunks}: {progress['processed_count']} rows processed, "
+                        f"{progress['imported_count']} imported ({progress['rows_per_second']} rows/s)"
+                    )
+                    if progress_callback:
+                        progress_callback(progress)
+
+            return {
+                'success': True,
+                'data_files': [str(data_file) for data_file in data_files],
+                'chunks': chunks,
+                **self._import_progress(processed, imported, started)
+            }
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error streaming dataset {dataset_path}: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'chunks': chunks,
+                **self._import_progress(processed, imported, started)
+            }
+        finally:
+            db.close()
+
+    def _plan_shards(self, schema, data_files: List[Path], shard_bytes: int) -> List[Tuple[str, int, Optional[int], int]]:
+        """Split data files into (path, start_byte, end_byte, first_row) shards for the worker pool.
+
+        Each worker reads only its own byte range, so parse work stays
+        linear in the file size however many shards there are.
+        """
+        shards = []
+        for data_file in data_files:
+            if not schema.splittable:
+                shards.append((str(data_file), 0, None, 0))
+                continue
+
+            for start, end, first_row in schema.shard_offsets(data_file, shard_bytes):
+                shards.append((str(data_file), start, end, first_row))
+        return shards
+
+    def _bulk_writer(self, write_queue: queue.Queue, state: Dict[str, Any]) -> None:
+        """Drain normalized shards from the queue into the database"""
+        from app.core.database import SessionLocal
+        from app.services.response_cache import response_cache
+
+        db = SessionLocal()
+        try:
+            while True:
+                records = write_queue.get()
+                if records is None:
+                    break
+                if state['error']:
+                    continue  # Keep draining so producers never block
+
+                try:
+                    inserted = self._bulk_insert(db, records)
+                    db.commit()
+                    if inserted:
+                        response_cache.invalidate_user_sync(state['user_id'])
+                    state['imported'] += inserted
+                    state['processed'] += len(records)
+                except Exception as e:
+                    db.rollback()
+                    state['error'] = str(e)
+                    logger.error(f"Bulk writer failed: {e}")
+        finally:
+            db.close()
+
+    def parallel_ingest(
+        self,
+        dataset_path: str,
+        user_id: int,
+        dataset_slug: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        shard_bytes: Optional[int] = None,
+        score: bool = False
+    ) -> Dict[str, Any]:
+        """Ingest every data file of a dataset across a process pool.
+
+        Files (and byte ranges of large splittable files) are sharded across
+        ``max_workers`` processes that parse, normalize and optionally score
+        them. Results feed a single bulk-writer thread through a bounded
+        queue, and at most two shards per worker are in flight at once, so
+        memory stays bounded no matter how large the dataset is.
+        """
+        schema = get_dataset_schema(dataset_slug)
+        if schema is None:
+            logger.error(f"No schema mapping registered for dataset {dataset_slug}")
+            return {'success': False, 'error': f'Unsupported dataset layout: {dataset_slug}'}
+
+        data_files = schema.find_files(dataset_path)
+        if not data_files:
+            logger.error(f"No data files matching {schema.file_pattern} found in {dataset_path}")
+            return {'success': False, 'error': 'No data files found'}
+
+        max_workers = max_workers or settings.DATASET_INGEST_WORKERS or os.cpu_count() or 1
+        shards = self._plan_shards(schema, data_files, shard_bytes or settings.DATASET_SHARD_BYTES)
+        logger.info(f"Ingesting {schema.slug}: {len(data_files)} files in {len(shards)} shards on {max_workers} workers")
+
+        write_queue = queue.Queue(maxsize=settings.DATASET_WRITER_QUEUE_SIZE)
+        state = {'processed': 0, 'imported': 0, 'error': None, 'user_id': user_id}
+        writer = threading.Thread(target=self._bulk_writer, args=(write_queue, state), daemon=True)
+        writer.start()
+        started = time.perf_counter()
+        failed_shards = 0
+
+        def drain(done):
+            nonlocal failed_shards
+            for future in done:
+                try:
+                    write_queue.put(future.result())
+                except Exception as e:
+                    failed_shards += 1
+                    logger.error(f"Ingest shard failed: {e}")
+
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                pending = set()
+                for path, start, end, first_row in shards:
+                    if len(pending) >= max_workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        drain(done)
+                    pending.add(executor.submit(_ingest_shard, schema.slug, path, start, end, first_row, user_id, score))
+                drain(wait(pending)[0])
+        finally:
+            write_queue.put(None)
+            writer.join()
+
+        result = {
+            'success': not state['error'] and not failed_shards,
+            'data_files': [str(data_file) for data_file in data_files],
+            'shards': len(shards),
+            'failed_shards': failed_shards,
+            'workers': max_workers,
+            **self._import_progress(state['processed'], state['imported'], started)
+        }
+        if state['error']:
+            result['error'] = state['error']
+        elif failed_shards:
+            result['error'] = f'{failed_shards} shards failed to ingest'
+
+        logger.info(f"Parallel ingest finished: {result['imported_count']} imported ({result['rows_per_second']} rows/s)")
+        return result
 
     def get_available_datasets(self) -> List[Dict[str, Any]]:
         """Get list of recommended social media datasets"""
-        return [
-            {
-                'slug': 'crowdflower/twitter-airline-sentiment',
-                'name': 'Twitter Airline Sentiment',
-                'description': 'Twitter posts about airlines with sentiment labels',
-                'size': '~2MB',
-                'records': '~15000'
-            },
-            {
-                'slug': 'kazanova/sentiment140',
-                'name': 'Sentiment140',
-                'description': 'Large Twitter sentiment dataset',
-                'size': '~80MB',
-                'records': '~1.6M'
-            },
-            {
-                'slug': 'snap/amazon-fine-food-reviews',
-                'name': 'Amazon Fine Food Reviews',
-                'description': 'Product reviews with sentiment',
-                'size': '~250MB',
-                'records': '~500K'
-            }
-        ]
+        return [schema.to_dict() for schema in DATASET_SCHEMAS.values()]
 
     def import_dataset_to_db(self, dataset_data: List[Dict[str, Any]], user_id: int) -> int:
         """Import processed dataset to database"""
         from app.core.database import get_db
         from app.models.social_data import SocialPost
+        from app.services.response_cache import response_cache
+        from app.services.report_engine import stale_rollup_updates
 
         db = next(get_db())
 
         try:
             imported_count = 0
+            posted_at = []
             for post_data in dataset_data:
                 # Check if post already exists
                 existing = db.query(SocialPost).filter(
+                    SocialPost.user_id == user_id,
+                    SocialPost.platform == post_data['platform'],
                     SocialPost.post_id == post_data['post_id']
                 ).first()
 
@@ -171,8 +420,13 @@ class DatasetService:
                     )
                     db.add(post)
                     imported_count += 1
+                    posted_at.append(pd.Timestamp(post_data['posted_at']).to_pydatetime())
 
+            for update in stale_rollup_updates(user_id, posted_at):
+                db.execute(update)
             db.commit()
+            if imported_count:
+                response_cache.invalidate_user_sync(user_id)
             logger.info(f"Imported {imported_count} posts to database")
             return imported_count
 
@@ -183,7 +437,12 @@ class DatasetService:
         finally:
             db.close()
 
-    def download_and_process_dataset(self, dataset_slug: str, user_id: int) -> Dict[str, Any]:
+    def download_and_process_dataset(
+        self,
+        dataset_slug: str,
+        user_id: int,
+        parallel: Optional[bool] = None
+    ) -> Dict[str, Any]:
         """Complete pipeline: download, process, and import dataset"""
         logger.info(f"Starting dataset pipeline for {dataset_slug}")
 
@@ -192,17 +451,16 @@ class DatasetService:
         if not dataset_path:
             return {'success': False, 'error': 'Failed to download dataset'}
 
-        # Process dataset
-        processed_data = self.process_twitter_sentiment_dataset(dataset_path)
-        if not processed_data:
-            return {'success': False, 'error': 'Failed to process dataset'}
-
-        # Import to database
-        imported_count = self.import_dataset_to_db(processed_data, user_id)
+        # Stream chunks straight into the database, across a process pool if enabled
+        use_parallel = settings.DATASET_PARALLEL_INGEST if parallel is None else parallel
+        if use_parallel:
+            result = self.parallel_ingest(dataset_path, user_id, dataset_slug)
+        else:
+            result = self.stream_dataset_to_db(dataset_path, user_id, dataset_slug)
+        if not result['success']:
+            return {'success': False, 'error': result.get('error', 'Failed to process dataset')}
 
         return {
-            'success': True,
             'dataset_path': dataset_path,
-            'processed_count': len(processed_data),
-            'imported_count': imported_count
+            **result
         }
\ No newline at end of file
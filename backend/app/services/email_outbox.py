@@ -0,0 +1,274 @@
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import func, insert, update
+
+from app.core.config import settings
+from app.services.email_service import EmailService
+from app.services.email_templates import RenderedEmail
+
+logger = logging.getLogger(__name__)
+
+def outbox_row(
+    to_email: str,
+    subject: str,
+    content: str,
+    content_type: str = "html",
+    report_id: Optional[int] = None,
+    text_content: Optional[str] = None
+) -> Dict[str, Any]:
+    return {
+        'to_email': to_email,
+        'subject': subject,
+        'content': content,
+        'content_type': content_type,
+        'text_content': text_content,
+        'report_id': report_id,
+        'status': 'pending',
+        'attempts': 0,
+        'next_attempt_at': datetime.utcnow()
+    }
+
+def enqueue_emails(rows: List[Dict[str, Any]], db=None):
+    """Persist outbox rows (blocking). With ``db`` the rows join the caller's
+    transaction and are committed with it; otherwise they commit on their own."""
+    from app.core.database import SessionLocal
+    from app.models.social_data import EmailOutbox
+
+    if not rows:
+        return
+    if db is not None:
+        db.execute(insert(EmailOutbox), rows)
+        return
+    db = SessionLocal()
+    try:
+        db.execute(insert(EmailOutbox), rows)
+        db.commit()
+    finally:
+        db.close()
+
+async def queue_email(
+    to_email: str,
+    subject: str,
+    content: str,
+    content_type: str = "html",
+    report_id: Optional[int] = None,
+    text_content: Optional[str] = None
+):
+    """Persist one email for delivery by the outbox worker and wake it"""
+    await asyncio.to_thread(enqueue_emails, [outbox_row(to_email, subject, content, content_type, report_id, text_content)])
+    email_outbox.wake()
+
+async def queue_rendered(to_email: str, email: RenderedEmail, report_id: Optional[int] = None):
+    await queue_email(to_email, email.subject, email.html, "html", report_id, email.text)
+
+class EmailOutboxWorker:
+    """Delivers persisted outbox emails in batches.
+
+    Due rows are claimed by a conditional UPDATE that pushes their next
+    attempt a lease into the future, so each row goes to one worker even
+    without row locks, and a worker that dies mid-batch only delays its
+    claims. A failed
+    send is retried with exponential backoff and jitter; after
+    ``max_attempts`` the row is dead-lettered and its report marked failed.
+    Successful sends mark the row and its report sent.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        backoff: float,
+        backoff_max: float,
+        lease: float,
+        email_service: Optional[EmailService] = None
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self.email_service = email_service or EmailService()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.stats = {'sent': 0, 'failed': 0, 'dead': 0}
+
+    def _claim(self, limit: int) -> List[Dict[str, Any]]:
+        from app.core.database import SessionLocal
+        from app.models.social_data import EmailOutbox
+
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            candidates = [row_id for (row_id,) in db.query(EmailOutbox.id).filter(
+                EmailOutbox.status == 'pending',
+                EmailOutbox.next_attempt_at <= now
+            ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(limit).with_for_update(skip_locked=True)]
+            if not candidates:
+                db.commit()
+                return []
+
+            # Row locks are not available everywhere (SQLite ignores them), so
+            # the lease is taken by a conditional UPDATE: a row another worker
+            # claimed since the SELECT no longer matches and is left to it
+            rows = db.execute(
+                update(EmailOutbox).where(
+                    EmailOutbox.id.in_(candidates),
+                    EmailOutbox.status == 'pending',
+                    EmailOutbox.next_attempt_at <= now
+                ).values(
+                    attempts=func.coalesce(EmailOutbox.attempts, 0) + 1,
+                    next_attempt_at=now + timedelta(seconds=self.lease)
+                ).returning(
+                    EmailOutbox.id,
+                    EmailOutbox.report_id,
+                    EmailOutbox.to_email,
+                    EmailOutbox.subject,
+                    EmailOutbox.content,
+                    EmailOutbox.content_type,
+                    EmailOutbox.text_content,
+                    EmailOutbox.attempts
+                ).execution_options(synchronize_session=False)
+            ).mappings().all()
+            db.commit()
+
+            order = {row_id: position for position, row_id in enumerate(candidates)}
+            claimed = [{**row, 'content_type': row['content_type'] or 'html'} for row in rows]
+            return sorted(claimed, key=lambda row: order[row['id']])
+        finally:
+            db.close()
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _record(self, sent: List[Dict[str, Any]], failed: List[Dict[str, Any]]):
+        from app.core.database import SessionLocal
+        from app.models.social_data import EmailOutbox, Report
+
+        now = datetime.utcnow()
+        dead = [row for row in failed if row['attempts'] >= self.max_attempts]
+        dead_ids = {row['id'] for row in dead}
+        db = SessionLocal()
+        try:
+            if sent:
+                db.execute(update(EmailOutbox).where(EmailOutbox.id.in_([row['id'] for row in sent])).values(
+                    status='sent', sent_at=now, last_error=None
+                ))
+                report_ids = [row['report_id'] for row in sent if row['report_id']]
+                if report_ids:
+                    db.execute(update(Report).where(Report.id.in_(report_ids)).values(status='sent', sent_at=now))
+            for row in failed:
+                values = {'last_error': f"Attempt {row['attempts']}: {row['error']}"}
+                if row['id'] in dead_ids:
+                    values['status'] = 'dead'
+                else:
+                    values['next_attempt_at'] = now + timedelta(seconds=self._retry_delay(row['attempts']))
+                db.execute(update(EmailOutbox).where(EmailOutbox.id == row['id']).values(**values))
+            report_ids = [row['report_id'] for row in dead if row['report_id']]
+            if report_ids:
+                db.execute(update(Report).where(Report.id.in_(report_ids)).values(status='failed'))
+            db.commit()
+        finally:
+            db.close()
+
+        for row in dead:
+            logger.error(f"Dead-lettered email {row['id']} to {row['to_email']} after {row['attempts']} attempts")
+
+    async def _send(self, row: Dict[str, Any]) -> Optional[str]:
+        """Deliver one row; returns None once sent, otherwise the error to record"""
+        try:
+            await self.email_service.deliver_email(
+                row['to_email'], row['subject'], row['content'], row['content_type'],
+                text_content=row['text_content']
+            )
+            return None
+        except Exception as e:
+            logger.error(f"Email {row['id']} to {row['to_email']} failed: {e}")
+            return str(e) or type(e).__name__
+
+    async def run_once(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Claim and send one batch of due emails"""
+        rows = await asyncio.to_thread(self._claim, limit or self.batch_size)
+        if not rows:
+            return {'claimed': 0, 'sent': 0, 'failed': 0}
+
+        # The SMTP pool caps how many of these are actually in flight
+        errors = await asyncio.gather(*[self._send(row) for row in rows])
+        sent = [row for row, error in zip(rows, errors) if error is None]
+        failed = [{**row, 'error': error} for row, error in zip(rows, errors) if error is not None]
+        await asyncio.to_thread(self._record, sent, failed)
+
+        self.stats['sent'] += len(sent)
+        self.stats['failed'] += len(failed)
+        self.stats['dead'] += sum(1 for row in failed if row['attempts'] >= self.max_attempts)
+        return {'claimed': len(rows), 'sent': len(sent), 'failed': len(failed)}
+
+    async def drain(self, deadline: Optional[float] = None) -> Dict[str, int]:
+        """Send due emails until none are left or the monotonic ``deadline`` passes"""
+        totals = {'claimed': 0, 'sent': 0, 'failed': 0}
+        while deadline is None or time.monotonic() < deadline:
+            result = await self.run_once()
+            for key in totals:
+                totals[key] += result[key]
+            if result['claimed'] < self.batch_size:
+                break
+        return totals
+
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                result = await self.run_once()
+                if result['claimed'] == self.batch_size:
+                    continue
+            except Exception as e:
+                logger.error(f"Email outbox batch failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def backlog(self) -> Dict[str, int]:
+        """Outbox row counts by status (blocking)"""
+        from app.core.database import SessionLocal
+        from app.models.social_data import EmailOutbox
+
+        db = SessionLocal()
+        try:
+            return dict(db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all())
+        finally:
+            db.close()
+
+email_outbox = EmailOutboxWorker(
+    settings.EMAIL_OUTBOX_BATCH_SIZE,
+    settings.EMAIL_OUTBOX_POLL_INTERVAL,
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    settings.EMAIL_OUTBOX_BACKOFF,
+    settings.EMAIL_OUTBOX_BACKOFF_MAX,
+    settings.EMAIL_OUTBOX_LEASE
+)
@@ -1,51 +1,280 @@
+import time
+import asyncio
 import smtplib
+from collections import deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Optional, Dict, Any, List
 import aiosmtplib
 from email.message import EmailMessage
 
 from app.core.config import settings
+from app.services.email_templates import EmailTemplates, RenderedEmail, email_templates
+
+# Failures worth retrying on a fresh session; 4xx replies are transient by definition
+RETRYABLE_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError
+)
+
+class EmailDeliveryError(Exception):
+    """The server refused a message, or retries ran out; the message is the reason"""
+
+class _PooledConnection:
+    __slots__ = ("client", "sent", "last_used")
+
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+class SMTPPool:
+    """Pool of persistent, authenticated SMTP sessions.
+
+    Each session is opened once - TCP, TLS and AUTH - and then carries up to
+    ``messages_per_connection`` messages before it is recycled. At most
+    ``size`` sessions exist, which also caps how many messages are in flight.
+    Sessions idle longer than ``idle_timeout`` are dropped rather than reused,
+    since servers close them on their side. Transient failures - dropped
+    connections, timeouts, 4xx replies - are retried on a fresh session with
+    exponential backoff; 5xx replies fail the message immediately.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        size: int = 5,
+        messages_per_connection: int = 100,
+        idle_timeout: float = 60,
+        timeout: float = 30,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        use_tls: Optional[bool] = None
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username or None
+        self.password = password or None
+        self.size = size
+        self.messages_per_connection = messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        # Implicit TLS on the SMTPS port; elsewhere STARTTLS is used when offered
+        self.use_tls = port == 465 if use_tls is None else use_tls
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: List[_PooledConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._sent_times: deque = deque()
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "connections_opened": 0}
+
+    def _bind(self):
+        """(Re)create loop-bound state; sessions can't move between event loops"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            for conn in self._idle:
+                conn.client.close()
+            self._idle = []
+            self._slots = asyncio.Semaphore(self.size)
+            self._loop = loop
+
+    async def _open(self) -> _PooledConnection:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        self.stats["connections_opened"] += 1
+        return _PooledConnection(client)
+
+    async def _acquire(self) -> _PooledConnection:
+        now = time.monotonic()
+        while self._idle:
+            conn = self._idle.pop()
+            if conn.client.is_connected and now - conn.last_used < self.idle_timeout:
+                return conn
+            await self._discard(conn)
+        return await self._open()
+
+    def _release(self, conn: _PooledConnection):
+        conn.last_used = time.monotonic()
+        if conn.sent >= self.messages_per_connection:
+            asyncio.ensure_future(self._discard(conn))
+        else:
+            self._idle.append(conn)
+
+    async def _discard(self, conn: _PooledConnection):
+        try:
+            if conn.client.is_connected:
+                await conn.client.quit()
+        except Exception:
+            conn.client.close()
+
+    async def deliver(self, message: EmailMessage) -> None:
+        """Send one message over a pooled session, retrying transient failures.
+
+        Raises ``EmailDeliveryError`` carrying the server's reply or the
+        connection error once the message is refused or retries run out.
+        """
+        self._bind()
+        async with self._slots:
+            for attempt in range(self.max_retries + 1):
+                conn = None
+                try:
+                    conn = await self._acquire()
+                    await conn.client.send_message(message)
+                    conn.sent += 1
+                    self._release(conn)
+                    self._record_sent()
+                    return
+                except aiosmtplib.SMTPRecipientsRefused as e:
+                    if conn is not None:
+                        self._release(conn)
+                    error = "refused: " + "; ".join(
+                        f"{refused.recipient} {refused.code} {refused.message}" for refused in e.recipients
+                    )
+                    break
+                except aiosmtplib.SMTPResponseException as e:
+                    # The session is still usable after a rejected message
+                    if conn is not None:
+                        self._release(conn)
+                    error = f"rejected: {e.code} {e.message}"
+                    if not 400 <= e.code < 500 or attempt == self.max_retries:
+                        break
+                except RETRYABLE_ERRORS as e:
+                    if conn is not None:
+                        conn.client.close()
+                    error = f"failed after {attempt + 1} attempts: {e or type(e).__name__}"
+                    if attempt == self.max_retries:
+                        break
+                except Exception:
+                    if conn is not None:
+                        conn.client.close()
+                    self.stats["failed"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+        self.stats["failed"] += 1
+        raise EmailDeliveryError(error)
+
+    async def send(self, message: EmailMessage) -> bool:
+        """``deliver`` that reports failure as False"""
+        try:
+            await self.deliver(message)
+            return True
+        except EmailDeliveryError as e:
+            print(f"Email to {message['To']} {e}")
+            return False
+
+    def _record_sent(self):
+        now = time.monotonic()
+        self.stats["sent"] += 1
+        self._sent_times.append(now)
+        while self._sent_times and now - self._sent_times[0] > 60:
+            self._sent_times.popleft()
+
+    async def close(self):
+        """Quit every idle session"""
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*[self._discard(conn) for conn in idle], return_exceptions=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        recent = sum(1 for sent_at in self._sent_times if now - sent_at <= 60)
+        return {
+            **self.stats,
+            "idle_connections": len(self._idle),
+            "messages_per_connection": round(
+                self.stats["sent"] / self.stats["connections_opened"], 1
+            ) if self.stats["connections_opened"] else 0.0,
+            "send_rate_per_minute": recent
+        }
+
+smtp_pool = SMTPPool(
+    settings.SMTP_SERVER,
+    settings.SMTP_PORT,
+    settings.SMTP_USERNAME,
+    settings.SMTP_PASSWORD,
+    size=settings.SMTP_POOL_SIZE,
+    messages_per_connection=settings.SMTP_MESSAGES_PER_CONNECTION,
+    idle_timeout=settings.SMTP_IDLE_TIMEOUT,
+    timeout=settings.SMTP_TIMEOUT,
+    max_retries=settings.SMTP_MAX_RETRIES
+)
 
 class EmailService:
-    def __init__(self):
+    def __init__(self, pool: Optional[SMTPPool] = None, templates: Optional[EmailTemplates] = None):
         self.smtp_server = settings.SMTP_SERVER
         self.smtp_port = settings.SMTP_PORT
         self.smtp_username = settings.SMTP_USERNAME
         self.smtp_password = settings.SMTP_PASSWORD
+        self.pool = pool or smtp_pool
+        self.templates = templates or email_templates
 
-    async def send_email(
+    def _message(
         self,
         to_email: str,
         subject: str,
         content: str,
         content_type: str = "html",
-        from_email: Optional[str] = None
-    ) -> bool:
-        """Send email asynchronously"""
-        try:
-            # Create message
-            msg = EmailMessage()
-            msg["From"] = from_email or self.smtp_username or "noreply@aisocialintel.com"
-            msg["To"] = to_email
-            msg["Subject"] = subject
+        from_email: Optional[str] = None,
+        text_content: Optional[str] = None
+    ) -> EmailMessage:
+        msg = EmailMessage()
+        msg["From"] = from_email or self.smtp_username or "noreply@aisocialintel.com"
+        msg["To"] = to_email
+        msg["Subject"] = subject
 
-            # Set content type
-            if content_type == "html":
-                msg.set_content(content, subtype="html")
-            else:
-                msg.set_content(content)
+        # Set content type
+        if content_type == "html" and text_content:
+            msg.set_content(text_content)
+            msg.add_alternative(content, subtype="html")
+        elif content_type == "html":
+            msg.set_content(content, subtype="html")
+        else:
+            msg.set_content(content)
+        return msg
 
-            # Send email
-            await aiosmtplib.send(
-                msg,
-                hostname=self.smtp_server,
-                port=self.smtp_port,
-                username=self.smtp_username,
-                password=self.smtp_password,
-                use_tls=True
-            )
+    async def deliver_email(
+        self,
+        to_email: str,
+        subject: str,
+        content: str,
+        content_type: str = "html",
+        from_email: Optional[str] = None,
+        text_content: Optional[str] = None
+    ) -> None:
+        """``send_email`` that raises instead of returning False, with the
+        SMTP reply in an ``EmailDeliveryError``"""
+        await self.pool.deliver(self._message(to_email, subject, content, content_type, from_email, text_content))
 
+    async def send_email(
+        self,
+        to_email: str,
+        subject: str,
+        content: str,
+        content_type: str = "html",
+        from_email: Optional[str] = None,
+        text_content: Optional[str] = None
+    ) -> bool:
+        """Send email asynchronously; with ``text_content`` an HTML email goes
+        out as multipart/alternative"""
+        try:
+            # Send over a pooled session
+            await self.deliver_email(to_email, subject, content, content_type, from_email, text_content)
             return True
 
         except Exception as e:
@@ -92,90 +321,74 @@ class EmailService:
             print(f"Synchronous email sending failed: {e}")
             return False
 
-    async def send_welcome_email(self, to_email: str, user_name: str) -> bool:
-        """Send welcome email to new users"""
-        subject = "Welcome to AI Social Intelligence!"
-
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Welcome to AI Social Intelligence, {user_name}!</h2>
-            <p>Thank you for joining our platform. Here's what you can do:</p>
-            <ul>
-                <li>Monitor social media conversations in real-time</li>
-                <li>Get AI-powered sentiment analysis</li>
-                <li>Receive automated business reports</li>
-                <li>Track hiring trends and tech insights</li>
-            </ul>
-            <p>Get started by connecting your social media accounts and exploring your dashboard.</p>
-            <br>
-            <p>Best regards,<br>The AI Social Intelligence Team</p>
-        </body>
-        </html>
-        """
+    async def send_rendered(self, to_email: str, email: RenderedEmail) -> bool:
+        return await self.send_email(to_email, email.subject, email.html, text_content=email.text)
 
-        return await self.send_email(to_email, subject, html_content)
+    async def send_welcome_email(self, to_email: str, user_name: str, locale: Optional[str] = None) -> bool:
+        """Send welcome email to new users"""
+        return await self.send_rendered(to_email, self.templates.render("welcome", {"user_name": user_name}, locale))
 
     async def send_report_email(
         self,
         to_email: str,
         report_title: str,
         report_content: str,
-        report_type: str = "daily"
+        report_type: str = "daily",
+        locale: Optional[str] = None
     ) -> bool:
         """Send automated report email"""
-        subject = f"AI Social Intelligence - {report_title} ({report_type.title()} Report)"
-
-        html_content = f"""
-        <html>
-        <body>
-            <h2>{report_title}</h2>
-            <p>Your automated {report_type} business intelligence report is ready.</p>
-
-            <div style="border: 1px solid #ddd; padding: 20px; margin: 20px 0;">
-                {report_content}
-            </div>
-
-            <p>Login to your dashboard for detailed analytics and interactive visualizations.</p>
-
-            <br>
-            <p>Best regards,<br>AI Social Intelligence System</p>
-            <hr>
-            <small>This is an automated report. Please do not reply to this email.</small>
-        </body>
-        </html>
-        """
+        return await self.send_rendered(to_email, self.build_report_email(report_title, report_content, report_type, locale))
 
-        return await self.send_email(to_email, subject, html_content)
+    def build_report_email(
+        self,
+        report_title: str,
+        report_content: str,
+        report_type: str = "daily",
+        locale: Optional[str] = None
+    ) -> RenderedEmail:
+        """Automated report email; everything but the report body is rendered once per batch"""
+        return self.templates.render_cached(
+            "report",
+            {"report_title": report_title, "report_type": report_type},
+            {"report_content": report_content},
+            locale
+        )
+
+    def build_personal_report_email(
+        self,
+        report_content: str,
+        user_name: str,
+        profiles_count: int,
+        locale: Optional[str] = None
+    ) -> RenderedEmail:
+        return self.templates.render(
+            "personal_report",
+            {"report_content": report_content, "user_name": user_name, "profiles_count": profiles_count},
+            locale
+        )
 
     async def send_alert_email(
         self,
         to_email: str,
         alert_type: str,
         alert_message: str,
-        severity: str = "medium"
+        severity: str = "medium",
+        locale: Optional[str] = None
     ) -> bool:
         """Send alert notifications"""
-        subject = f"AI Social Intelligence Alert - {alert_type}"
+        return await self.send_rendered(to_email, self.build_alert_email(alert_type, alert_message, severity, locale))
 
-        severity_colors = {
-            "low": "#28a745",
-            "medium": "#ffc107",
-            "high": "#dc3545"
-        }
-
-        html_content = f"""
-        <html>
-        <body>
-            <h2 style="color: {severity_colors.get(severity, '#ffc107')};">Alert: {alert_type}</h2>
-            <p>{alert_message}</p>
-
-            <p>Please check your dashboard for more details.</p>
-
-            <br>
-            <p>AI Social Intelligence Monitoring System</p>
-        </body>
-        </html>
-        """
-
-        return await self.send_email(to_email, subject, html_content)
\ No newline at end of file
+    def build_alert_email(
+        self,
+        alert_type: str,
+        alert_message: str,
+        severity: str = "medium",
+        locale: Optional[str] = None
+    ) -> RenderedEmail:
+        """Alert notification email"""
+        return self.templates.render_cached(
+            "alert",
+            {"alert_type": alert_type, "severity": severity},
+            {"alert_message": alert_message},
+            locale
+        )
\ No newline at end of file
@@ -0,0 +1,125 @@
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+from markupsafe import escape
+
+from app.core.config import settings
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+PARTS = ("subject", "text", "html")
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    text: str
+    html: str
+
+# Stand-in for a per-recipient value while the static parts are rendered
+def _marker(key: str) -> str:
+    return f"\x00{key}\x00"
+
+MARKER_PATTERN = re.compile(r"\x00(\w+)\x00")
+
+class EmailTemplates:
+    """Email templates compiled once, rendered to subject, text and HTML.
+
+    Every ``<locale>/<name>.jinja`` file under ``template_dir`` is compiled
+    at construction and defines ``subject``, ``text`` and ``html`` blocks,
+    rendered together from one context. Locales fall back from ``pt-BR`` to
+    ``pt`` to the default locale.
+
+    ``render_cached`` serves batches where most of the context is shared:
+    the template is rendered once per distinct static context with markers
+    in place of the per-recipient values, and each email then only joins
+    the cached fragments with its own values.
+    """
+
+    def __init__(self, template_dir: Path, default_locale: str = "en", cache_size: int = 1024):
+        self.default_locale = default_locale
+        self.cache_size = cache_size
+        self.env = Environment(
+            loader=FileSystemLoader(str(template_dir)),
+            autoescape=True,
+            undefined=StrictUndefined,
+            auto_reload=False,
+            cache_size=-1
+        )
+        self._templates: Dict[str, Template] = {
+            name: self.env.get_template(name)
+            for name in self.env.list_templates(extensions=["jinja"])
+        }
+        self._fragments: "OrderedDict[tuple, Tuple[List[str], ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def locales(self) -> List[str]:
+        return sorted({name.split("/", 1)[0] for name in self._templates})
+
+    def _template(self, name: str, locale: Optional[str]) -> Template:
+        candidates = []
+        if locale:
+            candidates += [locale, locale.split("-")[0].split("_")[0]]
+        candidates.append(self.default_locale)
+        for candidate in candidates:
+            template = self._templates.get(f"{candidate}/{name}.jinja")
+            if template is not None:
+                return template
+        raise ValueError(f"No email template '{name}' for locale '{locale or self.default_locale}'")
+
+    def render(self, name: str, context: Dict[str, Any], locale: Optional[str] = None) -> RenderedEmail:
+        """Render all parts of a template from one context"""
+        template = self._template(name, locale)
+        ctx = template.new_context(context)
+        return RenderedEmail(*(
+            "".join(template.blocks[part](ctx)).strip() for part in PARTS
+        ))
+
+    def render_cached(
+        self,
+        name: str,
+        static: Dict[str, Any],
+        dynamic: Dict[str, Any],
+        locale: Optional[str] = None
+    ) -> RenderedEmail:
+        """Render with the ``static`` parts served from cache.
+
+        ``dynamic`` values must be inserted as-is by the template - no
+        filters - since they are substituted after rendering: escaped in
+        the HTML part, verbatim elsewhere.
+        """
+        key = (name, locale, tuple(sorted(static.items())), tuple(sorted(dynamic)))
+        with self._lock:
+            fragments = self._fragments.get(key)
+            if fragments is not None:
+                self._fragments.move_to_end(key)
+                self.stats["hits"] += 1
+
+        if fragments is None:
+            rendered = self.render(name, {**static, **{k: _marker(k) for k in dynamic}}, locale)
+            fragments = tuple(MARKER_PATTERN.split(part) for part in rendered)
+            with self._lock:
+                self.stats["misses"] += 1
+                self._fragments[key] = fragments
+                while len(self._fragments) > self.cache_size:
+                    self._fragments.popitem(last=False)
+
+        values = {k: str(v) for k, v in dynamic.items()}
+        escaped = {k: str(escape(v)) for k, v in values.items()}
+        parts = []
+        for part, pieces in zip(PARTS, fragments):
+            # Split on the marker pattern alternates static text and value keys
+            fill = escaped if part == "html" else values
+            parts.append("".join(
+                piece if i % 2 == 0 else fill[piece]
+                for i, piece in enumerate(pieces)
+            ))
+        return RenderedEmail(*parts)
+
+email_templates = EmailTemplates(
+    Path(settings.EMAIL_TEMPLATE_DIR) if settings.EMAIL_TEMPLATE_DIR else TEMPLATE_DIR,
+    settings.EMAIL_DEFAULT_LOCALE,
+    settings.EMAIL_TEMPLATE_CACHE_SIZE
+)
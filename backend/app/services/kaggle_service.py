@@ -1,20 +1,53 @@
 import os
 import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 from datetime import datetime
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
-class KaggleService:
-    """Service for managing Kaggle API integration"""
+def _format_dataset(dataset) -> Dict[str, Any]:
+    """Convert a Kaggle API dataset object into a plain, cacheable dict"""
+    return {
+        'ref': dataset.ref,
+        'title': dataset.title,
+        'subtitle': dataset.subtitle,
+        'description': getattr(dataset, 'description', ''),
+        'owner': dataset.owner_ref,
+        'size': getattr(dataset, 'size', 'Unknown'),
+        'last_updated': getattr(dataset, 'lastUpdated', None),
+        'download_count': getattr(dataset, 'downloadCount', 0),
+        'vote_count': getattr(dataset, 'voteCount', 0),
+        'url': f"https://www.kaggle.com/{dataset.ref}"
+    }
 
-    def __init__(self):
+class KaggleClient:
+    """Process-wide Kaggle API client with cached credentials and metadata.
+
+    The blocking ``kaggle`` SDK runs in the default executor, search results
+    are kept in a bounded TTL cache, and concurrent identical lookups share
+    one in-flight request.
+    """
+
+    def __init__(self, cache_ttl: int, credentials_ttl: int, max_entries: int = 256):
         self.api_key_path = Path.home() / ".kaggle" / "kaggle.json"
-        self.is_authenticated = self._check_authentication()
+        self.cache_ttl = cache_ttl
+        self.credentials_ttl = credentials_ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._authenticated: Optional[bool] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
 
-    def _check_authentication(self) -> bool:
+    def _read_credentials(self) -> bool:
         """Check if Kaggle API is properly configured"""
         try:
             if self.api_key_path.exists():
@@ -26,6 +59,84 @@ class KaggleService:
             logger.error(f"Error checking Kaggle authentication: {e}")
             return False
 
+    def is_authenticated(self) -> bool:
+        """Cached credential state, re-read from disk at most once per TTL"""
+        with self._lock:
+            now = time.monotonic()
+            if self._authenticated is None or now - self._checked_at > self.credentials_ttl:
+                self._authenticated = self._read_credentials()
+                self._checked_at = now
+            return self._authenticated
+
+    def invalidate_credentials(self, authenticated: Optional[bool] = None):
+        """Reset cached credential state and metadata after credentials change"""
+        with self._lock:
+            self._authenticated = authenticated
+            self._checked_at = time.monotonic()
+            self._cache.clear()
+
+    def _cache_get(self, key: Tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._cache[key]
+                return False, None
+            self._cache.move_to_end(key)
+            return True, value
+
+    def _cache_set(self, key: Tuple, value: Any):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _dataset_list_sync(self, search: str, max_size: int) -> List[Dict[str, Any]]:
+        import kaggle
+        return [_format_dataset(dataset) for dataset in kaggle.api.dataset_list(search=search, max_size=max_size)]
+
+    async def _fetch_dataset_list(self, key: Tuple, search: str, max_size: int) -> List[Dict[str, Any]]:
+        try:
+            value = await asyncio.get_running_loop().run_in_executor(None, self._dataset_list_sync, search, max_size)
+        finally:
+            self._inflight.pop(key, None)
+        self._cache_set(key, value)
+        return value
+
+    async def dataset_list(self, search: str, max_size: int) -> List[Dict[str, Any]]:
+        """Search Kaggle datasets, served from cache when fresh"""
+        key = ('dataset_list', search, max_size)
+        hit, value = self._cache_get(key)
+        if hit:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_dataset_list(key, search, max_size))
+            self._inflight[key] = inflight
+        # Every caller, the first included, is shielded so its cancellation
+        # does not cancel the lookup the other callers are waiting on
+        return await asyncio.shield(inflight)
+
+kaggle_client = KaggleClient(
+    cache_ttl=settings.KAGGLE_CACHE_TTL,
+    credentials_ttl=settings.KAGGLE_CREDENTIALS_TTL
+)
+
+class KaggleService:
+    """Service for managing Kaggle API integration"""
+
+    def __init__(self):
+        self.client = kaggle_client
+        self.api_key_path = kaggle_client.api_key_path
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.client.is_authenticated()
+
     def setup_credentials(self, username: str, api_key: str) -> Dict[str, Any]:
         """Set up Kaggle API credentials"""
         try:
@@ -49,7 +160,7 @@ class KaggleService:
             os.environ['KAGGLE_USERNAME'] = username
             os.environ['KAGGLE_KEY'] = api_key
 
-            self.is_authenticated = True
+            self.client.invalidate_credentials(authenticated=True)
 
             logger.info("Kaggle credentials configured successfully")
             return {
@@ -76,36 +187,24 @@ class KaggleService:
             logger.error(f"Error getting user info: {e}")
             return None
 
-    def search_datasets(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    async def search_datasets(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """Search for datasets on Kaggle"""
         if not self.is_authenticated:
             return []
 
         try:
-            import kaggle
-            datasets = kaggle.api.dataset_list(search=query, max_size=max_results)
-
-            results = []
-            for dataset in datasets:
-                results.append({
-                    'ref': dataset.ref,
-                    'title': dataset.title,
-                    'subtitle': dataset.subtitle,
-                    'description': getattr(dataset, 'description', ''),
-                    'owner': dataset.owner_ref,
-                    'size': getattr(dataset, 'size', 'Unknown'),
-                    'last_updated': getattr(dataset, 'lastUpdated', None),
-                    'download_count': getattr(dataset, 'downloadCount', 0),
-                    'vote_count': getattr(dataset, 'voteCount', 0),
-                    'url': f"https://www.kaggle.com/{dataset.ref}"
-                })
-
-            return results
-
+            return await self.client.dataset_list(query, max_results)
         except Exception as e:
             logger.error(f"Error searching datasets: {e}")
             return []
 
+    async def _lookup_dataset(self, slug: str) -> Optional[Dict[str, Any]]:
+        """Exact-match lookup shared by validation and info (one cached search)"""
+        datasets = await self.client.dataset_list(slug, 1)
+        if datasets and datasets[0]['ref'] == slug:
+            return datasets[0]
+        return None
+
     def get_popular_social_datasets(self) -> List[Dict[str, Any]]:
         """Get popular social media and sentiment analysis datasets"""
         return [
@@ -151,42 +250,27 @@ class KaggleService:
             }
         ]
 
-    def validate_dataset_slug(self, slug: str) -> bool:
+    async def validate_dataset_slug(self, slug: str) -> bool:
         """Validate if a dataset slug exists and is accessible"""
         if not self.is_authenticated:
             return False
 
         try:
-            import kaggle
-            # Try to get dataset info
-            dataset = kaggle.api.dataset_list(search=slug, max_size=1)
-            return len(dataset) > 0 and dataset[0].ref == slug
+            return await self._lookup_dataset(slug) is not None
         except Exception as e:
             logger.error(f"Error validating dataset {slug}: {e}")
             return False
 
-    def get_dataset_info(self, slug: str) -> Optional[Dict[str, Any]]:
+    async def get_dataset_info(self, slug: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific dataset"""
         if not self.is_authenticated:
             return None
 
         try:
-            import kaggle
-            datasets = kaggle.api.dataset_list(search=slug, max_size=1)
-
-            if datasets and datasets[0].ref == slug:
-                dataset = datasets[0]
+            dataset = await self._lookup_dataset(slug)
+            if dataset:
                 return {
-                    'ref': dataset.ref,
-                    'title': dataset.title,
-                    'subtitle': dataset.subtitle,
-                    'description': getattr(dataset, 'description', ''),
-                    'owner': dataset.owner_ref,
-                    'size': getattr(dataset, 'size', 'Unknown'),
-                    'last_updated': getattr(dataset, 'lastUpdated', None),
-                    'download_count': getattr(dataset, 'downloadCount', 0),
-                    'vote_count': getattr(dataset, 'voteCount', 0),
-                    'url': f"https://www.kaggle.com/{dataset.ref}",
+                    **dataset,
                     'files': []  # Would need separate API call for files
                 }
 
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Dict, Any
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.social_data import SocialPost
+
+def post_stats(db: Session, user_id: int, start: datetime, end: datetime) -> Dict[str, Any]:
+    """Platform, sentiment and total post figures for a user in [start, end].
+
+    One scan grouped by (platform, sentiment) yields every figure: platform
+    rows and the total are sums over sentiments, and the sentiment
+    distribution a sum over platforms. Engagement is carried as a sum and a
+    non-null count so per-platform averages match AVG() exactly.
+    """
+    engagement = SocialPost.likes + SocialPost.shares + SocialPost.comments
+    rows = db.query(
+        SocialPost.platform,
+        SocialPost.sentiment,
+        func.count(SocialPost.id),
+        func.coalesce(func.sum(engagement), 0),
+        func.count(engagement)
+    ).filter(
+        SocialPost.user_id == user_id,
+        SocialPost.posted_at >= start,
+        SocialPost.posted_at <= end
+    ).group_by(SocialPost.platform, SocialPost.sentiment).all()
+
+    platforms: Dict[str, Dict[str, float]] = {}
+    sentiment_stats: Dict[str, int] = {}
+    total_posts = 0
+    for platform, sentiment, count, engagement_sum, engagement_count in rows:
+        total_posts += count
+        stats = platforms.setdefault(platform, {'count': 0, 'engagement_sum': 0, 'engagement_count': 0})
+        stats['count'] += count
+        stats['engagement_sum'] += engagement_sum
+        stats['engagement_count'] += engagement_count
+        if sentiment is not None:
+            sentiment_stats[sentiment] = sentiment_stats.get(sentiment, 0) + count
+
+    platform_stats = {
+        platform: {
+            'count': stats['count'],
+            'avg_engagement': float(stats['engagement_sum'] / stats['engagement_count']) if stats['engagement_count'] else 0.0
+        }
+        for platform, stats in platforms.items()
+    }
+    return {
+        'total_posts': total_posts,
+        'platform_stats': platform_stats,
+        'sentiment_stats': sentiment_stats
+    }
@@ -0,0 +1,221 @@
+import json
+import asyncio
+import logging
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+def user_channel(user_id: int) -> str:
+    """Broker channel carrying realtime events for one user"""
+    # Plain identifier so it is also a valid Postgres LISTEN channel name
+    return f"realtime_user_{user_id}"
+
+class MessageBroker:
+    """Fan-out backend for realtime events.
+
+    Every worker subscribes to the channels of the users whose sockets it
+    holds and delivers published messages to those local sockets, so an
+    event published from any process reaches every connection.
+    """
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        raise NotImplementedError
+
+    async def unsubscribe(self, channel: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+class InProcessBroker(MessageBroker):
+    """Single-process backend: publish calls the local handler directly"""
+
+    def __init__(self):
+        self._handlers: Dict[str, MessageHandler] = {}
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        handler = self._handlers.get(channel)
+        if handler:
+            await handler(message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers[channel] = handler
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+
+class RedisBroker(MessageBroker):
+    """Redis PUBLISH/SUBSCRIBE backend for multi-worker deployments"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._handlers: Dict[str, MessageHandler] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        await self._redis.publish(channel, json.dumps(message, default=str))
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers[channel] = handler
+        await self._pubsub.subscribe(channel)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+        await self._pubsub.unsubscribe(channel)
+
+    async def _listen(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+
+                channel = message['channel']
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                handler = self._handlers.get(channel)
+                if handler:
+                    await handler(json.loads(message['data']))
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Redis broker listener error: {e}")
+                await asyncio.sleep(1.0)
+
+    async def close(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+        await self._pubsub.close()
+        await self._redis.close()
+
+class PostgresBroker(MessageBroker):
+    """Postgres LISTEN/NOTIFY backend, for deployments without Redis"""
+
+    # NOTIFY payloads must stay below 8000 bytes
+    MAX_PAYLOAD_BYTES = 7900
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._listen_conn = None
+        self._pool = None
+        self._handlers: Dict[str, MessageHandler] = {}
+        self._connect_lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def _ensure_connected(self):
+        async with self._connect_lock:
+            import asyncpg
+
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+            if self._listen_conn is None or self._listen_conn.is_closed():
+                conn = await asyncpg.connect(self.dsn)
+                conn.add_termination_listener(self._on_terminate)
+                # LISTEN again on every channel after a reconnect
+                for channel in list(self._handlers):
+                    await conn.add_listener(channel, self._on_notify)
+                self._listen_conn = conn
+
+    def _on_terminate(self, connection):
+        if self._closed or connection is not self._listen_conn:
+            return
+        logger.warning("Postgres broker lost its LISTEN connection, reconnecting")
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        while not self._closed:
+            try:
+                await self._ensure_connected()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Postgres broker reconnect failed: {e}")
+                await asyncio.sleep(1.0)
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        await self._ensure_connected()
+        payload = json.dumps(message, default=str)
+        if len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            logger.warning(f"Dropping realtime message on {channel}: payload exceeds NOTIFY limit")
+            return
+        import asyncpg
+
+        pool = self._pool
+        try:
+            await pool.execute("SELECT pg_notify($1, $2)", channel, payload)
+        except (asyncpg.PostgresConnectionError, asyncpg.InterfaceError, asyncpg.InternalClientError) as e:
+            # The server dropped the pooled connections; retry once on a fresh pool
+            logger.warning(f"Postgres broker publish on {channel} failed, retrying: {e}")
+            await self._replace_pool(pool)
+            await self._pool.execute("SELECT pg_notify($1, $2)", channel, payload)
+
+    async def _replace_pool(self, failed):
+        async with self._connect_lock:
+            # Concurrent publishes may have failed on the same pool
+            if self._pool is failed:
+                failed.terminate()
+                self._pool = None
+        await self._ensure_connected()
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        await self._ensure_connected()
+        self._handlers[channel] = handler
+        await self._listen_conn.add_listener(channel, self._on_notify)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+        if self._listen_conn is not None and not self._listen_conn.is_closed():
+            await self._listen_conn.remove_listener(channel, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        handler = self._handlers.get(channel)
+        if handler:
+            asyncio.ensure_future(self._dispatch(handler, channel, payload))
+
+    async def _dispatch(self, handler: MessageHandler, channel: str, payload: str):
+        try:
+            await handler(json.loads(payload))
+        except Exception as e:
+            logger.error(f"Postgres broker delivery failed on {channel}: {e}")
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        if self._listen_conn is not None:
+            await self._listen_conn.close()
+        if self._pool is not None:
+            try:
+                await asyncio.wait_for(self._pool.close(), 5.0)
+            except asyncio.TimeoutError:
+                # A connection the server terminated mid-query is never released
+                self._pool.terminate()
+
+def create_broker(backend: Optional[str] = None) -> MessageBroker:
+    """Build the broker configured by REALTIME_BROKER (memory, redis or postgres)"""
+    backend = (backend or settings.REALTIME_BROKER).lower()
+
+    if backend == "redis":
+        return RedisBroker(settings.REDIS_URL)
+    if backend == "postgres":
+        dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+        return PostgresBroker(dsn)
+    if backend != "memory":
+        logger.warning(f"Unknown realtime broker '{backend}', using in-process fan-out")
+    return InProcessBroker()
@@ -0,0 +1,42 @@
+import json
+import logging
+from typing import Dict, Any, Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+# msgpack is optional; without it only JSON is offered to clients
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+    logger.warning("msgpack is not installed; realtime sockets only offer JSON encoding")
+
+ENCODINGS: List[str] = [JSON] + ([MSGPACK] if HAS_MSGPACK else [])
+
+def negotiate_encoding(requested: str, offered: Iterable[str] = ()) -> str:
+    """Pick the wire encoding for a socket from the client's connect-time request.
+
+    ``requested`` is the ``?encoding=`` query parameter; without it the first
+    supported WebSocket subprotocol the client ``offered`` is used.
+    """
+    requested = (requested or "").lower()
+    if requested:
+        if requested in ENCODINGS:
+            return requested
+        logger.warning(f"Realtime client asked for unsupported encoding {requested!r}; using JSON")
+        return JSON
+    for subprotocol in offered:
+        if subprotocol.lower() in ENCODINGS:
+            return subprotocol.lower()
+    return JSON
+
+def encode_message(message: Dict[str, Any], encoding: str = JSON) -> Union[str, bytes]:
+    """Serialize a realtime message; JSON yields a text frame, MessagePack a binary one"""
+    if encoding == MSGPACK:
+        return msgpack.packb(message, use_bin_type=True, default=str)
+    # Same compact form as Starlette's WebSocket.send_json
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
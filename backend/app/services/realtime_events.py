@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque, OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Event types a reconnecting client needs replayed; stats are snapshots and
+# are simply re-sent on connect instead
+REPLAYABLE_EVENT_TYPES = {"new_post", "new_posts_batch", "sentiment_alert"}
+
+SPILL_PRUNE_INTERVAL = 3600  # seconds
+
+class SqlEventSpill:
+    """Durable copy of the event log in the application database.
+
+    Serves replays the in-memory ring can no longer answer - long
+    disconnects, or any reconnect after a restart or deploy - and lets
+    sequence numbers continue where the previous process stopped. Methods
+    are blocking and meant to run in a worker thread.
+    """
+
+    def __init__(self, retention_hours: int):
+        self.retention = timedelta(hours=retention_hours)
+
+    def append(self, user_id: int, event: Dict[str, Any]):
+        from app.core.database import SessionLocal, insert_ignore
+        from app.models.social_data import RealtimeEvent
+
+        db = SessionLocal()
+        try:
+            db.execute(insert_ignore(RealtimeEvent).values(
+                user_id=user_id,
+                seq=event["seq"],
+                event_type=event["type"],
+                payload=event
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def last_seq(self, user_id: int) -> int:
+        from sqlalchemy import func
+        from app.core.database import SessionLocal
+        from app.models.social_data import RealtimeEvent
+
+        db = SessionLocal()
+        try:
+            return db.query(func.max(RealtimeEvent.seq)).filter(RealtimeEvent.user_id == user_id).scalar() or 0
+        finally:
+            db.close()
+
+    def since(self, user_id: int, last_seq: int, limit: int) -> List[Dict[str, Any]]:
+        from app.core.database import SessionLocal
+        from app.models.social_data import RealtimeEvent
+
+        db = SessionLocal()
+        try:
+            rows = db.query(RealtimeEvent.payload).filter(
+                RealtimeEvent.user_id == user_id,
+                RealtimeEvent.seq > last_seq
+            ).order_by(RealtimeEvent.seq).limit(limit).all()
+            return [row.payload for row in rows]
+        finally:
+            db.close()
+
+    def prune(self) -> int:
+        """Delete events older than the retention window"""
+        from app.core.database import SessionLocal
+        from app.models.social_data import RealtimeEvent
+
+        db = SessionLocal()
+        try:
+            deleted = db.query(RealtimeEvent).filter(
+                RealtimeEvent.created_at < datetime.now() - self.retention
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+class SqlEventSequence:
+    """Per-user sequence numbers allocated in the application database.
+
+    Each allocation is a single ``INSERT ... ON CONFLICT DO UPDATE ...
+    RETURNING`` on the user's counter row, so workers sharing the database
+    never hand out the same seq. A user's first counter starts above any
+    event already spilled for them.
+    """
+
+    def _next(self, user_id: int) -> int:
+        from sqlalchemy import select, func, literal
+        from app.core.database import SessionLocal, dialect_insert
+        from app.models.social_data import RealtimeEvent, RealtimeEventSequence
+
+        first = select(
+            literal(user_id), func.coalesce(func.max(RealtimeEvent.seq), 0) + 1
+        ).where(RealtimeEvent.user_id == user_id)
+        statement = dialect_insert(RealtimeEventSequence).from_select(
+            ["user_id", "seq"], first
+        ).on_conflict_do_update(
+            index_elements=[RealtimeEventSequence.user_id],
+            set_={"seq": RealtimeEventSequence.seq + 1}
+        ).returning(RealtimeEventSequence.seq)
+
+        db = SessionLocal()
+        try:
+            seq = db.execute(statement).scalar_one()
+            db.commit()
+            return seq
+        finally:
+            db.close()
+
+    async def next_seq(self, user_id: int, floor: int = 0) -> int:
+        return await asyncio.to_thread(self._next, user_id)
+
+class RedisEventSequence:
+    """Per-user sequence numbers allocated with Redis ``INCR``"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    async def next_seq(self, user_id: int, floor: int = 0) -> int:
+        key = f"realtime_seq_{user_id}"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            # A counter lost with Redis resumes above the highest seq already spilled
+            pipe.set(key, floor, nx=True)
+            pipe.incr(key)
+            _, seq = await pipe.execute()
+        return int(seq)
+
+    async def close(self):
+        await self._redis.close()
+
+class UserEventLog:
+    """Append-only per-user log of replayable realtime events.
+
+    Every recorded event gets a per-user, monotonically increasing ``seq``
+    so clients can resume from the last event they saw. With several
+    workers the seq comes from a shared ``sequence`` (Redis or the
+    database); without one it is counted in this process. Recent events
+    live in a bounded in-memory ring (``capacity`` events for each of at
+    most ``max_users`` users), kept in seq order as other workers' events
+    arrive; with a ``spill`` store every event is also written to the
+    database, and replays the ring cannot cover are read from there.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        max_users: int = 10000,
+        spill: Optional[SqlEventSpill] = None,
+        max_replay: int = 1000,
+        sequence=None
+    ):
+        self.capacity = capacity
+        self.max_users = max_users
+        self.spill = spill
+        self.max_replay = max_replay
+        self.sequence = sequence
+        self._events: "OrderedDict[int, deque]" = OrderedDict()
+        self._last_seq: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._seed_lock = asyncio.Lock()
+        self._last_prune = time.monotonic()
+
+    async def record(self, user_id: int, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Assign the next sequence number to an event and append it"""
+        if self.spill and user_id not in self._last_seq:
+            async with self._seed_lock:
+                if user_id not in self._last_seq:
+                    last_seq = await asyncio.to_thread(self.spill.last_seq, user_id)
+                    with self._lock:
+                        self._last_seq.setdefault(user_id, last_seq)
+
+        if self.sequence:
+            try:
+                seq = await self.sequence.next_seq(user_id, self.last_seq(user_id))
+            except Exception as e:
+                logger.error(f"Failed to allocate a realtime event seq for user {user_id}: {e}")
+                # Still delivered live, just not replayable
+                return message
+            event = {**message, "seq": seq}
+            with self._lock:
+                self._append(user_id, event)
+        else:
+            with self._lock:
+                event = {**message, "seq": self._last_seq.get(user_id, 0) + 1}
+                self._append(user_id, event)
+
+        if self.spill:
+            try:
+                await asyncio.to_thread(self.spill.append, user_id, event)
+            except Exception as e:
+                logger.error(f"Failed to spill realtime event {event['seq']} for user {user_id}: {e}")
+
+            if time.monotonic() - self._last_prune > SPILL_PRUNE_INTERVAL:
+                self._last_prune = time.monotonic()
+                asyncio.ensure_future(asyncio.to_thread(self.spill.prune))
+        return event
+
+    def observe(self, user_id: int, event: Dict[str, Any]) -> None:
+        """Buffer an event sequenced by another worker, ignoring ones already held"""
+        with self._lock:
+            self._append(user_id, event)
+
+    def _append(self, user_id: int, event: Dict[str, Any]):
+        seq = event["seq"]
+        self._last_seq[user_id] = max(self._last_seq.get(user_id, 0), seq)
+        events = self._events.get(user_id)
+        if events is None:
+            events = self._events[user_id] = deque(maxlen=self.capacity)
+            while len(self._events) > self.max_users:
+                evicted, _ = self._events.popitem(last=False)
+                self._last_seq.pop(evicted, None)
+        self._events.move_to_end(user_id)
+
+        if not events or seq > events[-1]["seq"]:
+            events.append(event)
+            return
+
+        # Workers publish concurrently, so a lower seq can arrive after a higher one
+        position = len(events)
+        while position and events[position - 1]["seq"] > seq:
+            position -= 1
+        if position and events[position - 1]["seq"] == seq:
+            return
+        if len(events) == events.maxlen:
+            if position == 0:
+                return  # Older than everything the ring still holds
+            events.popleft()
+            position -= 1
+        events.insert(position, event)
+
+    def _ring_since(self, user_id: int, last_seq: int) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            events = self._events.get(user_id)
+            if not events:
+                if self.spill or self.sequence:
+                    return None  # Other workers or earlier processes may hold the events
+                return [] if last_seq == self._last_seq.get(user_id, 0) else None
+            if last_seq < events[0]["seq"] - 1 or last_seq > events[-1]["seq"]:
+                return None
+            missed = [event for event in events if event["seq"] > last_seq]
+        # An event another worker sequenced may not have reached this one yet
+        if any(event["seq"] != last_seq + offset for offset, event in enumerate(missed, 1)):
+            return None
+        return missed
+
+    async def since(self, user_id: int, last_seq: int) -> Optional[List[Dict[str, Any]]]:
+        """Events after ``last_seq``, or None when the gap cannot be replayed
+        (events already pruned, too many missed, or a sequence never issued)"""
+        events = self._ring_since(user_id, last_seq)
+        if events is None and self.spill:
+            try:
+                events = await asyncio.to_thread(self.spill.since, user_id, last_seq, self.max_replay + 1)
+                if not events:
+                    current = await asyncio.to_thread(self.spill.last_seq, user_id)
+                    events = [] if last_seq == current else None
+                elif events[0]["seq"] != last_seq + 1:
+                    events = None
+            except Exception as e:
+                logger.error(f"Failed to read spilled realtime events for user {user_id}: {e}")
+                events = None
+
+        if events is not None and len(events) > self.max_replay:
+            # Reloading the dashboard is cheaper than replaying this much
+            return None
+        return events
+
+    def last_seq(self, user_id: int) -> int:
+        with self._lock:
+            return self._last_seq.get(user_id, 0)
+
+def create_event_log() -> UserEventLog:
+    """Build the event log configured by the REALTIME_* replay settings.
+
+    Sequence numbers are allocated in Redis with the Redis broker, and in
+    the database with the Postgres broker or when events are spilled; only
+    a single in-process deployment counts them locally.
+    """
+    spill = SqlEventSpill(settings.REALTIME_EVENT_LOG_RETENTION_HOURS) if settings.REALTIME_EVENT_LOG_SPILL else None
+    backend = settings.REALTIME_BROKER.lower()
+    if backend == "redis":
+        sequence = RedisEventSequence(settings.REDIS_URL)
+    elif backend == "postgres" or spill:
+        sequence = SqlEventSequence()
+    else:
+        sequence = None
+    return UserEventLog(
+        settings.REALTIME_REPLAY_BUFFER_SIZE,
+        spill=spill,
+        max_replay=settings.REALTIME_REPLAY_MAX_EVENTS,
+        sequence=sequence
+    )
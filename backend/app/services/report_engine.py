@@ -0,0 +1,365 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, update, and_, or_, null
+from sqlalchemy.orm import Session
+
+from app.models.social_data import SocialPost, AnalyticsData
+from app.services.ai_analytics import AIAnalyticsService
+from app.services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Topics kept per daily rollup; report topic counts are summed over these
+ROLLUP_TOPICS = 20
+
+# Days cleared per UPDATE by stale_rollup_updates
+STALE_DAYS_PER_STATEMENT = 100
+
+def day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def utc_naive(moment: datetime) -> datetime:
+    """Naive UTC datetime, the form rollup dates are stored and compared in"""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+def rollup_range(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """The period ``daily_rollups(start, end)`` actually covers, in naive UTC.
+
+    Rollups are whole days, so the range widens to midnight on both ends,
+    and ends no later than now since the current day is aggregated live.
+    """
+    start, end = utc_naive(start), utc_naive(end)
+    end_day = day_start(end)
+    aligned_end = end_day if end == end_day else end_day + timedelta(days=1)
+    return day_start(start), min(aligned_end, datetime.utcnow())
+
+def stale_rollup_updates(user_id: int, posted_at: Iterable[datetime]) -> List[Any]:
+    """UPDATE statements clearing the rollups of the days new posts fall into.
+
+    Rollups are stored once per finished day, so posts that land on a day
+    later - dataset imports of historical posts, late collector runs - would
+    otherwise never be counted. Ingest executes these in the transaction that
+    saves the posts; clearing platform_stats makes the next read rebuild the
+    day while keeping other columns, such as trending keywords.
+    """
+    days = sorted({day_start(utc_naive(moment)) for moment in posted_at})
+    statements = []
+    for start in range(0, len(days), STALE_DAYS_PER_STATEMENT):
+        ranges = [
+            and_(AnalyticsData.date >= day, AnalyticsData.date < day + timedelta(days=1))
+            for day in days[start:start + STALE_DAYS_PER_STATEMENT]
+        ]
+        statements.append(
+            update(AnalyticsData)
+            .where(AnalyticsData.user_id == user_id, or_(*ranges))
+            .values(platform_stats=null())
+            .execution_options(synchronize_session=False)
+        )
+    return statements
+
+class ReportEngine:
+    """Builds reports from per-day rollups instead of rescanning posts.
+
+    Each finished day is aggregated once into its AnalyticsData row: post and
+    engagement totals, sentiment counts, per-platform stats and top topics.
+    Ingest clears a day's rollup when it saves posts into it (see
+    ``stale_rollup_updates``), and the next read aggregates the day again.
+    A report over N days then reads N rollup rows and aggregates only the
+    still-open current day from posts. Rollups use the sentiment and topics
+    stored on each post; posts saved without them are analysed once and the
+    result is written back, so no post is ever scored twice.
+    """
+
+    def __init__(self, ai_service: Optional[AIAnalyticsService] = None):
+        self.ai_service = ai_service or AIAnalyticsService()
+
+    def _fill_missing_analysis(self, db: Session, user_ids: List[int], start: datetime, end: datetime):
+        """Score and tag posts in the range that were saved without analysis"""
+        missing = db.query(SocialPost).filter(
+            SocialPost.user_id.in_(user_ids),
+            SocialPost.posted_at >= start,
+            SocialPost.posted_at < end,
+            (SocialPost.sentiment.is_(None)) | (SocialPost.topics.is_(None))
+        ).all()
+        for post in missing:
+            if post.sentiment is None:
+                analysis = self.ai_service.analyze_sentiment(post.content)
+                post.sentiment = analysis['sentiment']
+                post.sentiment_score = analysis['scores']['vader']['compound']
+            if post.topics is None:
+                post.topics = self.ai_service.extract_topics(post.content)
+        if missing:
+            db.commit()
+            for user_id in {post.user_id for post in missing}:
+                response_cache.invalidate_user_sync(user_id)
+
+    def aggregate_users(self, db: Session, user_ids: List[int], start: datetime, end: datetime) -> Dict[int, Dict[str, Any]]:
+        """Aggregate posts in [start, end) for many users with one grouped query"""
+        self._fill_missing_analysis(db, user_ids, start, end)
+
+        rows = db.query(
+            SocialPost.user_id,
+            SocialPost.platform,
+            SocialPost.sentiment,
+            func.count(SocialPost.id),
+            func.coalesce(func.sum(SocialPost.likes + SocialPost.shares + SocialPost.comments), 0)
+        ).filter(
+            SocialPost.user_id.in_(user_ids),
+            SocialPost.posted_at >= start,
+            SocialPost.posted_at < end
+        ).group_by(SocialPost.user_id, SocialPost.platform, SocialPost.sentiment).all()
+
+        sentiment_counts: Dict[int, Counter] = {user_id: Counter() for user_id in user_ids}
+        platform_stats: Dict[int, Dict[str, Dict[str, int]]] = {user_id: {} for user_id in user_ids}
+        for user_id, platform, sentiment, count, engagement in rows:
+            sentiment_counts[user_id][sentiment or 'neutral'] += count
+            stats = platform_stats[user_id].setdefault(platform, {'posts': 0, 'engagement': 0})
+            stats['posts'] += count
+            stats['engagement'] += int(engagement)
+
+        topic_counts: Dict[int, Counter] = {user_id: Counter() for user_id in user_ids}
+        for user_id, topics in db.query(SocialPost.user_id, SocialPost.topics).filter(
+            SocialPost.user_id.in_(user_ids),
+            SocialPost.posted_at >= start,
+            SocialPost.posted_at < end
+        ):
+            topic_counts[user_id].update(topics or [])
+
+        rollups = {}
+        for user_id in user_ids:
+            stats = platform_stats[user_id]
+            total_posts = sum(item['posts'] for item in stats.values())
+            total_engagement = sum(item['engagement'] for item in stats.values())
+            rollups[user_id] = {
+                'date': start,
+                'total_posts': total_posts,
+                'sentiment_positive': sentiment_counts[user_id]['positive'],
+                'sentiment_negative': sentiment_counts[user_id]['negative'],
+                'sentiment_neutral': sentiment_counts[user_id]['neutral'],
+                'platform_stats': stats,
+                'total_engagement': total_engagement,
+                'avg_engagement': total_engagement / total_posts if total_posts else 0,
+                'top_topics': [
+                    {'topic': topic, 'count': count}
+                    for topic, count in topic_counts[user_id].most_common(ROLLUP_TOPICS)
+                ]
+            }
+        return rollups
+
+    def aggregate_day(self, db: Session, user_id: int, start: datetime, end: datetime) -> Dict[str, Any]:
+        """Aggregate one user's posts in [start, end)"""
+        return self.aggregate_users(db, [user_id], start, end)[user_id]
+
+    def rollups_for_day(self, db: Session, user_ids: List[int], day: datetime) -> Dict[int, Dict[str, Any]]:
+        """One finished day's rollups for many users, aggregating and storing
+        the missing ones in a single set-based pass"""
+        records = {
+            record.user_id: record
+            for record in db.query(AnalyticsData).filter(
+                AnalyticsData.user_id.in_(user_ids),
+                AnalyticsData.date >= day,
+                AnalyticsData.date < day + timedelta(days=1)
+            )
+        }
+
+        missing = [user_id for user_id in user_ids if user_id not in records or records[user_id].platform_stats is None]
+        if missing:
+            aggregates = self.aggregate_users(db, missing, day, day + timedelta(days=1))
+            for user_id, aggregate in aggregates.items():
+                record = records.get(user_id)
+                if record is None:
+                    record = records[user_id] = AnalyticsData(user_id=user_id, date=day)
+                    db.add(record)
+                self._apply(record, aggregate)
+
+        # Read before committing so the rows aren't reloaded one by one
+        rollups = {user_id: self._record_to_rollup(records[user_id]) for user_id in user_ids}
+        if missing:
+            db.commit()
+        return rollups
+
+    def _apply(self, record: AnalyticsData, aggregate: Dict[str, Any]):
+        for field, value in aggregate.items():
+            if field != 'date':
+                setattr(record, field, value)
+
+    def daily_rollups(self, db: Session, user_id: int, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Per-day aggregates covering [start, end), computing only what is missing.
+
+        Finished days are read from AnalyticsData, or aggregated and stored
+        when absent; the current day is always aggregated live and not stored.
+        A row counts as a rollup once platform_stats is set - other writers,
+        such as trending keywords, may create the day's row before that.
+        """
+        first_day = day_start(start)
+        today = day_start(datetime.utcnow())
+
+        records = {
+            day_start(record.date.replace(tzinfo=None)): record
+            for record in db.query(AnalyticsData).filter(
+                AnalyticsData.user_id == user_id,
+                AnalyticsData.date >= first_day,
+                AnalyticsData.date < min(end, today)
+            )
+        }
+
+        rollups = []
+        day = first_day
+        while day < end:
+            next_day = day + timedelta(days=1)
+            if day >= today:
+                rollups.append(self.aggregate_day(db, user_id, day, next_day))
+            else:
+                record = records.get(day)
+                if record is None or record.platform_stats is None:
+                    aggregate = self.aggregate_day(db, user_id, day, next_day)
+                    if record is None:
+                        record = AnalyticsData(user_id=user_id, date=day)
+                        db.add(record)
+                    self._apply(record, aggregate)
+                    db.commit()
+                rollups.append(self._record_to_rollup(record))
+            day = next_day
+
+        return rollups
+
+    def _record_to_rollup(self, record: AnalyticsData) -> Dict[str, Any]:
+        return {
+            'date': record.date,
+            'total_posts': record.total_posts or 0,
+            'sentiment_positive': int(record.sentiment_positive or 0),
+            'sentiment_negative': int(record.sentiment_negative or 0),
+            'sentiment_neutral': int(record.sentiment_neutral or 0),
+            'platform_stats': record.platform_stats or {},
+            'total_engagement': record.total_engagement or 0,
+            'avg_engagement': record.avg_engagement or 0,
+            'top_topics': record.top_topics or [],
+            'trending_keywords': record.trending_keywords or []
+        }
+
+    def compose_insights(
+        self,
+        rollups: List[Dict[str, Any]],
+        trending_keywords: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Combine daily rollups into the insights shape generate_insights returns"""
+        sentiment_counts: Counter = Counter()
+        platforms: Counter = Counter()
+        topics: Counter = Counter()
+        total_posts = 0
+        total_engagement = 0
+        for rollup in rollups:
+            total_posts += rollup['total_posts']
+            total_engagement += rollup['total_engagement']
+            for sentiment in ('positive', 'negative', 'neutral'):
+                sentiment_counts[sentiment] += rollup[f'sentiment_{sentiment}']
+            for platform, stats in rollup['platform_stats'].items():
+                platforms[platform] += stats['posts']
+            for item in rollup['top_topics']:
+                topics[item['topic']] += item['count']
+
+        if trending_keywords is None:
+            # Latest stored trending terms, from the rollups themselves
+            trending_keywords = next(
+                (rollup['trending_keywords'] for rollup in reversed(rollups) if rollup.get('trending_keywords')),
+                []
+            )
+
+        sentiment_distribution = {k: v for k, v in sentiment_counts.items() if v}
+        top_topics = topics.most_common(10)
+        platform_breakdown = dict(platforms)
+        insights = {
+            'total_posts': total_posts,
+            'sentiment_distribution': sentiment_distribution,
+            'platform_breakdown': platform_breakdown,
+            'total_engagement': total_engagement,
+            'avg_engagement_per_post': total_engagement / total_posts if total_posts else 0,
+            'top_topics': top_topics,
+            'trending_keywords': trending_keywords,
+            'sentiment_trend': self._sentiment_trend(rollups),
+            'recommendations': self.ai_service._generate_recommendations(
+                sentiment_distribution, platform_breakdown, top_topics, trending_keywords
+            ) if total_posts else []
+        }
+        insights['key_insights'] = self._key_insights(insights)
+        return insights
+
+    def _key_insights(self, insights: Dict[str, Any]) -> List[str]:
+        """The headline findings, one sentence each, stored as a report's insights"""
+        total_posts = insights['total_posts']
+        if not total_posts:
+            return []
+
+        findings = [
+            f"{total_posts} posts drew {insights['total_engagement']} engagements "
+            f"({insights['avg_engagement_per_post']:.1f} per post)"
+        ]
+        sentiment = sorted(insights['sentiment_distribution'].items(), key=lambda item: item[1], reverse=True)
+        if sentiment:
+            findings.append("Sentiment: " + ", ".join(
+                f"{count / total_posts:.0%} {label}" for label, count in sentiment
+            ))
+        if insights['sentiment_trend'] != "insufficient_data":
+            findings.append(f"Sentiment is {insights['sentiment_trend']} over the period")
+        if insights['platform_breakdown']:
+            platform, posts = max(insights['platform_breakdown'].items(), key=lambda item: item[1])
+            findings.append(f"Most active platform: {platform} ({posts / total_posts:.0%} of posts)")
+        if insights['top_topics']:
+            findings.append("Top topics: " + ", ".join(topic for topic, _ in insights['top_topics'][:3]))
+        if insights['trending_keywords']:
+            findings.append("Trending: " + ", ".join(
+                f"'{item['keyword']}'" for item in insights['trending_keywords'][:3]
+            ))
+        return findings
+
+    def _sentiment_trend(self, rollups: List[Dict[str, Any]]) -> str:
+        """Compare the net sentiment of the latest days with the earliest ones"""
+        active = [r for r in rollups if r['total_posts']]
+        if len(active) < 2:
+            return "insufficient_data"
+
+        def net(days):
+            posts = sum(r['total_posts'] for r in days)
+            return sum(r['sentiment_positive'] - r['sentiment_negative'] for r in days) / posts
+
+        third = max(len(active) // 3, 1)
+        change = net(active[-third:]) - net(active[:third])
+        if change > 0.1:
+            return "improving"
+        elif change < -0.1:
+            return "declining"
+        return "stable"
+
+    def build_report(
+        self,
+        db: Session,
+        user_id: int,
+        report_type: str,
+        start: datetime,
+        end: datetime,
+        trending_keywords: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[Dict[str, Any], str]:
+        """Insights and rendered report for a user over whole days from start to end"""
+        insights = self.compose_insights(self.daily_rollups(db, user_id, start, end), trending_keywords)
+        return insights, self.ai_service.generate_business_report(insights, report_type)
+
+def build_user_report(
+    user_id: int,
+    report_type: str,
+    start: datetime,
+    end: datetime,
+    trending_keywords: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[Dict[str, Any], str]:
+    """Build a report in its own session (blocking - run it in a thread)"""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return report_engine.build_report(db, user_id, report_type, start, end, trending_keywords)
+    finally:
+        db.close()
+
+report_engine = ReportEngine()
@@ -0,0 +1,187 @@
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.services.email_service import EmailService
+from app.services.email_templates import RenderedEmail
+from app.services.email_outbox import email_outbox, enqueue_emails, outbox_row
+from app.services.report_engine import report_engine, day_start
+
+logger = logging.getLogger(__name__)
+
+def load_report_recipients(frequency: str) -> List[Dict[str, Any]]:
+    """Active users with email reports enabled at the given frequency"""
+    from app.core.database import SessionLocal
+    from app.models.user import User
+    from app.models.social_data import NotificationSettings
+
+    db = SessionLocal()
+    try:
+        rows = db.query(User.id, User.email, User.full_name).join(
+            NotificationSettings, NotificationSettings.user_id == User.id
+        ).filter(
+            User.is_active == True,
+            NotificationSettings.email_reports == True,
+            NotificationSettings.report_frequency == frequency
+        ).all()
+        return [{'id': row.id, 'email': row.email, 'name': row.full_name or row.email} for row in rows]
+    finally:
+        db.close()
+
+def _rollups_for_day(user_ids: List[int], day: datetime) -> Dict[int, Dict[str, Any]]:
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return report_engine.rollups_for_day(db, user_ids, day)
+    finally:
+        db.close()
+
+def _render_batch(jobs: List[Tuple[int, Dict[str, Any], str]]) -> List[Tuple[int, str]]:
+    """Process-pool entry point: render report bodies for (user_id, insights, report_type) jobs"""
+    from app.services.ai_analytics import AIAnalyticsService
+
+    service = AIAnalyticsService()
+    return [(user_id, service.generate_business_report(insights, report_type)) for user_id, insights, report_type in jobs]
+
+def _insert_reports(rows: List[Dict[str, Any]], emails: Dict[int, Tuple[str, RenderedEmail]]) -> Dict[int, int]:
+    """Bulk-insert Report rows and their outbox emails in one transaction,
+    returning report ids keyed by user id"""
+    from app.core.database import SessionLocal
+    from app.models.social_data import Report
+
+    db = SessionLocal()
+    try:
+        report_ids = {}
+        for start in range(0, len(rows), settings.REPORT_INSERT_BATCH_SIZE):
+            result = db.execute(
+                insert(Report).returning(Report.id, Report.user_id),
+                rows[start:start + settings.REPORT_INSERT_BATCH_SIZE]
+            )
+            report_ids.update({user_id: report_id for report_id, user_id in result.all()})
+        enqueue_emails([
+            outbox_row(to_email, email.subject, email.html, "html", report_ids[user_id], email.text)
+            for user_id, (to_email, email) in emails.items()
+        ], db)
+        db.commit()
+        return report_ids
+    finally:
+        db.close()
+
+class DailyReportPipeline:
+    """Generates and mails every eligible user's daily report in one batch.
+
+    Stages run set-based rather than per user: rollups for a chunk of users
+    come from one grouped query, report bodies render in a process pool,
+    and Report rows are bulk-inserted together with their outbox emails.
+    The outbox is then drained until the time budget runs out; whatever is
+    left is delivered by the outbox worker. Each run returns per-stage
+    timings.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        render_workers: int,
+        time_budget: float,
+        email_service: Optional[EmailService] = None
+    ):
+        self.chunk_size = chunk_size
+        self.render_workers = render_workers or os.cpu_count() or 1
+        self.time_budget = time_budget
+        self.email_service = email_service or EmailService()
+
+    async def run(self, day: Optional[datetime] = None, report_type: str = "daily") -> Dict[str, Any]:
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        day = day_start(day or datetime.utcnow() - timedelta(days=1))
+        timings: Dict[str, float] = {}
+
+        def lap(stage: str, since: float) -> float:
+            now = time.monotonic()
+            timings[stage] = round(now - since, 3)
+            return now
+
+        stage_start = started
+        users = await asyncio.to_thread(load_report_recipients, report_type)
+        stage_start = lap('load_recipients', stage_start)
+
+        rollups: Dict[int, Dict[str, Any]] = {}
+        user_ids = [user['id'] for user in users]
+        for start in range(0, len(user_ids), self.chunk_size):
+            rollups.update(await asyncio.to_thread(_rollups_for_day, user_ids[start:start + self.chunk_size], day))
+        stage_start = lap('aggregate', stage_start)
+
+        # Users without activity that day get no report
+        active = [user for user in users if rollups[user['id']]['total_posts']]
+        insights = {user['id']: report_engine.compose_insights([rollups[user['id']]]) for user in active}
+        stage_start = lap('compose', stage_start)
+
+        contents: Dict[int, str] = {}
+        if active:
+            jobs = [(user['id'], insights[user['id']], report_type) for user in active]
+            batch_size = max(len(jobs) // (self.render_workers * 4), 1)
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(max_workers=self.render_workers) as pool:
+                batches = await asyncio.gather(*[
+                    loop.run_in_executor(pool, _render_batch, jobs[start:start + batch_size])
+                    for start in range(0, len(jobs), batch_size)
+                ])
+            for batch in batches:
+                contents.update(batch)
+        stage_start = lap('render', stage_start)
+
+        title = f"Daily Business Intelligence Report - {day.strftime('%Y-%m-%d')}"
+        emails = {
+            user['id']: (user['email'], self.email_service.build_report_email(title, contents[user['id']], report_type))
+            for user in active
+        }
+        report_ids = await asyncio.to_thread(_insert_reports, [
+            {
+                'user_id': user['id'],
+                'title': title,
+                'report_type': report_type,
+                'date_range_start': day,
+                'date_range_end': day + timedelta(days=1),
+                'summary': f"{insights[user['id']]['total_posts']} posts, "
+                           f"{insights[user['id']]['total_engagement']} engagements",
+                'insights': insights[user['id']]['key_insights'],
+                'recommendations': insights[user['id']]['recommendations'],
+                'data_snapshot': insights[user['id']],
+                'status': 'generated'
+            }
+            for user in active
+        ], emails)
+        stage_start = lap('persist', stage_start)
+
+        # Deliver now while the budget lasts; the outbox worker picks up the rest
+        delivery = await email_outbox.drain(deadline)
+        lap('send', stage_start)
+
+        summary = {
+            'day': day.date().isoformat(),
+            'recipients': len(users),
+            'reports': len(report_ids),
+            'skipped_inactive': len(users) - len(active),
+            'sent': delivery['sent'],
+            'failed': delivery['failed'],
+            'deferred': max(len(report_ids) - delivery['claimed'], 0),
+            'timings': timings,
+            'total_seconds': round(time.monotonic() - started, 3),
+            'emails_per_second': round(delivery['sent'] / timings['send'], 1) if timings['send'] else 0.0
+        }
+        logger.info(f"Daily report batch: {summary}")
+        return summary
+
+daily_report_pipeline = DailyReportPipeline(
+    settings.REPORT_BATCH_CHUNK_SIZE,
+    settings.REPORT_RENDER_WORKERS,
+    settings.REPORT_BATCH_TIME_BUDGET
+)
@@ -0,0 +1,246 @@
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Endpoint arguments that identify the caller rather than the query
+IGNORED_PARAMS = {"request", "current_user", "db"}
+
+# Seconds a worker thread waits for its bump to run on the event loop
+BUMP_TIMEOUT = 5.0
+
+# (data version, etag, JSON body, stored at)
+CacheEntry = Tuple[int, str, bytes, float]
+
+class ResponseCacheBackend:
+    """Storage for cached responses and per-user data versions.
+
+    A user's data version changes whenever their posts change. Entries
+    remember the version they were computed at and are only served while it
+    is still current, so they are invalidated exactly when data lands.
+    Versions are wall-clock nanoseconds rather than counters, so a version
+    that is lost - a restart, an evicted key - can never come back and
+    match an older entry.
+    """
+
+    async def lookup(self, user_id: int, key: str) -> Tuple[int, Optional[CacheEntry]]:
+        """Current data version of the user and the entry stored under key"""
+        raise NotImplementedError
+
+    async def store(self, key: str, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    async def bump(self, user_id: int) -> None:
+        """Invalidate the user's entries"""
+        raise NotImplementedError
+
+class MemoryCacheBackend(ResponseCacheBackend):
+    """In-process LRU; versions are local, so use one worker or Redis"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    async def lookup(self, user_id: int, key: str) -> Tuple[int, Optional[CacheEntry]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return self._versions.get(user_id, 0), entry
+
+    async def store(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def bump(self, user_id: int) -> None:
+        with self._lock:
+            self._versions[user_id] = time.time_ns()
+
+class RedisCacheBackend(ResponseCacheBackend):
+    """Redis backend shared by all workers; version and entry come back in one MGET"""
+
+    def __init__(self, url: str, max_age: float):
+        import redis.asyncio as redis_async
+
+        self.max_age = max_age
+        self._redis = redis_async.from_url(url)
+
+    def _version_key(self, user_id: int) -> str:
+        return f"response_cache:version:{user_id}"
+
+    async def lookup(self, user_id: int, key: str) -> Tuple[int, Optional[CacheEntry]]:
+        version, raw = await self._redis.mget(self._version_key(user_id), key)
+        entry = None
+        if raw is not None:
+            header, body = raw.split(b"\n", 1)
+            entry_version, etag, stored_at = json.loads(header)
+            entry = (entry_version, etag, body, stored_at)
+        return int(version or 0), entry
+
+    async def store(self, key: str, entry: CacheEntry) -> None:
+        version, etag, body, stored_at = entry
+        header = json.dumps([version, etag, stored_at]).encode()
+        await self._redis.set(key, header + b"\n" + body, ex=max(int(self.max_age), 1))
+
+    async def bump(self, user_id: int) -> None:
+        await self._redis.set(self._version_key(user_id), time.time_ns())
+
+class ResponseCache:
+    """Caches JSON endpoint responses per (user, endpoint, params, data version).
+
+    Responses carry a strong ETag of their body; a request whose
+    If-None-Match matches the current entry gets an empty 304. Entries also
+    expire after ``max_age`` seconds, since endpoints over rolling date
+    windows drift even when no new data arrives.
+    """
+
+    def __init__(self, backend: Optional[ResponseCacheBackend], max_age: float):
+        self.backend = backend
+        self.max_age = max_age
+        self.stats = {"hits": 0, "not_modified": 0, "misses": 0}
+        # The app's event loop, which owns the backend's connections
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        """Remember the running event loop so worker threads can hand bumps to it"""
+        self._loop = asyncio.get_running_loop()
+
+    async def invalidate_user(self, user_id: int):
+        """Mark the user's data as changed; await after committing new or updated posts"""
+        if self.backend is None:
+            return
+        try:
+            await self.backend.bump(user_id)
+        except Exception as e:
+            logger.error(f"Failed to bump response cache version for user {user_id}: {e}")
+
+    def invalidate_user_sync(self, user_id: int):
+        """``invalidate_user`` for synchronous code.
+
+        Worker threads run the bump on the app's event loop and wait for it.
+        Sync code on the loop itself only schedules it, since waiting there
+        would block the loop.
+        """
+        if self.backend is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is not None:
+            asyncio.ensure_future(self.invalidate_user(user_id))
+        elif self._loop is not None and self._loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(self.invalidate_user(user_id), self._loop)
+            try:
+                future.result(timeout=BUMP_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Failed to bump response cache version for user {user_id}: {e}")
+        else:
+            # Outside the app (scripts, tests) there is no loop to hand it to
+            asyncio.run(self.invalidate_user(user_id))
+
+    def _key(self, user_id: int, endpoint: str, params: Dict[str, Any]) -> str:
+        digest = hashlib.blake2b(
+            json.dumps(params, sort_keys=True, default=str).encode(), digest_size=12
+        ).hexdigest()
+        return f"response_cache:{user_id}:{endpoint}:{digest}"
+
+    def _response(self, request: Request, etag: str, body: bytes) -> Response:
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if etag in tags or "*" in tags:
+                self.stats["not_modified"] += 1
+                return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def respond(
+        self,
+        request: Request,
+        user_id: int,
+        endpoint: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        if self.backend is None:
+            return await compute()
+
+        key = self._key(user_id, endpoint, params)
+        try:
+            version, entry = await self.backend.lookup(user_id, key)
+        except Exception as e:
+            logger.error(f"Response cache lookup failed: {e}")
+            return await compute()
+
+        if entry is not None and entry[0] == version and time.time() - entry[3] < self.max_age:
+            self.stats["hits"] += 1
+            return self._response(request, entry[1], entry[2])
+
+        # Stored under the version read before computing, so a bump that
+        # lands meanwhile invalidates this entry too
+        self.stats["misses"] += 1
+        result = await compute()
+        if isinstance(result, Response):
+            return result
+        body = json.dumps(jsonable_encoder(result)).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        try:
+            await self.backend.store(key, (version, etag, body, time.time()))
+        except Exception as e:
+            logger.error(f"Response cache store failed: {e}")
+        return self._response(request, etag, body)
+
+def cached_endpoint(endpoint: str):
+    """Serve a per-user JSON endpoint through the response cache.
+
+    The endpoint must take ``request: Request`` and ``current_user``; all
+    other arguments except ``db`` become part of the cache key.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            params = {name: value for name, value in kwargs.items() if name not in IGNORED_PARAMS}
+            return await response_cache.respond(
+                kwargs["request"],
+                kwargs["current_user"].id,
+                endpoint,
+                params,
+                lambda: func(*args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+def create_response_cache(backend: Optional[str] = None) -> ResponseCache:
+    """Build the cache configured by RESPONSE_CACHE_BACKEND (memory, redis or off)"""
+    backend = (backend or settings.RESPONSE_CACHE_BACKEND).lower()
+    if backend == "off":
+        return ResponseCache(None, settings.RESPONSE_CACHE_MAX_AGE)
+    if backend == "redis":
+        return ResponseCache(
+            RedisCacheBackend(settings.REDIS_URL, settings.RESPONSE_CACHE_MAX_AGE),
+            settings.RESPONSE_CACHE_MAX_AGE
+        )
+    if backend != "memory":
+        logger.warning(f"Unknown response cache backend '{backend}', using in-process LRU")
+    return ResponseCache(MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES), settings.RESPONSE_CACHE_MAX_AGE)
+
+response_cache = create_response_cache()
@@ -1,8 +1,12 @@
 import asyncio
+import logging
+from concurrent.futures import Future
+from functools import partial
 from datetime import datetime, time
 import schedule
 import threading
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Awaitable, Optional
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -11,74 +15,126 @@ from app.core.database import get_db
 from app.services.ai_analytics import AIAnalyticsService
 from app.services.email_service import EmailService
 from app.services.social_collector import SocialDataCollector
+from app.services.alert_engine import alert_engine
+from app.services.anomaly_detector import anomaly_detector, process_anomalies
+from app.services.trending import trending_engine, save_trending_keywords
+from app.services.report_pipeline import daily_report_pipeline
 from app.models.user import User
 from app.models.social_data import NotificationSettings
 from app.schemas.social_data import ReportCreate
 
+logger = logging.getLogger(__name__)
+
 ai_service = AIAnalyticsService()
 email_service = EmailService()
 social_collector = SocialDataCollector()
 
-# Global database session for scheduler
-engine = create_async_engine(settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"))
-AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+# Async drivers for the configured database URL
+ASYNC_DRIVERS = {"postgresql://": "postgresql+asyncpg://", "sqlite:///": "sqlite+aiosqlite:///"}
+
+_async_session_factory = None
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Async session for the scheduler's jobs; the engine is created on first use"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        url = settings.DATABASE_URL
+        for prefix, driver in ASYNC_DRIVERS.items():
+            if url.startswith(prefix):
+                url = driver + url[len(prefix):]
+        engine = create_async_engine(url)
+        _async_session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    return _async_session_factory()
 
 class TaskScheduler:
-    def __init__(self):
+    """Runs periodic jobs from a background thread.
+
+    The jobs are coroutines. When started from the app's event loop they
+    run as tasks on that loop, next to the realtime, alert and trending
+    state they share; started outside a loop, each run gets its own loop
+    in the scheduler thread. A job still running when it comes due again
+    is skipped rather than stacked.
+    """
+
+    def __init__(self, check_interval: float = 60):
+        self.check_interval = check_interval
         self.running = False
         self.thread = None
+        self._schedule = schedule.Scheduler()
+        self._stop = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[str, Future] = {}
 
     def start_scheduler(self):
         """Start the background scheduler"""
         if self.running:
             return
 
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+        self._schedule.clear()
+        self._schedule.every().day.at("09:00").do(self._run_job, self._send_daily_reports)
+        self._schedule.every().day.at("02:00").do(self._run_job, self._collect_social_data)
+        self._schedule.every().hour.do(self._run_job, self._check_alerts)
+        self._schedule.every().hour.do(self._run_job, self._save_trending_keywords)
+
         self.running = True
-        self.thread = threading.Thread(target=self._run_scheduler, daemon=True)
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run_scheduler, name="task-scheduler", daemon=True)
         self.thread.start()
-        print("Task scheduler started")
+        logger.info("Task scheduler started")
 
     def stop_scheduler(self):
         """Stop the background scheduler"""
         self.running = False
+        self._stop.set()
         if self.thread:
             self.thread.join()
-        print("Task scheduler stopped")
+        for future in self._in_flight.values():
+            future.cancel()
+        logger.info("Task scheduler stopped")
 
     def _run_scheduler(self):
         """Run the scheduler loop"""
-        # Schedule daily tasks
-        schedule.every().day.at("09:00").do(self._send_daily_reports)
-        schedule.every().day.at("02:00").do(self._collect_social_data)
-        schedule.every().hour.do(self._check_alerts)
-
         while self.running:
-            schedule.run_pending()
-            asyncio.run(asyncio.sleep(60))  # Check every minute
+            self._schedule.run_pending()
+            self._stop.wait(self.check_interval)
+
+    def _run_job(self, job: Callable[[], Awaitable[Any]]):
+        """Run one due job coroutine to completion or hand it to the app loop"""
+        name = job.__name__
+        previous = self._in_flight.get(name)
+        if previous is not None and not previous.done():
+            logger.warning(f"Scheduled job {name} is still running, skipping this run")
+            return
+
+        if self._loop is None or self._loop.is_closed():
+            try:
+                asyncio.run(job())
+            except Exception as e:
+                logger.error(f"Scheduled job {name} failed: {e}")
+            return
+
+        future = asyncio.run_coroutine_threadsafe(job(), self._loop)
+        future.add_done_callback(partial(self._job_done, name))
+        self._in_flight[name] = future
+
+    def _job_done(self, name: str, future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Scheduled job {name} failed: {future.exception()}")
 
     async def _send_daily_reports(self):
         """Send daily reports to all users who have them enabled"""
         try:
-            async with AsyncSessionLocal() as db:
-                # Get all users with email reports enabled
-                result = await db.execute(
-                    """
-                    SELECT u.*, ns.report_frequency, ns.email_reports
-                    FROM users u
-                    JOIN notification_settings ns ON u.id = ns.user_id
-                    WHERE ns.email_reports = true AND ns.report_frequency = 'daily'
-                    """
-                )
-                users = result.fetchall()
-
-                for user_row in users:
-                    user_dict = dict(user_row)
-                    await self._generate_and_send_report(
-                        user_dict['id'],
-                        user_dict['email'],
-                        user_dict['full_name'] or user_dict['email'],
-                        "daily"
-                    )
+            summary = await daily_report_pipeline.run()
+            print(
+                f"Daily reports: {summary['sent']} sent, {summary['failed']} failed, "
+                f"{summary['deferred']} deferred in {summary['total_seconds']}s"
+            )
+            return summary
 
         except Exception as e:
             print(f"Daily reports task failed: {e}")
@@ -88,7 +144,7 @@ class TaskScheduler:
         try:
             async with AsyncSessionLocal() as db:
                 # Get all active users
-                result = await db.execute("SELECT id FROM users WHERE is_active = true")
+                result = await db.execute(text("SELECT id FROM users WHERE is_active = true"))
                 user_ids = [row[0] for row in result.fetchall()]
 
                 for user_id in user_ids:
@@ -112,17 +168,20 @@ class TaskScheduler:
     async def _check_alerts(self):
         """Check for alerts and send notifications"""
         try:
+            # Close anomaly buckets that ended without new posts, so volume drops are caught
+            await process_anomalies(anomaly_detector.advance())
+
             async with AsyncSessionLocal() as db:
                 # Get users with real-time alerts enabled
-                result = await db.execute(
+                result = await db.execute(text(
                     """
                     SELECT u.*, ns.sentiment_threshold, ns.engagement_threshold, ns.real_time_alerts
                     FROM users u
                     JOIN notification_settings ns ON u.id = ns.user_id
                     WHERE ns.real_time_alerts = true
                     """
-                )
-                users = result.fetchall()
+                ))
+                users = result.mappings().all()
 
                 for user_row in users:
                     user_dict = dict(user_row)
@@ -131,6 +190,16 @@ class TaskScheduler:
         except Exception as e:
             print(f"Alert checking task failed: {e}")
 
+    async def _save_trending_keywords(self):
+        """Persist each active user's 24h trending terms to today's analytics"""
+        for user_id in trending_engine.users():
+            try:
+                items = trending_engine.trending(user_id, "24h")
+                if items:
+                    await asyncio.to_thread(save_trending_keywords, user_id, items, "sketch", True)
+            except Exception as e:
+                print(f"Saving trending keywords failed for user {user_id}: {e}")
+
     async def _generate_and_send_report(
         self,
         user_id: int,
@@ -165,22 +234,14 @@ class TaskScheduler:
             print(f"Failed to send report to {email}: {e}")
 
     async def _check_user_alerts(self, user_dict: Dict[str, Any], db: AsyncSession):
-        """Check alerts for a specific user"""
-        try:
-            user_id = user_dict['id']
-            email = user_dict['email']
-            sentiment_threshold = user_dict['sentiment_threshold']
-            engagement_threshold = user_dict['engagement_threshold']
+        """Check alerts for a specific user.
 
-            # Check recent posts for alerts
-            # This is a simplified version - in reality, you'd check recent analytics
-            # and compare against thresholds
-
-            # Example: Check if sentiment dropped significantly
-            # Example: Check if engagement spiked
-
-            # For demo purposes, we'll skip actual alert logic
-            # In production, this would analyze recent data and send alerts
+        Thresholds are evaluated in-stream as posts are saved; this hourly
+        sweep only re-evaluates windows that moved on without new posts, so
+        cleared conditions re-arm.
+        """
+        try:
+            await alert_engine.evaluate(user_dict['id'])
 
         except Exception as e:
             print(f"Alert check failed for user {user_dict['id']}: {e}")
@@ -199,7 +260,7 @@ def stop_scheduler():
 # Manual trigger functions for testing/admin
 async def trigger_daily_reports():
     """Manually trigger daily reports"""
-    await scheduler._send_daily_reports()
+    return await scheduler._send_daily_reports()
 
 async def trigger_data_collection():
     """Manually trigger data collection"""
@@ -10,7 +10,12 @@ from sqlalchemy import select, and_
 from app.core.config import settings
 from app.models.social_data import SocialPost
 from app.services.ai_analytics import AIAnalyticsService
-from app.api.realtime import notify_new_post
+from app.api.realtime import notify_new_post, flush_new_post_notifications
+from app.services.alert_engine import alert_engine
+from app.services.anomaly_detector import anomaly_detector, process_anomalies
+from app.services.trending import trending_engine
+from app.services.response_cache import response_cache
+from app.services.report_engine import stale_rollup_updates
 
 logger = logging.getLogger(__name__)
 
@@ -179,6 +184,8 @@ class SocialDataCollector:
     ) -> int:
         """Save collected posts to database with AI analysis"""
         saved_count = 0
+        saved_posted_at = []
+        anomalies = []
 
         for post_data in posts_data:
             try:
@@ -186,8 +193,9 @@ class SocialDataCollector:
                 existing_post = await db.execute(
                     select(SocialPost).where(
                         and_(
-                            SocialPost.post_id == post_data['post_id'],
-                            SocialPost.platform == post_data['platform']
+                            SocialPost.user_id == user_id,
+                            SocialPost.platform == post_data['platform'],
+                            SocialPost.post_id == post_data['post_id']
                         )
                     )
                 )
@@ -220,6 +228,7 @@ class SocialDataCollector:
 
                 db.add(post)
                 saved_count += 1
+                saved_posted_at.append(post.posted_at)
 
                 # Notify real-time subscribers
                 try:
@@ -234,11 +243,41 @@ class SocialDataCollector:
                 except Exception as e:
                     logger.error(f"Failed to send real-time notification: {e}")
 
+                # Fold into the user's running alert aggregates
+                await alert_engine.observe_post(user_id, {
+                    'content': post.content,
+                    'sentiment': post.sentiment,
+                    'sentiment_score': post.sentiment_score,
+                    'engagement': post.likes + post.shares + post.comments
+                })
+                trending_engine.add_text(user_id, content)
+                anomalies.extend(anomaly_detector.observe(
+                    user_id, post.platform, topics, post.sentiment, post.likes + post.shares + post.comments
+                ))
+
             except Exception as e:
                 print(f"Failed to save post {post_data.get('post_id')}: {e}")
                 continue
 
+        # Late posts for a finished day invalidate its stored rollup
+        for statement in stale_rollup_updates(user_id, saved_posted_at):
+            await db.execute(statement)
         await db.commit()
+        if saved_count:
+            await response_cache.invalidate_user(user_id)
+
+        # Deliver the tail of the coalesced batch now that the run is committed
+        try:
+            await flush_new_post_notifications(user_id)
+        except Exception as e:
+            logger.error(f"Failed to flush real-time notifications: {e}")
+
+        try:
+            await alert_engine.evaluate(user_id)
+            await process_anomalies(anomalies)
+        except Exception as e:
+            logger.error(f"Alert evaluation failed for user {user_id}: {e}")
+
         return saved_count
 
     def _generate_mock_twitter_data(
@@ -0,0 +1,233 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set
+
+from app.core.config import settings
+from app.services.ai_analytics import STOP_WORDS
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter sketch over at most ``capacity`` terms.
+
+    Counts are kept in a stream-summary layout - terms grouped by count -
+    so each ``add`` is O(1): a term moves up one group, or an unseen term
+    replaces one from the lowest group and inherits its count as error.
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "groups", "min_count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.groups: Dict[int, Set[str]] = {}
+        self.min_count = 0
+
+    def _move(self, term: str, old: int, new: int):
+        group = self.groups.get(old)
+        if group is not None:
+            group.discard(term)
+            if not group:
+                del self.groups[old]
+                if old == self.min_count:
+                    self.min_count = new
+        self.groups.setdefault(new, set()).add(term)
+        self.counts[term] = new
+
+    def add(self, term: str):
+        count = self.counts.get(term)
+        if count is not None:
+            self._move(term, count, count + 1)
+            return
+
+        if len(self.counts) < self.capacity:
+            self.errors[term] = 0
+            self._move(term, 0, 1)
+            self.min_count = 1
+            return
+
+        # Replace an arbitrary term with the smallest count, inheriting it as error
+        floor = self.min_count
+        group = self.groups[floor]
+        victim = group.pop()
+        del self.counts[victim]
+        del self.errors[victim]
+        group.add(term)
+        self.errors[term] = floor
+        self._move(term, floor, floor + 1)
+
+    def items(self):
+        return self.counts.items()
+
+class WindowedSketch:
+    """Sliding window of ``panes`` Space-Saving sketches, rotated by time"""
+
+    __slots__ = ("pane_seconds", "capacity", "panes", "stamps")
+
+    def __init__(self, window: float, panes: int, capacity: int):
+        self.pane_seconds = window / panes
+        self.capacity = capacity
+        self.panes: List[Optional[SpaceSaving]] = [None] * panes
+        self.stamps = [-1] * panes
+
+    def add(self, term: str, now: float):
+        stamp = int(now // self.pane_seconds)
+        slot = stamp % len(self.panes)
+        if self.stamps[slot] != stamp:
+            self.stamps[slot] = stamp
+            self.panes[slot] = SpaceSaving(self.capacity)
+        self.panes[slot].add(term)
+
+    def counts(self, now: float) -> Dict[str, int]:
+        """Estimated term counts over the window"""
+        current = int(now // self.pane_seconds)
+        totals: Dict[str, int] = {}
+        for pane, stamp in zip(self.panes, self.stamps):
+            if pane is None or current - stamp >= len(self.panes):
+                continue
+            for term, count in pane.items():
+                totals[term] = totals.get(term, 0) + count
+        return totals
+
+# Window name -> (seconds, panes); each window is scored against the next longer one
+WINDOWS = OrderedDict([
+    ("1h", (3600, 6)),
+    ("24h", (86400, 12)),
+    ("7d", (7 * 86400, 7)),
+])
+
+class TrendingEngine:
+    """Per-user trending terms over 1h, 24h and 7d sliding windows.
+
+    Each post's distinct terms are added to one Space-Saving sketch per
+    window, so memory per user is fixed by ``capacity`` and the pane counts
+    whatever the vocabulary, and ingest costs O(1) per term. Terms are
+    ranked by acceleration: their rate in a window relative to their rate
+    in the next longer window, smoothed so rare terms don't dominate.
+    """
+
+    def __init__(self, capacity: int, max_users: int, min_count: int):
+        self.capacity = capacity
+        self.max_users = max_users
+        self.min_count = min_count
+        self._users: "OrderedDict[int, Dict[str, WindowedSketch]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sketches(self, user_id: int) -> Dict[str, WindowedSketch]:
+        sketches = self._users.get(user_id)
+        if sketches is None:
+            sketches = self._users[user_id] = {
+                name: WindowedSketch(seconds, panes, self.capacity)
+                for name, (seconds, panes) in WINDOWS.items()
+            }
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        self._users.move_to_end(user_id)
+        return sketches
+
+    def add_text(self, user_id: int, text: str, now: Optional[float] = None):
+        """Count the distinct terms of one post"""
+        now = now if now is not None else time.time()
+        terms = {
+            word for word in WORD_PATTERN.findall((text or "").lower())
+            if len(word) > 3 and word.isalnum() and word not in STOP_WORDS
+        }
+        with self._lock:
+            sketches = self._sketches(user_id)
+            for term in terms:
+                for sketch in sketches.values():
+                    sketch.add(term, now)
+
+    def trending(self, user_id: int, window: str = "24h", limit: int = 20) -> List[Dict[str, Any]]:
+        """Terms of a window ranked by acceleration over their baseline"""
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown window '{window}', expected one of {', '.join(WINDOWS)}")
+
+        now = time.time()
+        names = list(WINDOWS)
+        baseline_name = names[min(names.index(window) + 1, len(names) - 1)]
+        with self._lock:
+            sketches = self._users.get(user_id)
+            if sketches is None:
+                return []
+            counts = sketches[window].counts(now)
+            baseline_counts = counts if baseline_name == window else sketches[baseline_name].counts(now)
+
+        seconds = WINDOWS[window][0]
+        baseline_seconds = WINDOWS[baseline_name][0]
+        # One occurrence per baseline window as prior, so unseen terms don't divide by zero
+        prior = 1.0 / baseline_seconds
+
+        results = []
+        for term, count in counts.items():
+            if count < self.min_count:
+                continue
+            baseline = baseline_counts.get(term, 0)
+            if baseline_name == window:
+                acceleration = 1.0
+            else:
+                acceleration = (count / seconds + prior) / (baseline / baseline_seconds + prior)
+            results.append({
+                "keyword": term,
+                "count": count,
+                "baseline_count": baseline,
+                "score": round(acceleration, 3)
+            })
+
+        results.sort(key=lambda item: (item["score"], item["count"]), reverse=True)
+        return results[:limit]
+
+    def users(self) -> List[int]:
+        with self._lock:
+            return list(self._users)
+
+def save_trending_keywords(
+    user_id: int,
+    items: List[Dict[str, Any]],
+    source: str,
+    replace: bool = False,
+    limit: int = 20
+):
+    """Store one source's trending terms in today's AnalyticsData.trending_keywords.
+
+    Items from other sources are kept. With ``replace`` the source's earlier
+    items are dropped; otherwise they merge by keyword, keeping the higher
+    score. Scores are only comparable within a source, so each source keeps
+    its own ranking.
+    """
+    from app.core.database import SessionLocal
+    from app.models.social_data import AnalyticsData
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    db = SessionLocal()
+    try:
+        record = db.query(AnalyticsData).filter(
+            AnalyticsData.user_id == user_id,
+            AnalyticsData.date >= today
+        ).order_by(AnalyticsData.date).first()
+        if record is None:
+            record = AnalyticsData(user_id=user_id, date=today)
+            db.add(record)
+
+        existing = record.trending_keywords or []
+        merged = {} if replace else {item["keyword"]: item for item in existing if item.get("source") == source}
+        for item in items:
+            previous = merged.get(item["keyword"])
+            if previous is None or item["score"] > previous.get("score", 0):
+                merged[item["keyword"]] = {**item, "source": source}
+
+        ranked = sorted(merged.values(), key=lambda item: item["score"], reverse=True)[:limit]
+        record.trending_keywords = ranked + [item for item in existing if item.get("source") != source]
+        db.commit()
+    finally:
+        db.close()
+
+trending_engine = TrendingEngine(
+    settings.TRENDING_SKETCH_SIZE,
+    settings.TRENDING_MAX_USERS,
+    settings.TRENDING_MIN_COUNT
+)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Load test non-auth endpoint latency during a login storm.
+Storms the old inline-bcrypt login and the pooled, throttled login with
+concurrent clients while probing an async and a sync (threadpool, DB read)
+endpoint at a fixed rate, and reports probe p50/p99 for each scenario.
+Runs the API in-process against a scratch SQLite database.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else float("nan")
+
+async def probe(client, path: str, interval: float, until: float, latencies):
+    while time.perf_counter() < until:
+        started = time.perf_counter()
+        await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+async def storm(client, path: str, until: float, outcomes):
+    while time.perf_counter() < until:
+        response = await client.post(path, params={"email": "storm@example.com", "password": "wrong-password"})
+        outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+        if response.status_code in (429, 503):
+            await asyncio.sleep(0.05)
+
+async def scenario(app, label: str, login_path, args):
+    import httpx
+
+    def client(ip: str):
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(ip, 40000)), base_url="http://bench")
+
+    probe_client = client("10.0.0.1")
+    storm_clients = [client(f"10.1.{i // 250}.{i % 250 + 1}") for i in range(args.ips)]
+    latencies = {"/health": [], "/probe": []}
+    outcomes = {}
+    until = time.perf_counter() + args.seconds
+
+    tasks = [probe(probe_client, path, args.probe_interval, until, samples) for path, samples in latencies.items()]
+    if login_path:
+        tasks += [
+            storm(storm_clients[i % len(storm_clients)], login_path, until, outcomes)
+            for i in range(args.concurrency)
+        ]
+    await asyncio.gather(*tasks)
+
+    for c in [probe_client, *storm_clients]:
+        await c.aclose()
+
+    logins = ", ".join(f"{code}: {count}" for code, count in sorted(outcomes.items())) or "-"
+    print(
+        f"{label:<26}"
+        f"{percentile(latencies['/health'], 50):>10.1f}{percentile(latencies['/health'], 99):>10.1f}"
+        f"{percentile(latencies['/probe'], 50):>10.1f}{percentile(latencies['/probe'], 99):>10.1f}"
+        f"   {logins}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10, help="Duration of each scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent login clients")
+    parser.add_argument("--ips", type=int, default=64, help="Distinct client IPs the storm comes from")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Seconds between probe requests")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, help="Password worker threads (default: AUTH_WORKERS)")
+    args = parser.parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch.name}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    if args.workers:
+        os.environ["AUTH_WORKERS"] = str(args.workers)
+
+    from fastapi import FastAPI, Depends
+    from sqlalchemy import select, func
+
+    from app.core.config import settings
+    from app.core.database import Base, engine, get_db, SessionLocal
+    from app.models.user import User
+    from app.api import auth as auth_api
+    from app.services.auth import hash_password, verify_password, LoginThrottle, password_workers
+
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    with SessionLocal() as db:
+        db.add(User(email="storm@example.com", hashed_password=hash_password("correct-password")))
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(auth_api.router, prefix="/api/auth")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/probe")
+    def probe_db(db=Depends(get_db)):
+        return {"users": db.execute(select(func.count(User.id))).scalar()}
+
+    @app.post("/legacy/login")
+    def legacy_login(email: str, password: str, db=Depends(get_db)):
+        """The former login: bcrypt inline in a request thread, no throttling"""
+        user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+        return {"ok": bool(user and verify_password(password, user.hashed_password))}
+
+    print(
+        f"{args.concurrency} login clients from {args.ips} IPs for {args.seconds:.0f}s, "
+        f"bcrypt cost {args.rounds}, {settings.AUTH_WORKERS} password workers\n"
+    )
+    print(f"{'scenario':<26}{'/health ms':>20}{'/probe ms':>20}   login responses")
+    print(f"{'':<26}{'p50':>10}{'p99':>10}{'p50':>10}{'p99':>10}")
+
+    throttle = auth_api.login_throttle
+    auth_api.login_throttle = LoginThrottle(per_minute=1e9, burst=10 ** 9)
+    asyncio.run(scenario(app, "no storm", None, args))
+    asyncio.run(scenario(app, "inline bcrypt", "/legacy/login", args))
+    asyncio.run(scenario(app, "worker pool", "/api/auth/login", args))
+    auth_api.login_throttle = throttle
+    asyncio.run(scenario(app, "worker pool + throttle", "/api/auth/login", args))
+    print(f"\npassword workers: {password_workers.stats}")
+
+    engine.dispose()
+    os.unlink(scratch.name)
+
+if __name__ == "__main__":
+    main()
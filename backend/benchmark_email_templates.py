@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark report email rendering for the daily batch.
+Compares the old per-send f-string formatting with full Jinja2 renders and
+cached static fragments, each producing a multipart text/HTML message.
+"""
+
+import sys
+import time
+import random
+import argparse
+from email.message import EmailMessage
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.email_templates import EmailTemplates, TEMPLATE_DIR
+
+TOPICS = "ai cloud pricing security hiring roadmap launch outage support data".split()
+
+def build_reports(count: int):
+    """Markdown report bodies of roughly the size generate_business_report produces"""
+    random.seed(42)
+    reports = []
+    for i in range(count):
+        topics = "\n".join(f"- {topic}: {random.randint(1, 200)} mentions" for topic in random.sample(TOPICS, 5))
+        reports.append(
+            f"# AI Social Intelligence Daily Report\n\n## Key Metrics\n"
+            f"- Total Posts Analyzed: {random.randint(1, 5000)}\n"
+            f"- Total Engagement: {random.randint(0, 200000)}\n\n## Top Topics\n{topics}\n\n"
+            f"## Recommendations\n- Engage with <{random.choice(TOPICS)}> discussions & follow up\n"
+        )
+    return reports
+
+def format_legacy(title: str, content: str, report_type: str):
+    subject = f"AI Social Intelligence - {title} ({report_type.title()} Report)"
+    html = f"""
+        <html>
+        <body>
+            <h2>{title}</h2>
+            <p>Your automated {report_type} business intelligence report is ready.</p>
+
+            <div style="border: 1px solid #ddd; padding: 20px; margin: 20px 0;">
+                {content}
+            </div>
+
+            <p>Login to your dashboard for detailed analytics and interactive visualizations.</p>
+
+            <br>
+            <p>Best regards,<br>AI Social Intelligence System</p>
+            <hr>
+            <small>This is an automated report. Please do not reply to this email.</small>
+        </body>
+        </html>
+        """
+    return subject, None, html
+
+def to_message(subject: str, text, html: str) -> bytes:
+    msg = EmailMessage()
+    msg["From"] = "noreply@aisocialintel.com"
+    msg["To"] = "user@example.com"
+    msg["Subject"] = subject
+    if text:
+        msg.set_content(text)
+        msg.add_alternative(html, subtype="html")
+    else:
+        msg.set_content(html, subtype="html")
+    return msg.as_bytes()
+
+def run(label: str, reports, render, build_mime: bool):
+    started = time.perf_counter()
+    for content in reports:
+        subject, text, html = render(content)
+        if build_mime:
+            to_message(subject, text, html)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28}{len(reports) / elapsed:>14,.0f}{elapsed / len(reports) * 1e6:>14.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=20000, help="Report emails in the batch")
+    parser.add_argument("--mime", action="store_true", help="Also build the MIME message for each email")
+    args = parser.parse_args()
+
+    title = "Daily Business Intelligence Report - 2024-01-01"
+    reports = build_reports(args.emails)
+
+    started = time.perf_counter()
+    templates = EmailTemplates(TEMPLATE_DIR)
+    print(f"Compiled {len(templates.locales())} locales in {(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"{args.emails} report emails{' with MIME assembly' if args.mime else ''}\n")
+    print(f"{'renderer':<28}{'emails/sec':>14}{'us/email':>14}")
+
+    run("f-string (html only)", reports, lambda content: format_legacy(title, content, "daily"), args.mime)
+    run("jinja2 full render", reports, lambda content: templates.render(
+        "report", {"report_title": title, "report_type": "daily", "report_content": content}
+    ), args.mime)
+    run("jinja2 cached fragments", reports, lambda content: templates.render_cached(
+        "report", {"report_title": title, "report_type": "daily"}, {"report_content": content}
+    ), args.mime)
+    print(f"\nfragment cache: {templates.stats}")
+
+if __name__ == "__main__":
+    main()
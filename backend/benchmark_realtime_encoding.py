@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark realtime WebSocket message encodings.
+Compares wire bytes and serialization CPU for JSON and MessagePack, each with
+and without permessage-deflate, over a representative dashboard stream.
+"""
+
+import sys
+import time
+import zlib
+import random
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.realtime_encoding import encode_message, HAS_MSGPACK, JSON, MSGPACK
+
+PLATFORMS = ["twitter", "linkedin", "facebook", "instagram"]
+SENTIMENTS = ["positive", "neutral", "negative"]
+WORDS = (
+    "ai machine learning product launch customer support great terrible update "
+    "team hiring roadmap pricing outage love hate release data cloud security"
+).split()
+
+def build_stream(count: int):
+    """Build a mix of stats, delta, batch and keepalive messages"""
+    random.seed(42)
+    now = datetime.now()
+    messages = []
+    for i in range(count):
+        timestamp = (now + timedelta(seconds=i)).isoformat()
+        kind = i % 10
+        if kind == 0:
+            messages.append({
+                "type": "stats_update",
+                "data": {
+                    "total_posts_today": random.randint(0, 5000),
+                    "total_engagement_today": random.randint(0, 200000),
+                    "sentiment_distribution": {s: random.randint(0, 2000) for s in SENTIMENTS},
+                    "platform_distribution": {p: random.randint(0, 2000) for p in PLATFORMS},
+                    "latest_analytics": None
+                },
+                "timestamp": timestamp
+            })
+        elif kind < 4:
+            posts = [
+                {
+                    "id": random.randint(1, 10 ** 6),
+                    "platform": random.choice(PLATFORMS),
+                    "content": " ".join(random.choices(WORDS, k=random.randint(8, 30))),
+                    "sentiment": random.choice(SENTIMENTS),
+                    "engagement": random.randint(0, 500),
+                    "posted_at": timestamp
+                }
+                for _ in range(20)
+            ]
+            messages.append({
+                "type": "new_posts_batch",
+                "data": {
+                    "count": len(posts),
+                    "posts": posts,
+                    "sentiment_delta": {s: random.randint(0, 10) for s in SENTIMENTS},
+                    "platform_delta": {p: random.randint(0, 10) for p in PLATFORMS},
+                    "engagement_delta": random.randint(0, 5000)
+                },
+                "timestamp": timestamp
+            })
+        elif kind < 8:
+            messages.append({
+                "type": "stats_delta",
+                "data": {"total_posts_today": random.randint(0, 5000)},
+                "timestamp": timestamp
+            })
+        else:
+            messages.append({"type": "ping", "timestamp": timestamp})
+    return messages
+
+def run_encoding(messages, encoding: str, deflate: bool):
+    # permessage-deflate with context takeover: one raw-deflate stream per
+    # connection, sync-flushed after every message
+    compressor = zlib.compressobj(wbits=-15) if deflate else None
+    total_bytes = 0
+
+    started = time.process_time()
+    for message in messages:
+        payload = encode_message(message, encoding)
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if compressor:
+            payload = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            payload = payload[:-4]  # RFC 7692 strips the trailing 00 00 ff ff
+        total_bytes += len(payload)
+    cpu_seconds = time.process_time() - started
+
+    return total_bytes, cpu_seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000, help="Messages in the simulated stream")
+    parser.add_argument("--rate", type=float, default=5.0, help="Messages per second per client")
+    args = parser.parse_args()
+
+    messages = build_stream(args.messages)
+    encodings = [JSON] + ([MSGPACK] if HAS_MSGPACK else [])
+    if not HAS_MSGPACK:
+        print("msgpack not installed - only JSON variants are measured")
+
+    print(f"{args.messages} messages at {args.rate} msg/s per client\n")
+    print(f"{'encoding':<20}{'bytes/msg':>12}{'bytes/sec':>12}{'cpu us/msg':>12}")
+
+    baseline = None
+    for encoding in encodings:
+        for deflate in (False, True):
+            total_bytes, cpu_seconds = run_encoding(messages, encoding, deflate)
+            per_message = total_bytes / len(messages)
+            baseline = baseline or per_message
+            label = f"{encoding}{'+deflate' if deflate else ''}"
+            print(
+                f"{label:<20}{per_message:>12.1f}{per_message * args.rate:>12.1f}"
+                f"{cpu_seconds / len(messages) * 1e6:>12.2f}"
+                f"   ({per_message / baseline * 100:.0f}% of json)"
+            )
+
+if __name__ == "__main__":
+    main()
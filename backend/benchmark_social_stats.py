@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark the /api/social-data/stats aggregation.
+Compares the former three queries (platform stats, sentiment distribution,
+total count) with the single grouped scan, on a synthetic posts table.
+"""
+
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from sqlalchemy import create_engine, select, func, and_, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.user import User
+from app.models.social_data import SocialPost
+from app.services.post_stats import post_stats
+
+PLATFORMS = ["twitter", "linkedin", "facebook", "instagram"]
+SENTIMENTS = ["positive", "neutral", "negative", None]
+
+def populate(session, posts: int, users: int):
+    random.seed(42)
+    now = datetime.utcnow()
+    rows = [
+        {
+            'platform': random.choice(PLATFORMS),
+            'post_id': f"bench_{i}",
+            'content': "benchmark post",
+            'posted_at': now - timedelta(minutes=random.randint(0, 60 * 24 * 60)),
+            'likes': random.randint(0, 500),
+            'shares': random.randint(0, 100),
+            'comments': random.randint(0, 50),
+            'sentiment': random.choice(SENTIMENTS),
+            'user_id': random.randint(1, users)
+        }
+        for i in range(posts)
+    ]
+    for start in range(0, len(rows), 5000):
+        session.execute(SocialPost.__table__.insert(), rows[start:start + 5000])
+    session.commit()
+
+def legacy_stats(session, user_id: int, start, end):
+    """The three queries the endpoint used to run"""
+    window = and_(SocialPost.user_id == user_id, SocialPost.posted_at >= start, SocialPost.posted_at <= end)
+    platform_stats = {
+        row.platform: {'count': row.count, 'avg_engagement': float(row.avg_engagement or 0)}
+        for row in session.execute(
+            select(
+                SocialPost.platform,
+                func.count(SocialPost.id).label('count'),
+                func.avg(SocialPost.likes + SocialPost.shares + SocialPost.comments).label('avg_engagement')
+            ).where(window).group_by(SocialPost.platform)
+        )
+    }
+    sentiment_stats = {
+        row.sentiment: row.count
+        for row in session.execute(
+            select(SocialPost.sentiment, func.count(SocialPost.id).label('count'))
+            .where(and_(window, SocialPost.sentiment.isnot(None))).group_by(SocialPost.sentiment)
+        )
+    }
+    total_posts = session.execute(select(func.count(SocialPost.id)).where(window)).scalar()
+    return {'total_posts': total_posts, 'platform_stats': platform_stats, 'sentiment_stats': sentiment_stats}
+
+def rounded(stats):
+    """Stats with averages rounded, since AVG() may be computed as NUMERIC"""
+    return {
+        **stats,
+        'platform_stats': {
+            platform: {**item, 'avg_engagement': round(item['avg_engagement'], 6)}
+            for platform, item in stats['platform_stats'].items()
+        }
+    }
+
+def measure(label: str, fn, session, user_ids, start, end, statements):
+    statements[0] = 0
+    started = time.perf_counter()
+    for user_id in user_ids:
+        fn(session, user_id, start, end)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<20}{elapsed / len(user_ids) * 1000:>12.2f}"
+        f"{statements[0] / len(user_ids):>14.1f}"
+    )
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default="sqlite://", help="Empty scratch database to benchmark (default: in-memory SQLite)")
+    parser.add_argument("--posts", type=int, default=200000, help="Synthetic posts to insert")
+    parser.add_argument("--users", type=int, default=20, help="Users the posts are spread across")
+    parser.add_argument("--days", type=int, default=30, help="Stats window in days")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(*_):
+        statements[0] += 1
+
+    Base.metadata.create_all(engine, tables=[User.__table__, SocialPost.__table__])
+    session = sessionmaker(bind=engine)()
+    session.execute(User.__table__.insert(), [
+        {'id': user_id, 'email': f"bench{user_id}@example.com", 'hashed_password': "-"}
+        for user_id in range(1, args.users + 1)
+    ])
+    populate(session, args.posts, args.users)
+
+    end = datetime.utcnow()
+    start = end - timedelta(days=args.days)
+    user_ids = list(range(1, args.users + 1))
+
+    for user_id in user_ids:
+        assert rounded(legacy_stats(session, user_id, start, end)) == rounded(post_stats(session, user_id, start, end)), user_id
+
+    print(f"{args.posts} posts across {args.users} users, {args.days}-day window\n")
+    print(f"{'query':<20}{'ms/request':>12}{'statements':>14}")
+    legacy = measure("three queries", legacy_stats, session, user_ids, start, end, statements)
+    single = measure("single scan", post_stats, session, user_ids, start, end, statements)
+    print(f"\nsingle scan takes {single / legacy * 100:.0f}% of the three-query time")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark API cold start.
+Times importing app.main in fresh interpreters, lists the slowest imports,
+and optionally the time until a uvicorn server answers /health and the time
+each lazily loaded model takes on first use.
+"""
+
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+# Libraries that should only be imported once a model is first used
+DEFERRED_MODULES = ["torch", "transformers", "nltk"]
+
+def python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+
+def time_import(runs: int):
+    code = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        "import app.main\n"
+        "print(time.perf_counter() - started)\n"
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))\n"
+    )
+    timings, loaded = [], ""
+    for _ in range(runs):
+        elapsed, loaded = python(code).stdout.splitlines()[-2:]
+        timings.append(float(elapsed))
+    return timings, loaded
+
+def slowest_imports(count: int):
+    """Packages by their largest cumulative import time, from -X importtime"""
+    stderr = python("import app.main", "-X", "importtime").stderr
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            package = name.strip().split(".")[0]
+            packages[package] = max(packages.get(package, 0), int(cumulative))
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+def time_to_ready(timeout: float) -> float:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.05)
+        raise TimeoutError(f"server did not answer /health within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def time_models():
+    code = (
+        "import time\n"
+        "from app.services.ai_analytics import MODEL_LOADERS, get_model\n"
+        "for name in MODEL_LOADERS:\n"
+        "    started = time.perf_counter()\n"
+        "    model = get_model(name)\n"
+        "    print(name, time.perf_counter() - started, model is not None)\n"
+    )
+    for line in python(code).stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] in ("vader", "sentiment", "summarizer"):
+            yield parts[0], float(parts[1]), parts[2] == "True"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time the import in")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list")
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn until /health answers")
+    parser.add_argument("--models", action="store_true", help="Also time loading each model on first use")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for the server")
+    args = parser.parse_args()
+
+    timings, loaded = time_import(args.runs)
+    print(f"import app.main over {args.runs} fresh interpreters")
+    print(f"  median {statistics.median(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms")
+    print(f"  deferred libraries imported at startup: {loaded or 'none'}")
+
+    print(f"\n{'package':<28}{'cumulative ms':>14}")
+    for package, micros in slowest_imports(args.top):
+        print(f"{package:<28}{micros / 1000:>14.1f}")
+
+    if args.serve:
+        print(f"\nuvicorn ready (first /health response) in {time_to_ready(args.timeout):.2f} s")
+
+    if args.models:
+        print(f"\n{'model (first use)':<28}{'load s':>14}")
+        for name, elapsed, available in time_models():
+            print(f"{name:<28}{elapsed:>14.2f}{'' if available else '  (unavailable)'}")
+
+if __name__ == "__main__":
+    main()
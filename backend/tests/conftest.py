@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import asyncio
+import shutil
+import socket
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Point the app at a scratch SQLite database before anything reads settings
+SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="ai_social_tests_"))
+os.environ["DATABASE_URL"] = f"sqlite:///{SCRATCH_DIR / 'test.db'}"
+os.environ["RESPONSE_CACHE_BACKEND"] = "memory"
+os.environ["DATASET_CACHE_DIR"] = str(SCRATCH_DIR / "cache")
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Seconds to wait for throwaway servers and deliveries
+TIMEOUT = 10
+
+def free_port() -> int:
+    """A TCP port nothing is listening on, for throwaway test servers"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port: int, process: subprocess.Popen):
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[0]} exited with {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"{process.args[0]} did not listen on {port}")
+
+@pytest.fixture(scope="session")
+def redis_url():
+    """TEST_REDIS_URL, or a throwaway redis-server from PATH"""
+    pytest.importorskip("redis")
+    if os.getenv("TEST_REDIS_URL"):
+        yield os.environ["TEST_REDIS_URL"]
+        return
+    server = shutil.which("redis-server")
+    if not server:
+        pytest.skip("no TEST_REDIS_URL and redis-server is not on PATH")
+
+    port = free_port()
+    process = subprocess.Popen(
+        [server, "--port", str(port), "--bind", "127.0.0.1", "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port, process)
+        yield f"redis://127.0.0.1:{port}/0"
+    finally:
+        process.terminate()
+        process.wait()
+
+class RecordingHandler:
+    """aiosmtpd handler that accepts mail, or answers DATA with queued replies"""
+
+    def __init__(self):
+        self.messages = []
+        self.replies = []
+        self.sessions = []
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        self.sessions.append(server)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.replies:
+                return self.replies.pop(0)
+            self.messages.append(envelope.content)
+            return "250 Message accepted"
+        finally:
+            self.active -= 1
+
+@pytest.fixture
+def smtp_server():
+    """Local aiosmtpd server; its ``handler`` is a RecordingHandler"""
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    handler = RecordingHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+@pytest.fixture
+def db_engine():
+    """Fresh tables in the scratch database for one test"""
+    from app.core.database import Base, engine
+    import app.models.user  # noqa: F401 - registers the tables
+    import app.models.social_data  # noqa: F401
+
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def make_user(db_engine):
+    """Insert a user and return its id"""
+    from app.core.database import SessionLocal
+    from app.models.user import User
+
+    def make(email: str = "tenant@example.com") -> int:
+        with SessionLocal() as db:
+            user = User(email=email, hashed_password="-")
+            db.add(user)
+            db.commit()
+            return user.id
+    return make
@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.social_data import NotificationSettings, EmailOutbox
+from app.services import alert_engine as alert_module
+from app.services.alert_engine import AlertEngine
+
+WINDOW = 600
+COOLDOWN = 3600
+
+class Clock:
+    """Stands in for both time.time and time.monotonic in the alert engine"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(alert_module, "time", SimpleNamespace(time=clock, monotonic=clock))
+    return clock
+
+@pytest.fixture
+def alerts(monkeypatch):
+    """Alerts sent to the realtime channel, as (user_id, alert_type)"""
+    sent = []
+
+    async def notify(user_id, alert):
+        sent.append((user_id, alert["alert_type"]))
+
+    monkeypatch.setattr(alert_module, "notify_sentiment_alert", notify)
+    return sent
+
+@pytest.fixture
+def watched_user(make_user):
+    user_id = make_user()
+    with SessionLocal() as db:
+        db.add(NotificationSettings(
+            user_id=user_id, real_time_alerts=True,
+            sentiment_threshold=0.5, engagement_threshold=100, keywords=["Outage"]
+        ))
+        db.commit()
+    return user_id
+
+def make_engine() -> AlertEngine:
+    return AlertEngine(alpha=0.5, min_posts=3, window=WINDOW, cooldown=COOLDOWN, settings_ttl=60)
+
+def ingest(engine: AlertEngine, user_id: int, *posts):
+    async def run():
+        for post in posts:
+            await engine.observe_post(user_id, post)
+        await engine.evaluate(user_id)
+    asyncio.run(run())
+
+def queued_emails() -> int:
+    with SessionLocal() as db:
+        return db.query(EmailOutbox).count()
+
+def test_engagement_alert_fires_once_per_breach_and_respects_cooldown(watched_user, clock, alerts):
+    engine = make_engine()
+
+    ingest(engine, watched_user, {"engagement": 60})
+    assert alerts == []
+
+    ingest(engine, watched_user, {"engagement": 60})
+    assert alerts == [(watched_user, "engagement_spike")]
+
+    # Still above the threshold: no repeat while the breach lasts
+    ingest(engine, watched_user, {"engagement": 10})
+    assert len(alerts) == 1
+
+    # The window slides past the spike, which clears and re-arms the alert...
+    clock.now += WINDOW + 1
+    ingest(engine, watched_user, {"engagement": 0})
+    # ...but a new breach inside the cool-down stays quiet
+    ingest(engine, watched_user, {"engagement": 150})
+    assert len(alerts) == 1
+
+    clock.now += COOLDOWN
+    ingest(engine, watched_user, {"engagement": 0})
+    ingest(engine, watched_user, {"engagement": 150})
+    assert alerts == [(watched_user, "engagement_spike")] * 2
+    assert queued_emails() == 2
+
+def test_sentiment_alert_waits_for_min_posts(watched_user, clock, alerts):
+    engine = make_engine()
+    negative = {"sentiment": "negative", "sentiment_score": -0.8}
+
+    ingest(engine, watched_user, negative, negative)
+    assert alerts == []
+
+    ingest(engine, watched_user, negative)
+    assert alerts == [(watched_user, "sentiment_drop")]
+
+    # Recovering above the threshold clears the breach without a new alert
+    ingest(engine, watched_user, *[{"sentiment": "positive", "sentiment_score": 0.9}] * 3)
+    assert len(alerts) == 1
+
+def test_keyword_mentions_match_case_insensitively(watched_user, clock, alerts):
+    engine = make_engine()
+
+    ingest(engine, watched_user, {"content": "All good here"})
+    assert alerts == []
+
+    ingest(engine, watched_user, {"content": "Major OUTAGE reported"})
+    assert alerts == [(watched_user, "keyword_mention")]
+
+def test_users_without_realtime_alerts_are_not_tracked(make_user, clock, alerts):
+    user_id = make_user()
+    engine = make_engine()
+
+    ingest(engine, user_id, {"engagement": 10_000})
+
+    assert alerts == []
+    assert engine._states == {}
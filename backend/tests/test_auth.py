@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import event
+
+httpx = pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+
+from app.api import auth as auth_api
+from app.core.config import settings
+from app.services.auth import LoginThrottle
+
+@pytest.fixture
+def app(db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(auth_api, "login_throttle", LoginThrottle(per_minute=1e9, burst=10 ** 9))
+    app = FastAPI()
+    app.include_router(auth_api.router, prefix="/api/auth")
+    return app
+
+@pytest.fixture
+def query_threads(db_engine):
+    """Thread idents of every statement the app sends to the database"""
+    threads = []
+
+    def record(*args):
+        threads.append(threading.get_ident())
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    yield threads
+    event.remove(db_engine, "before_cursor_execute", record)
+
+def call(app, *requests):
+    """Issue requests in order; returns the responses and the event loop's thread"""
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = [await client.post(path, **kwargs) for path, kwargs in requests]
+        return responses, threading.get_ident()
+    return asyncio.run(scenario())
+
+REGISTER = ("/api/auth/register", {"json": {"email": "new@example.com", "password": "s3cret-pass"}})
+
+def login(password: str):
+    return "/api/auth/login", {"params": {"email": "new@example.com", "password": password}}
+
+def test_register_then_login(app):
+    (registered, duplicate, ok, wrong), _ = call(
+        app, REGISTER, REGISTER, login("s3cret-pass"), login("wrong-pass")
+    )
+
+    assert registered.status_code == 200
+    assert registered.json()["email"] == "new@example.com"
+    assert duplicate.status_code == 400
+    assert ok.status_code == 200 and ok.json()["token_type"] == "bearer"
+    assert wrong.status_code == 401
+
+def test_login_rehashes_old_cost(app, monkeypatch):
+    from app.core.database import SessionLocal
+    from app.models.user import User
+
+    call(app, REGISTER)
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    (ok,), _ = call(app, login("s3cret-pass"))
+
+    assert ok.status_code == 200
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.email == "new@example.com").one()
+        assert user.hashed_password.startswith("$2b$05$")
+        assert user.last_login is not None
+
+def test_auth_queries_stay_off_the_event_loop(app, query_threads):
+    (registered, ok), loop_thread = call(app, REGISTER, login("s3cret-pass"))
+
+    assert registered.status_code == ok.status_code == 200
+    assert query_threads
+    assert loop_thread not in query_threads
@@ -0,0 +1,253 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import FIXTURES_DIR
+
+pd = pytest.importorskip("pandas")
+
+from app.core.database import SessionLocal
+from app.models.social_data import SocialPost
+from app.services.dataset_cache import dataset_cache, HAS_PYARROW
+from app.services.dataset_schemas import DATASET_SCHEMAS
+from app.services.dataset_service import DatasetService
+
+NOW = object()  # posted_at falls back to the import time
+
+# Per registered layout: fixture directory and the posts it must import as
+FIXTURES = {
+    "crowdflower/twitter-airline-sentiment": ("twitter-airline-sentiment", [
+        {
+            "platform": "twitter", "post_id": "570306133677760513", "author": "cairdin",
+            "content": "@VirginAmerica What @dhepburn said.", "sentiment": "neutral", "sentiment_score": 0.0,
+            "shares": 0, "posted_at": datetime(2015, 2, 24, 19, 35, 52),
+            "url": "https://twitter.com/i/status/570306133677760513",
+        },
+        {
+            "post_id": "570301130888122368", "author": "jnardino", "sentiment": "positive", "sentiment_score": 0.5,
+            "content": "@VirginAmerica plus you've added commercials\nto the experience... tacky.",
+            "shares": 3, "posted_at": datetime(2015, 2, 24, 19, 15, 59),
+        },
+        {
+            "post_id": "twitter_Tweets_2", "author": "yvonnalynn", "sentiment": "negative", "sentiment_score": -0.5,
+            "shares": 0, "posted_at": datetime(2015, 2, 24, 19, 15, 48),
+            "url": "https://twitter.com/i/status/twitter_Tweets_2",
+        },
+    ]),
+    "kazanova/sentiment140": ("sentiment140", [
+        {
+            "platform": "twitter", "post_id": "1467810369", "author": "_TheSpecialOne_", "sentiment": "negative",
+            "content": "@switchfoot awww, that's a bummer", "posted_at": datetime(2009, 4, 7, 5, 19, 45),
+        },
+        {"post_id": "1467822272", "author": "ersle", "sentiment": "positive", "posted_at": datetime(2009, 4, 7, 5, 22, 45)},
+        {
+            "post_id": "1467810672", "author": "scotthamilton", "sentiment": "neutral",
+            "content": "café was closed", "posted_at": datetime(2009, 4, 7, 8, 0, 0),
+        },
+    ]),
+    "snap/amazon-fine-food-reviews": ("amazon-fine-food-reviews", [
+        {
+            "platform": "amazon", "post_id": "1", "author": "delmartian", "author_id": "A3SGXH7AUHU8GW",
+            "likes": 1, "sentiment": "positive", "posted_at": datetime(2011, 4, 27),
+            "url": "https://www.amazon.com/dp/B001E4KFG0",
+            "content": "I have bought several of the Vitality canned dog food products.",
+        },
+        {"post_id": "2", "likes": 0, "sentiment": "negative", "posted_at": datetime(2012, 9, 7)},
+        {"post_id": "3", "author": 'Natalia Corres "Natalia Corres"', "sentiment": "neutral", "posted_at": datetime(2008, 8, 18)},
+    ]),
+    "rmisra/news-headlines-dataset-for-sarcasm-detection": ("news-headlines", [
+        {
+            "platform": "news", "post_id": "news_Sarcasm_Headlines_Dataset_0", "author": "Unknown",
+            "sentiment": "neutral", "posted_at": NOW,
+            "url": "https://www.huffingtonpost.com/entry/versace-black-code_us_5861fbefe4b0de3a08f600d5",
+            "content": "former versace store clerk sues over secret 'black code' for minority shoppers",
+        },
+        {"post_id": "news_Sarcasm_Headlines_Dataset_1", "sentiment": "neutral", "posted_at": NOW},
+    ]),
+    "bwandowando/reddit-r-all-2015-2018-million-headlines": ("reddit-headlines", [
+        {
+            "platform": "reddit", "post_id": "3zqk8p", "content": "Pic of a very good dog", "author": "alice",
+            "likes": 120, "comments": 15, "sentiment": "neutral", "posted_at": datetime(2016, 1, 10),
+            "url": "https://www.reddit.com/comments/3zqk8p",
+        },
+        {
+            "post_id": "reddit_reddit_headlines_1", "author": "bob", "likes": 0, "comments": 0,
+            "posted_at": datetime(2016, 1, 10, 1, 0, 0),
+        },
+        {"post_id": "40b6a3", "likes": 5, "comments": 2, "posted_at": NOW},
+    ]),
+}
+
+def test_every_registered_schema_has_a_fixture():
+    assert set(FIXTURES) == set(DATASET_SCHEMAS)
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # DatasetService creates ./data
+    return DatasetService()
+
+@pytest.fixture(params=[False, True], ids=["raw", "parquet-cache"])
+def cache_enabled(request, tmp_path, monkeypatch):
+    if request.param and not HAS_PYARROW:
+        pytest.skip("pyarrow is not installed")
+    monkeypatch.setattr(dataset_cache, "enabled", request.param)
+    monkeypatch.setattr(dataset_cache, "cache_dir", tmp_path / "cache")
+    return request.param
+
+def stored_posts(user_id: int):
+    with SessionLocal() as db:
+        return db.query(SocialPost).filter(SocialPost.user_id == user_id).order_by(SocialPost.id).all()
+
+def assert_post(post, expected, imported_at):
+    for field, value in expected.items():
+        actual = getattr(post, field)
+        if field == "posted_at":
+            # SQLite keeps the UTC wall time without an offset
+            actual = actual.replace(tzinfo=None)
+            if value is NOW:
+                assert abs(actual - imported_at) < timedelta(minutes=5), post.post_id
+                continue
+        assert actual == value, (post.post_id, field)
+
+@pytest.mark.parametrize("slug", sorted(FIXTURES))
+def test_stream_import_maps_fixture(slug, service, cache_enabled, make_user, monkeypatch):
+    directory, expected = FIXTURES[slug]
+    monkeypatch.setattr("app.core.config.settings.DATASET_INSERT_BATCH_SIZE", 1)
+    user_id = make_user()
+    progress = []
+
+    imported_at = datetime.utcnow()
+    result = service.stream_dataset_to_db(
+        str(FIXTURES_DIR / "datasets" / directory), user_id, slug,
+        chunk_size=2, progress_callback=progress.append
+    )
+
+    assert result["success"], result.get("error")
+    assert result["chunks"] == math.ceil(len(expected) / 2)
+    assert [p["processed_count"] for p in progress] == [
+        min(2 * (i + 1), len(expected)) for i in range(result["chunks"])
+    ]
+    assert result["processed_count"] == result["imported_count"] == len(expected)
+
+    posts = stored_posts(user_id)
+    assert len(posts) == len(expected)
+    for post, fields in zip(posts, expected):
+        assert_post(post, fields, imported_at)
+
+@pytest.mark.parametrize("slug", sorted(FIXTURES))
+def test_stream_import_rerun_skips_duplicates(slug, service, cache_enabled, make_user):
+    directory, expected = FIXTURES[slug]
+    path = str(FIXTURES_DIR / "datasets" / directory)
+    user_id = make_user()
+
+    first = service.stream_dataset_to_db(path, user_id, slug, chunk_size=2)
+    rerun = service.stream_dataset_to_db(path, user_id, slug, chunk_size=2)
+
+    assert first["imported_count"] == len(expected)
+    assert rerun["success"], rerun.get("error")
+    assert rerun["processed_count"] == len(expected)
+    assert rerun["imported_count"] == 0
+    assert len(stored_posts(user_id)) == len(expected)
+
+@pytest.mark.parametrize("slug", sorted(FIXTURES))
+def test_stream_import_into_second_tenant(slug, service, cache_enabled, make_user):
+    directory, expected = FIXTURES[slug]
+    path = str(FIXTURES_DIR / "datasets" / directory)
+    first_user = make_user("first@example.com")
+    second_user = make_user("second@example.com")
+
+    service.stream_dataset_to_db(path, first_user, slug, chunk_size=2)
+    result = service.stream_dataset_to_db(path, second_user, slug, chunk_size=2)
+
+    assert result["imported_count"] == len(expected)
+    assert [post.post_id for post in stored_posts(second_user)] == [
+        post.post_id for post in stored_posts(first_user)
+    ]
+
+def test_chunked_import_dedups_within_and_across_runs(service, make_user, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.DATASET_INSERT_BATCH_SIZE", 1)
+    source = FIXTURES_DIR / "datasets" / "sentiment140" / "training.1600000.processed.noemoticon.csv"
+    first, second, third = source.read_bytes().splitlines(keepends=True)
+    directory = tmp_path / "sentiment140"
+    directory.mkdir()
+    data_file = directory / source.name
+    user_id = make_user()
+
+    # The repeated row lands in a later chunk than its first copy
+    data_file.write_bytes(first + second + first)
+    initial = service.stream_dataset_to_db(str(directory), user_id, "kazanova/sentiment140", chunk_size=1)
+
+    # The grown file is re-imported; only the appended row is new
+    data_file.write_bytes(first + second + first + third)
+    grown = service.stream_dataset_to_db(str(directory), user_id, "kazanova/sentiment140", chunk_size=1)
+
+    assert (initial["chunks"], initial["processed_count"], initial["imported_count"]) == (3, 3, 2)
+    assert (grown["chunks"], grown["processed_count"], grown["imported_count"]) == (4, 4, 1)
+    assert [post.post_id for post in stored_posts(user_id)] == ["1467810369", "1467822272", "1467810672"]
+
+def test_stream_import_rejects_unknown_layout(service, db_engine):
+    result = service.stream_dataset_to_db(str(FIXTURES_DIR / "datasets"), 1, "someone/unknown-dataset")
+    assert not result["success"]
+    assert "Unsupported dataset layout" in result["error"]
+
+SPLITTABLE = sorted(slug for slug, schema in DATASET_SCHEMAS.items() if schema.splittable)
+
+def fixture_file(slug: str):
+    [data_file] = DATASET_SCHEMAS[slug].find_files(str(FIXTURES_DIR / "datasets" / FIXTURES[slug][0]))
+    return data_file
+
+def assert_shards_match_whole_file(schema, data_file, shard_bytes: int):
+    shards = schema.shard_offsets(data_file, shard_bytes)
+    # Contiguous byte ranges covering the whole file
+    assert [end for _, end, _ in shards[:-1]] == [start for start, _, _ in shards[1:]]
+    assert shards[-1][1] == data_file.stat().st_size
+
+    combined = pd.concat([schema.read_range(data_file, *shard) for shard in shards])
+    pd.testing.assert_frame_equal(combined, schema.read_range(data_file))
+    return shards
+
+@pytest.mark.parametrize("shard_bytes", [1, 64, 1 << 20])
+@pytest.mark.parametrize("slug", SPLITTABLE)
+def test_byte_shards_read_every_record_once(slug, shard_bytes):
+    schema = DATASET_SCHEMAS[slug]
+    shards = assert_shards_match_whole_file(schema, fixture_file(slug), shard_bytes)
+    if shard_bytes == 1:
+        # One record per shard, even where a quoted field spans two lines
+        assert len(shards) == len(FIXTURES[slug][1])
+
+def test_byte_shards_never_split_quoted_newlines(tmp_path):
+    schema = DATASET_SCHEMAS["snap/amazon-fine-food-reviews"]
+    data_file = tmp_path / "Reviews.csv"
+    rows = [
+        f'{i},B00{i},A{i},"Name ""{i}""",1,1,5,1303862400,Summary,"line one\nline ""two""\n\nend {i}"'
+        for i in range(50)
+    ]
+    data_file.write_text("Id,ProductId,UserId,ProfileName,HelpfulnessNumerator,HelpfulnessDenominator,"
+                         "Score,Time,Summary,Text\n" + "\n".join(rows) + "\n")
+
+    assert len(schema.read_range(data_file)) == 50
+    for shard_bytes in (1, 7, 33, 200):
+        # Indexes of the shards must also line up with the whole-file read
+        assert_shards_match_whole_file(schema, data_file, shard_bytes)
+
+@pytest.mark.parametrize("slug", sorted(FIXTURES))
+def test_parallel_ingest_matches_stream_import(slug, service, make_user):
+    directory, expected = FIXTURES[slug]
+    path = str(FIXTURES_DIR / "datasets" / directory)
+    stream_user = make_user("stream@example.com")
+    parallel_user = make_user("parallel@example.com")
+
+    service.stream_dataset_to_db(path, stream_user, slug, chunk_size=2)
+    result = service.parallel_ingest(path, parallel_user, slug, max_workers=2, shard_bytes=1)
+
+    assert result["success"], result.get("error")
+    assert result["shards"] == (len(expected) if slug in SPLITTABLE else 1)
+    assert result["imported_count"] == len(expected)
+
+    def rows(user_id):
+        return sorted(
+            (post.post_id, post.content, post.sentiment, post.likes, post.posted_at.replace(tzinfo=None).date())
+            for post in stored_posts(user_id)
+        )
+    assert rows(parallel_user) == rows(stream_user)
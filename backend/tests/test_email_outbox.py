@@ -0,0 +1,77 @@
+import asyncio
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal
+from app.models.social_data import EmailOutbox, Report
+from app.api.reports import save_report_with_email
+from app.services.email_outbox import EmailOutboxWorker, enqueue_emails, outbox_row
+from app.services.email_service import EmailService, SMTPPool
+from app.services.email_templates import RenderedEmail
+
+def make_worker(smtp_server, max_attempts: int = 3) -> EmailOutboxWorker:
+    pool = SMTPPool(smtp_server.hostname, smtp_server.port, use_tls=False, max_retries=0, timeout=5)
+    return EmailOutboxWorker(
+        batch_size=10, poll_interval=1, max_attempts=max_attempts, backoff=60, backoff_max=600, lease=300,
+        email_service=EmailService(pool=pool)
+    )
+
+def outbox_rows():
+    with SessionLocal() as db:
+        return db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+
+def test_run_once_sends_and_records_smtp_errors(smtp_server, db_engine):
+    smtp_server.handler.replies = ["550 5.1.1 Mailbox unavailable"]
+    enqueue_emails([outbox_row(f"user{i}@example.com", "Report", "<p>body</p>", text_content="body") for i in range(2)])
+    worker = make_worker(smtp_server)
+
+    result = asyncio.run(worker.run_once())
+
+    assert result == {'claimed': 2, 'sent': 1, 'failed': 1}
+    failed, sent = sorted(outbox_rows(), key=lambda row: row.status)
+    assert sent.status == 'sent' and sent.last_error is None
+    assert failed.status == 'pending'
+    assert failed.last_error == "Attempt 1: rejected: 550 5.1.1 Mailbox unavailable"
+
+def test_exhausted_rows_are_dead_lettered_with_last_error(smtp_server, db_engine):
+    smtp_server.handler.replies = ["451 4.3.0 Try again later"]
+    enqueue_emails([outbox_row("user@example.com", "Report", "body", content_type="text")])
+    worker = make_worker(smtp_server, max_attempts=1)
+
+    assert asyncio.run(worker.run_once())['failed'] == 1
+
+    (row,) = outbox_rows()
+    assert row.status == 'dead'
+    assert row.last_error == "Attempt 1: rejected: 451 4.3.0 Try again later"
+
+def test_rows_claimed_by_another_worker_after_select_are_skipped(smtp_server, db_engine):
+    enqueue_emails([outbox_row(f"user{i}@example.com", "Report", "body") for i in range(3)])
+    worker, rival = make_worker(smtp_server), make_worker(smtp_server)
+    rival_claims = []
+
+    # The rival claims everything between this worker's SELECT and its UPDATE
+    def interleave(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("UPDATE EMAIL_OUTBOX") and not rival_claims:
+            rival_claims.append(None)
+            rival_claims.extend(rival._claim(10))
+
+    event.listen(db_engine, "before_cursor_execute", interleave)
+    try:
+        claimed = worker._claim(10)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", interleave)
+
+    assert claimed == []
+    assert len(rival_claims[1:]) == 3
+    assert [row.attempts for row in outbox_rows()] == [1, 1, 1]
+
+def test_report_and_its_email_commit_together(make_user, db_engine):
+    user_id = make_user()
+    email = RenderedEmail("Weekly report", "body", "<p>body</p>")
+
+    with SessionLocal() as db:
+        report = save_report_with_email(db, Report(user_id=user_id, title="Weekly", report_type="weekly"), "tenant@example.com", email)
+
+    (row,) = outbox_rows()
+    assert row.report_id == report.id
+    assert (row.subject, row.content, row.text_content) == ("Weekly report", "<p>body</p>", "body")
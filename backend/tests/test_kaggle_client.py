@@ -0,0 +1,36 @@
+import asyncio
+import threading
+
+from app.services.kaggle_service import KaggleClient
+
+def test_cancelled_first_caller_does_not_cancel_shared_lookup(monkeypatch):
+    client = KaggleClient(cache_ttl=60, credentials_ttl=60)
+    release = threading.Event()
+    calls = []
+
+    def dataset_list_sync(search, max_size):
+        calls.append(search)
+        release.wait(5)
+        return [{'ref': 'owner/tweets'}]
+
+    monkeypatch.setattr(client, "_dataset_list_sync", dataset_list_sync)
+
+    async def scenario():
+        first = asyncio.ensure_future(client.dataset_list("tweets", 10))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(client.dataset_list("tweets", 10))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        return first.cancelled(), await asyncio.wait_for(second, 5)
+
+    first_cancelled, result = asyncio.run(scenario())
+
+    assert first_cancelled
+    assert result == [{'ref': 'owner/tweets'}]
+    # One SDK call, and its result is cached for later callers
+    assert calls == ["tweets"]
+    assert asyncio.run(client.dataset_list("tweets", 10)) == result
+    assert calls == ["tweets"]
@@ -0,0 +1,92 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, func, and_
+
+from app.core.database import SessionLocal
+from app.models.social_data import SocialPost
+from app.services.post_stats import post_stats
+
+START = datetime(2024, 5, 1)
+END = datetime(2024, 5, 31)
+
+def legacy_stats(db, user_id: int, start: datetime, end: datetime):
+    """The three queries /api/social-data/stats ran before post_stats"""
+    window = and_(SocialPost.user_id == user_id, SocialPost.posted_at >= start, SocialPost.posted_at <= end)
+    platform_stats = {
+        row.platform: {'count': row.count, 'avg_engagement': float(row.avg_engagement or 0)}
+        for row in db.execute(
+            select(
+                SocialPost.platform,
+                func.count(SocialPost.id).label('count'),
+                func.avg(SocialPost.likes + SocialPost.shares + SocialPost.comments).label('avg_engagement')
+            ).where(window).group_by(SocialPost.platform)
+        )
+    }
+    sentiment_stats = {
+        row.sentiment: row.count
+        for row in db.execute(
+            select(SocialPost.sentiment, func.count(SocialPost.id).label('count'))
+            .where(and_(window, SocialPost.sentiment.isnot(None))).group_by(SocialPost.sentiment)
+        )
+    }
+    total_posts = db.execute(select(func.count(SocialPost.id)).where(window)).scalar()
+    return {'total_posts': total_posts, 'platform_stats': platform_stats, 'sentiment_stats': sentiment_stats}
+
+def add_posts(user_id: int, rows):
+    # A table INSERT keeps explicit NULL counts, which the ORM would replace with defaults
+    with SessionLocal() as db:
+        db.execute(SocialPost.__table__.insert(), [
+            {'user_id': user_id, 'post_id': f"{user_id}-{i}", 'content': "post", **row}
+            for i, row in enumerate(rows)
+        ])
+        db.commit()
+
+def test_post_stats_matches_former_queries(make_user):
+    rng = random.Random(3)
+    user_id = make_user()
+    other_user = make_user("other@example.com")
+
+    def engagement():
+        # A NULL in any part makes the post's engagement NULL
+        return rng.choice([None, 0, 1, 2, 10, 250])
+
+    rows = [
+        {
+            'platform': rng.choice(["twitter", "reddit", "amazon"]),
+            'sentiment': rng.choice(["positive", "neutral", "negative", None]),
+            'posted_at': START + timedelta(minutes=rng.randint(-3 * 24 * 60, 33 * 24 * 60)),
+            'likes': engagement(), 'shares': engagement(), 'comments': engagement(),
+        }
+        for _ in range(300)
+    ]
+    rows += [
+        # Only NULL engagement and NULL sentiment on this platform
+        {'platform': "news", 'sentiment': None, 'posted_at': START + timedelta(days=1), 'likes': None, 'shares': 1, 'comments': 1},
+        # Both window bounds are inclusive
+        {'platform': "twitter", 'sentiment': "positive", 'posted_at': START, 'likes': 1, 'shares': 0, 'comments': 0},
+        {'platform': "twitter", 'sentiment': "negative", 'posted_at': END, 'likes': 1, 'shares': 0, 'comments': 0},
+    ]
+    add_posts(user_id, rows)
+    add_posts(other_user, rows[:50])
+
+    with SessionLocal() as db:
+        stats = post_stats(db, user_id, START, END)
+        expected = legacy_stats(db, user_id, START, END)
+
+    assert stats['total_posts'] == expected['total_posts']
+    assert stats['sentiment_stats'] == expected['sentiment_stats']
+    assert stats['platform_stats'].keys() == expected['platform_stats'].keys()
+    for platform, item in expected['platform_stats'].items():
+        assert stats['platform_stats'][platform]['count'] == item['count']
+        assert stats['platform_stats'][platform]['avg_engagement'] == pytest.approx(item['avg_engagement'])
+    assert stats['platform_stats']['news'] == {'count': 1, 'avg_engagement': 0.0}
+    assert None not in stats['sentiment_stats']
+
+def test_post_stats_without_posts(make_user):
+    user_id = make_user()
+    with SessionLocal() as db:
+        assert post_stats(db, user_id, START, END) == legacy_stats(db, user_id, START, END) == {
+            'total_posts': 0, 'platform_stats': {}, 'sentiment_stats': {}
+        }
@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api import realtime
+from app.services.auth import create_access_token
+
+@pytest.fixture
+def client(db_engine):
+    app = FastAPI()
+    app.include_router(realtime.router, prefix="/api/realtime")
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def users(make_user):
+    """Two user ids, with a token for each"""
+    return {
+        make_user(email): create_access_token({"sub": email})
+        for email in ("alice@example.com", "bob@example.com")
+    }
+
+SOCKETS = ["/api/realtime/ws/{}", "/api/realtime/ws/dashboard/{}"]
+
+@pytest.mark.parametrize("path", SOCKETS)
+def test_socket_rejected_without_token(client, users, path):
+    alice = next(iter(users))
+    with pytest.raises(WebSocketDisconnect) as rejected:
+        with client.websocket_connect(path.format(alice)):
+            pass
+    assert rejected.value.code == 1008
+
+@pytest.mark.parametrize("path", SOCKETS)
+def test_socket_rejected_for_another_users_id(client, users, path):
+    alice, bob = users
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(path.format(bob) + f"?token={users[alice]}"):
+            pass
+
+def test_socket_rejected_for_invalid_token(client, users):
+    alice = next(iter(users))
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/api/realtime/ws/{alice}?token=not-a-token"):
+            pass
+
+def test_socket_accepts_bearer_header_for_own_id(client, users):
+    alice = next(iter(users))
+    headers = {"Authorization": f"Bearer {users[alice]}"}
+    with client.websocket_connect(f"/api/realtime/ws/{alice}", headers=headers) as websocket:
+        websocket.send_json({"type": "ping"})
+        assert websocket.receive_json()["type"] == "pong"
+
+def test_sse_requires_matching_token(client, users):
+    alice, bob = users
+    assert client.get(f"/api/realtime/sse/{alice}").status_code == 403
+    assert client.get(f"/api/realtime/sse/{alice}?token={users[bob]}").status_code == 403
+
+def test_metrics_requires_authentication(client, users):
+    alice = next(iter(users))
+    assert client.get("/api/realtime/metrics").status_code in (401, 403)
+    response = client.get("/api/realtime/metrics", headers={"Authorization": f"Bearer {users[alice]}"})
+    assert response.status_code == 200
+    assert "connections" in response.json()
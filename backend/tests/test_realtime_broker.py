@@ -0,0 +1,187 @@
+import os
+import time
+import shutil
+import asyncio
+import subprocess
+
+import pytest
+
+from conftest import TIMEOUT, free_port
+from app.services.realtime_broker import InProcessBroker, RedisBroker, PostgresBroker, user_channel
+
+@pytest.fixture(scope="module")
+def postgres_dsn(tmp_path_factory):
+    """TEST_POSTGRES_DSN, or a throwaway cluster from initdb/pg_ctl on PATH"""
+    pytest.importorskip("asyncpg")
+    if os.getenv("TEST_POSTGRES_DSN"):
+        yield os.environ["TEST_POSTGRES_DSN"]
+        return
+    initdb, pg_ctl = shutil.which("initdb"), shutil.which("pg_ctl")
+    if not (initdb and pg_ctl):
+        pytest.skip("no TEST_POSTGRES_DSN and initdb/pg_ctl are not on PATH")
+    if os.geteuid() == 0:
+        pytest.skip("initdb refuses to run as root; set TEST_POSTGRES_DSN")
+
+    data_dir = tmp_path_factory.mktemp("pgdata")
+    port = free_port()
+    subprocess.run(
+        [initdb, "-D", str(data_dir), "-U", "postgres", "-A", "trust"],
+        check=True, capture_output=True
+    )
+    subprocess.run(
+        [pg_ctl, "-D", str(data_dir), "-w", "-l", str(data_dir / "server.log"),
+         "-o", f"-p {port} -c listen_addresses=127.0.0.1 -k {data_dir}", "start"],
+        check=True, capture_output=True
+    )
+    try:
+        yield f"postgresql://postgres@127.0.0.1:{port}/postgres"
+    finally:
+        subprocess.run([pg_ctl, "-D", str(data_dir), "-m", "immediate", "stop"], capture_output=True)
+
+@pytest.fixture(params=["memory", "redis", "postgres"])
+def make_broker(request):
+    """Factory for brokers of one backend; each stands in for a worker"""
+    if request.param == "memory":
+        # Workers cannot share an in-process broker, so every "worker" is the same one
+        broker = InProcessBroker()
+        return lambda: broker
+    if request.param == "redis":
+        url = request.getfixturevalue("redis_url")
+        return lambda: RedisBroker(url)
+    dsn = request.getfixturevalue("postgres_dsn")
+    return lambda: PostgresBroker(dsn)
+
+class Inbox:
+    """Handler that collects delivered messages, keeping settle markers apart"""
+
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.markers: asyncio.Queue = asyncio.Queue()
+
+    async def __call__(self, message):
+        await (self.markers if message.get("type") == "marker" else self.messages).put(message)
+
+    async def next(self):
+        return await asyncio.wait_for(self.messages.get(), TIMEOUT)
+
+async def close_all(brokers):
+    for broker in dict.fromkeys(brokers):
+        await broker.close()
+
+async def settle(publisher, inbox: Inbox, channel: str):
+    """Wait until a subscription is live by round-tripping markers"""
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        await publisher.publish(channel, {"type": "marker"})
+        try:
+            await asyncio.wait_for(inbox.markers.get(), 0.2)
+            return
+        except asyncio.TimeoutError:
+            pass
+    raise TimeoutError(f"no delivery on {channel}")
+
+def test_user_channel_is_a_plain_identifier():
+    assert user_channel(42) == "realtime_user_42"
+    assert user_channel(42).isidentifier()
+
+def test_publish_fans_out_to_every_subscriber(make_broker):
+    async def scenario():
+        workers = list(dict.fromkeys(make_broker() for _ in range(3)))
+        try:
+            inboxes = {user_id: [Inbox() for _ in workers] for user_id in (1, 2)}
+            for user_id, user_inboxes in inboxes.items():
+                for worker, inbox in zip(workers, user_inboxes):
+                    await worker.subscribe(user_channel(user_id), inbox)
+            for index, worker in enumerate(workers):
+                # Subscribed last, so once it delivers the channels above are live too
+                ready = Inbox()
+                await worker.subscribe(f"realtime_settle_{index}", ready)
+                await settle(worker, ready, f"realtime_settle_{index}")
+
+            await workers[0].publish(user_channel(1), {"type": "stats_update", "data": {"total_posts": 3}})
+            await workers[-1].publish(user_channel(2), {"type": "alert", "data": "for user 2"})
+
+            for inbox in inboxes[1]:
+                assert await inbox.next() == {"type": "stats_update", "data": {"total_posts": 3}}
+            for inbox in inboxes[2]:
+                assert await inbox.next() == {"type": "alert", "data": "for user 2"}
+            await asyncio.sleep(0.1)
+            assert all(inbox.messages.empty() for inbox in inboxes[1] + inboxes[2])
+        finally:
+            await close_all(workers)
+
+    asyncio.run(scenario())
+
+def test_unsubscribe_stops_delivery(make_broker):
+    async def scenario():
+        subscriber, publisher = make_broker(), make_broker()
+        try:
+            gone, kept = Inbox(), Inbox()
+            await subscriber.subscribe(user_channel(1), gone)
+            await subscriber.subscribe(user_channel(2), kept)
+            await settle(subscriber, kept, user_channel(2))
+
+            await subscriber.unsubscribe(user_channel(1))
+            await publisher.publish(user_channel(1), {"type": "alert", "data": "after unsubscribe"})
+            # Same connection, so the second message arrives after the first would have
+            await publisher.publish(user_channel(2), {"type": "alert", "data": "still subscribed"})
+
+            assert await kept.next() == {"type": "alert", "data": "still subscribed"}
+            await asyncio.sleep(0.1)
+            assert gone.messages.empty()
+
+            # Subscribing again resumes delivery
+            await subscriber.subscribe(user_channel(1), gone)
+            await settle(subscriber, gone, user_channel(1))
+        finally:
+            await close_all([subscriber, publisher])
+
+    asyncio.run(scenario())
+
+def test_redis_broker_resubscribes_after_disconnect(redis_url):
+    import redis.asyncio as redis
+
+    async def scenario():
+        subscriber, publisher = RedisBroker(redis_url), RedisBroker(redis_url)
+        admin = redis.from_url(redis_url)
+        try:
+            inbox = Inbox()
+            await subscriber.subscribe(user_channel(1), inbox)
+            await settle(publisher, inbox, user_channel(1))
+
+            assert await admin.client_kill_filter(_type="pubsub") >= 1
+            await settle(publisher, inbox, user_channel(1))
+
+            await publisher.publish(user_channel(1), {"type": "alert", "data": "after reconnect"})
+            assert await inbox.next() == {"type": "alert", "data": "after reconnect"}
+        finally:
+            await admin.close()
+            await close_all([subscriber, publisher])
+
+    asyncio.run(scenario())
+
+def test_postgres_broker_relistens_after_disconnect(postgres_dsn):
+    import asyncpg
+
+    async def scenario():
+        subscriber, publisher = PostgresBroker(postgres_dsn), PostgresBroker(postgres_dsn)
+        admin = await asyncpg.connect(postgres_dsn)
+        try:
+            inbox = Inbox()
+            await subscriber.subscribe(user_channel(1), inbox)
+            await settle(publisher, inbox, user_channel(1))
+
+            # Drop every other backend, including both brokers' pooled connections
+            await admin.execute(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+            await settle(publisher, inbox, user_channel(1))
+
+            await publisher.publish(user_channel(1), {"type": "alert", "data": "after reconnect"})
+            assert await inbox.next() == {"type": "alert", "data": "after reconnect"}
+        finally:
+            await admin.close()
+            await close_all([subscriber, publisher])
+
+    asyncio.run(scenario())
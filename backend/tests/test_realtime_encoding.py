@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import realtime
+from app.services import realtime_encoding
+from app.services.auth import create_access_token
+from app.services.realtime_encoding import JSON, MSGPACK, negotiate_encoding
+
+@pytest.fixture
+def without_msgpack(monkeypatch):
+    monkeypatch.setattr(realtime_encoding, "ENCODINGS", [JSON])
+
+def test_negotiates_only_supported_encodings(monkeypatch, without_msgpack):
+    assert negotiate_encoding("msgpack") == JSON
+    assert negotiate_encoding("", ["msgpack", "json"]) == JSON
+    assert negotiate_encoding("", ["msgpack"]) == JSON
+
+    monkeypatch.setattr(realtime_encoding, "ENCODINGS", [JSON, MSGPACK])
+    assert negotiate_encoding("MsgPack") == MSGPACK
+    assert negotiate_encoding("", ["msgpack", "json"]) == MSGPACK
+    assert negotiate_encoding("", ["chat"]) == JSON
+
+def test_unavailable_msgpack_subprotocol_is_not_accepted(make_user, db_engine, without_msgpack):
+    user_id = make_user("tenant@example.com")
+    auth = f"token={create_access_token({'sub': 'tenant@example.com'})}"
+    app = FastAPI()
+    app.include_router(realtime.router, prefix="/api/realtime")
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/api/realtime/ws/{user_id}?{auth}", subprotocols=["msgpack", "json"]) as websocket:
+            assert websocket.accepted_subprotocol == "json"
+            websocket.send_json({"type": "ping"})
+            assert websocket.receive_json()["type"] == "pong"
+
+        with client.websocket_connect(f"/api/realtime/ws/{user_id}?{auth}", subprotocols=["msgpack"]) as websocket:
+            assert websocket.accepted_subprotocol is None
+            websocket.send_json({"type": "ping"})
+            assert websocket.receive_json()["type"] == "pong"
+
+        metrics = client.get("/api/realtime/metrics", headers={"Authorization": f"Bearer {auth[len('token='):]}"}).json()
+        assert metrics["encodings"] == [JSON]
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.services.realtime_events import UserEventLog, SqlEventSpill, SqlEventSequence, RedisEventSequence
+
+def event(number: int) -> dict:
+    return {"type": "new_post", "data": {"number": number}}
+
+def workers(sequence, spill=None, count: int = 2):
+    """Event logs standing in for separate worker processes"""
+    return [UserEventLog(50, spill=spill, sequence=sequence) for _ in range(count)]
+
+async def publish_concurrently(logs, user_id: int, per_worker: int):
+    return await asyncio.gather(*[
+        log.record(user_id, event(n)) for n in range(per_worker) for log in logs
+    ])
+
+def test_workers_sharing_database_sequence_never_collide(make_user):
+    user_id = make_user()
+    spill = SqlEventSpill(retention_hours=1)
+
+    async def scenario():
+        logs = workers(SqlEventSequence(), spill)
+        recorded = await publish_concurrently(logs, user_id, 10)
+        # A third worker started later replays everything from the spill
+        replayed = await UserEventLog(50, spill=spill, sequence=SqlEventSequence()).since(user_id, 0)
+        return recorded, replayed
+
+    recorded, replayed = asyncio.run(scenario())
+    assert sorted(item["seq"] for item in recorded) == list(range(1, 21))
+    assert [item["seq"] for item in replayed] == list(range(1, 21))
+
+def test_database_sequence_continues_after_spilled_events(make_user):
+    user_id = make_user()
+    spill = SqlEventSpill(retention_hours=1)
+
+    async def scenario():
+        # Events spilled before counters were shared
+        for seq in (1, 2, 3):
+            await asyncio.to_thread(spill.append, user_id, {**event(seq), "seq": seq})
+        return await workers(SqlEventSequence(), spill, count=1)[0].record(user_id, event(4))
+
+    assert asyncio.run(scenario())["seq"] == 4
+
+def test_workers_sharing_redis_sequence_never_collide(redis_url):
+    async def scenario():
+        sequence = RedisEventSequence(redis_url)
+        await sequence._redis.delete("realtime_seq_41")
+        recorded = await publish_concurrently(workers(sequence), 41, 10)
+        await sequence.close()
+        return recorded
+
+    assert sorted(item["seq"] for item in asyncio.run(scenario())) == list(range(1, 21))
+
+def test_ring_orders_events_arriving_out_of_sequence():
+    log = UserEventLog(capacity=4)
+
+    for seq in (1, 2, 4):
+        log.observe(7, {**event(seq), "seq": seq})
+    # seq 3 was allocated by another worker and has not arrived yet
+    assert asyncio.run(log.since(7, 1)) is None
+
+    log.observe(7, {**event(3), "seq": 3})
+    log.observe(7, {**event(3), "seq": 3})
+    assert [item["seq"] for item in asyncio.run(log.since(7, 1))] == [2, 3, 4]
+
+    log.observe(7, {**event(5), "seq": 5})
+    log.observe(7, {**event(1), "seq": 1})
+    assert [item["seq"] for item in asyncio.run(log.since(7, 1))] == [2, 3, 4, 5]
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import realtime
+from app.services.auth import create_access_token
+
+@pytest.fixture
+def stats_calls(monkeypatch):
+    """Users each compute_user_stats call was made for"""
+    calls = []
+
+    def compute(user_id):
+        calls.append(user_id)
+        return {"total_posts": 3, "sentiment_distribution": {"positive": 3}}
+
+    monkeypatch.setattr(realtime, "compute_user_stats", compute)
+    return calls
+
+@pytest.fixture
+def client(db_engine):
+    app = FastAPI()
+    app.include_router(realtime.router, prefix="/api/realtime")
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def tenant(make_user):
+    """A user id and the query string authorizing it"""
+    user_id = make_user("tenant@example.com")
+    return user_id, f"token={create_access_token({'sub': 'tenant@example.com'})}"
+
+def wait_until_released():
+    """The server handles a client's close after the client side returns"""
+    deadline = time.monotonic() + 5
+    while realtime.stats_ticker.metrics()["dashboards"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return realtime.stats_ticker.metrics()
+
+def request_stats(websocket):
+    websocket.send_json({"type": "request_stats"})
+    return websocket.receive_json()
+
+def test_request_stats_served_from_shared_snapshot(client, stats_calls, tenant):
+    user_id, auth = tenant
+    with client.websocket_connect(f"/api/realtime/ws/{user_id}?{auth}") as first, \
+            client.websocket_connect(f"/api/realtime/ws/{user_id}?{auth}") as second:
+        replies = [request_stats(first), request_stats(second), request_stats(first)]
+        assert realtime.stats_ticker.metrics()["dashboards"] == 2
+    wait_until_released()
+
+    assert [reply["type"] for reply in replies] == ["stats_update"] * 3
+    assert all(reply["data"]["total_posts"] == 3 for reply in replies)
+    # One query for the user, however many sockets ask
+    assert stats_calls == [user_id]
+
+def test_ticker_released_when_socket_closes(client, stats_calls, tenant):
+    user_id, auth = tenant
+    with client.websocket_connect(f"/api/realtime/ws/{user_id}?{auth}") as websocket:
+        request_stats(websocket)
+        websocket.send_json({"type": "ping"})
+        assert websocket.receive_json()["type"] == "pong"
+
+    # Closing the socket stopped the ticker and dropped its cached snapshot
+    assert wait_until_released() == {"users": 0, "dashboards": 0}
+
+    with client.websocket_connect(f"/api/realtime/ws/{user_id}?{auth}") as websocket:
+        request_stats(websocket)
+
+    assert stats_calls == [user_id, user_id]
+    assert wait_until_released() == {"users": 0, "dashboards": 0}
+
+def test_deltas_only_reach_sockets_that_joined_the_ticker(client, tenant, monkeypatch):
+    user_id, auth = tenant
+    totals = iter(range(1, 1000))
+    monkeypatch.setattr(realtime, "compute_user_stats", lambda user_id: {"total_posts": next(totals)})
+    monkeypatch.setattr(realtime.stats_ticker, "interval", 0.05)
+
+    with client.websocket_connect(f"/api/realtime/ws/{user_id}?{auth}") as idle, \
+            client.websocket_connect(f"/api/realtime/ws/dashboard/{user_id}?{auth}") as dashboard:
+        # The dashboard joins with a full snapshot, then gets deltas against it
+        snapshot = dashboard.receive_json()
+        delta = dashboard.receive_json()
+        assert (snapshot["type"], snapshot["data"]) == ("stats_update", {"total_posts": 1})
+        assert (delta["type"], delta["data"]) == ("stats_delta", {"total_posts": 2})
+
+        # The other socket never asked for stats, so it has been sent nothing
+        idle.send_json({"type": "ping"})
+        assert idle.receive_json()["type"] == "pong"
+
+        joined = request_stats(idle)
+        assert joined["type"] == "stats_update"
+        following = idle.receive_json()
+        assert following["type"] == "stats_delta"
+        assert following["data"]["total_posts"] > joined["data"]["total_posts"]
+    wait_until_released()
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.social_data import SocialPost, AnalyticsData
+from app.services.report_engine import report_engine, rollup_range
+
+DAY = datetime(2024, 3, 4)
+
+def post(user_id: int, post_id: str, posted_at: datetime, sentiment: str = "positive", likes: int = 1) -> dict:
+    return {
+        'user_id': user_id, 'platform': 'twitter', 'post_id': post_id, 'content': post_id,
+        'posted_at': posted_at, 'likes': likes, 'shares': 0, 'comments': 0,
+        'sentiment': sentiment, 'topics': ['delays'],
+    }
+
+def rollup_for(user_id: int, day: datetime = DAY) -> dict:
+    with SessionLocal() as db:
+        [rollup] = report_engine.daily_rollups(db, user_id, day, day + timedelta(days=1))
+        return rollup
+
+def test_late_dataset_import_rebuilds_stored_rollup(make_user):
+    pd = pytest.importorskip("pandas")
+    from app.services.dataset_service import DatasetService
+
+    user_id = make_user()
+    with SessionLocal() as db:
+        db.add(SocialPost(**post(user_id, "early", DAY + timedelta(hours=3))))
+        db.commit()
+    assert rollup_for(user_id)['total_posts'] == 1
+
+    # Historical posts arrive after the day was rolled up, stamped in UTC as imports are
+    late = [
+        post(user_id, "late-1", pd.Timestamp(DAY + timedelta(hours=20), tz="UTC"), "negative", 4),
+        post(user_id, "late-2", pd.Timestamp(DAY + timedelta(hours=21), tz="UTC"), "negative", 5),
+    ]
+    with SessionLocal() as db:
+        assert DatasetService()._bulk_insert(db, late) == 2
+        db.commit()
+
+    rollup = rollup_for(user_id)
+    assert rollup['total_posts'] == 3
+    assert rollup['sentiment_negative'] == 2
+    assert rollup['total_engagement'] == 10
+
+def test_empty_day_rebuilt_once_posts_arrive(make_user):
+    from app.services.dataset_service import DatasetService
+
+    user_id = make_user()
+    assert rollup_for(user_id)['total_posts'] == 0
+    with SessionLocal() as db:
+        assert db.query(AnalyticsData).one().platform_stats == {}
+
+    assert DatasetService().import_dataset_to_db(
+        [{k: v for k, v in post(user_id, "late", DAY + timedelta(hours=1)).items() if k != 'user_id'}],
+        user_id
+    ) == 1
+    assert rollup_for(user_id)['platform_stats'] == {'twitter': {'posts': 1, 'engagement': 1}}
+
+def test_reimport_keeps_other_days_and_trending_keywords(make_user):
+    from app.services.dataset_service import DatasetService
+
+    user_id = make_user()
+    other_day = DAY + timedelta(days=1)
+    with SessionLocal() as db:
+        db.add(SocialPost(**post(user_id, "early", DAY + timedelta(hours=3))))
+        db.commit()
+    rollup_for(user_id)
+    rollup_for(user_id, other_day)
+    with SessionLocal() as db:
+        for record in db.query(AnalyticsData):
+            record.trending_keywords = [{'keyword': 'outage', 'score': 1.0}]
+        db.commit()
+
+    with SessionLocal() as db:
+        # Only new posts invalidate: the duplicate is skipped, the new one lands on DAY
+        DatasetService()._bulk_insert(db, [post(user_id, "early", DAY), post(user_id, "new", DAY)])
+        db.commit()
+        stored = {record.date.replace(tzinfo=None): record for record in db.query(AnalyticsData)}
+        assert stored[DAY].platform_stats is None
+        assert stored[other_day].platform_stats == {}
+        assert stored[DAY].trending_keywords == [{'keyword': 'outage', 'score': 1.0}]
+
+    assert rollup_for(user_id)['total_posts'] == 2
+
+def test_rollup_range_is_whole_utc_days_up_to_now():
+    now = datetime.utcnow()
+    assert rollup_range(now - timedelta(days=1), now)[0] == (now - timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    assert now <= rollup_range(now - timedelta(days=1), now)[1] <= datetime.utcnow()
+
+    aware_start = datetime(2024, 3, 4, 23, 30, tzinfo=timezone(timedelta(hours=-2)))
+    aware_end = datetime(2024, 3, 6, 12, 0, tzinfo=timezone.utc)
+    assert rollup_range(aware_start, aware_end) == (datetime(2024, 3, 5), datetime(2024, 3, 7))
+    assert rollup_range(DAY, DAY + timedelta(days=2)) == (DAY, DAY + timedelta(days=2))
+
+def test_rollup_report_matches_direct_scan(make_user):
+    user_id = make_user()
+    other_user = make_user("other@example.com")
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=4)
+    rows = [
+        post(user_id, "first", start, "positive", 3),
+        post(user_id, "last-second", start + timedelta(days=1) - timedelta(seconds=1), "negative", 0),
+        post(user_id, "middle", start + timedelta(days=2, hours=12), "neutral", 7),
+        {**post(user_id, "reddit", start + timedelta(days=2, hours=13), "negative", 2), 'platform': 'reddit', 'topics': ['refunds', 'delays']},
+        post(user_id, "today", datetime.utcnow() - timedelta(seconds=1), "positive", 5),
+        # Outside the range, or someone else's
+        post(user_id, "before", start - timedelta(seconds=1), "negative", 100),
+        post(other_user, "other", start + timedelta(days=1), "negative", 100),
+    ]
+    with SessionLocal() as db:
+        db.add_all(SocialPost(**row) for row in rows)
+        db.commit()
+
+    end = datetime.utcnow()
+    with SessionLocal() as db:
+        # Store the finished days first, so the report reads them back as rollups
+        report_engine.daily_rollups(db, user_id, start, end)
+        rollup_insights = report_engine.compose_insights(report_engine.daily_rollups(db, user_id, start, end))
+        direct = report_engine.aggregate_day(db, user_id, start, end)
+        posts = db.query(SocialPost).filter(
+            SocialPost.user_id == user_id, SocialPost.posted_at >= start, SocialPost.posted_at < end
+        ).all()
+
+    total_engagement = sum(p.likes + p.shares + p.comments for p in posts)
+    sentiment = {}
+    platforms = {}
+    topics = {}
+    for p in posts:
+        sentiment[p.sentiment] = sentiment.get(p.sentiment, 0) + 1
+        platforms[p.platform] = platforms.get(p.platform, 0) + 1
+        for topic in p.topics:
+            topics[topic] = topics.get(topic, 0) + 1
+
+    assert rollup_insights['total_posts'] == direct['total_posts'] == len(posts) == 5
+    assert rollup_insights['total_engagement'] == direct['total_engagement'] == total_engagement == 17
+    assert rollup_insights['avg_engagement_per_post'] == pytest.approx(total_engagement / len(posts))
+    assert rollup_insights['sentiment_distribution'] == sentiment
+    assert rollup_insights['platform_breakdown'] == platforms
+    assert {name: stats['posts'] for name, stats in direct['platform_stats'].items()} == platforms
+    assert dict(rollup_insights['top_topics']) == topics
+    assert {item['topic']: item['count'] for item in direct['top_topics']} == topics
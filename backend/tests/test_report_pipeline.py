@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.social_data import Report, EmailOutbox
+from app.services.email_templates import RenderedEmail
+from app.services.report_pipeline import _insert_reports
+
+DAY = datetime(2024, 1, 1)
+
+def report_row(user_id: int) -> dict:
+    return {
+        'user_id': user_id,
+        'title': "Daily Business Intelligence Report - 2024-01-01",
+        'report_type': "daily",
+        'date_range_start': DAY,
+        'date_range_end': DAY + timedelta(days=1),
+        'status': 'generated'
+    }
+
+def test_insert_reports_batches_by_report_setting(make_user, db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_INSERT_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "DATASET_INSERT_BATCH_SIZE", 1000)
+    user_ids = [make_user(f"user{i}@example.com") for i in range(5)]
+    emails = {user_id: (f"user{user_id}@example.com", RenderedEmail("Report", "body", "<p>body</p>")) for user_id in user_ids}
+
+    inserts = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("INSERT INTO REPORTS"):
+            inserts.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        report_ids = _insert_reports([report_row(user_id) for user_id in user_ids], emails)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
+
+    assert len(inserts) == 3
+    assert set(report_ids) == set(user_ids)
+    with SessionLocal() as db:
+        assert {report.id: report.user_id for report in db.query(Report)} == {
+            report_id: user_id for user_id, report_id in report_ids.items()
+        }
+        outbox = {row.report_id: row.to_email for row in db.query(EmailOutbox)}
+        assert outbox == {report_ids[user_id]: f"user{user_id}@example.com" for user_id in user_ids}
+
+def rollup(positive: int, negative: int, neutral: int, platforms: dict, topics: dict, engagement: int) -> dict:
+    return {
+        'total_posts': positive + negative + neutral,
+        'total_engagement': engagement,
+        'sentiment_positive': positive,
+        'sentiment_negative': negative,
+        'sentiment_neutral': neutral,
+        'platform_stats': {platform: {'posts': posts} for platform, posts in platforms.items()},
+        'top_topics': [{'topic': topic, 'count': count} for topic, count in topics.items()],
+    }
+
+def test_compose_insights_lists_key_findings():
+    from app.services.report_engine import report_engine
+
+    insights = report_engine.compose_insights(
+        [
+            rollup(1, 2, 1, {'twitter': 3, 'reddit': 1}, {'delays': 3, 'refunds': 1}, 40),
+            rollup(4, 0, 2, {'twitter': 5, 'reddit': 1}, {'delays': 2, 'service': 4}, 60),
+        ],
+        trending_keywords=[{'keyword': 'outage'}, {'keyword': 'refund'}]
+    )
+
+    assert insights['key_insights'] == [
+        "10 posts drew 100 engagements (10.0 per post)",
+        "Sentiment: 50% positive, 30% neutral, 20% negative",
+        "Sentiment is improving over the period",
+        "Most active platform: twitter (80% of posts)",
+        "Top topics: delays, service, refunds",
+        "Trending: 'outage', 'refund'",
+    ]
+    assert insights['key_insights'] != insights['recommendations']
+
+def test_compose_insights_without_posts_has_no_findings():
+    from app.services.report_engine import report_engine
+
+    assert report_engine.compose_insights([rollup(0, 0, 0, {}, {}, 0)])['key_insights'] == []
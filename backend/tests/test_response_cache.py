@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+from app.services.response_cache import ResponseCache, MemoryCacheBackend, RedisCacheBackend
+
+class RecordingBackend(MemoryCacheBackend):
+    """Memory backend that records which thread each bump ran on"""
+
+    def __init__(self):
+        super().__init__(max_entries=100)
+        self.bump_threads = []
+
+    async def bump(self, user_id: int) -> None:
+        self.bump_threads.append(threading.get_ident())
+        await super().bump(user_id)
+
+async def version(cache: ResponseCache, user_id: int) -> int:
+    return (await cache.backend.lookup(user_id, "unused"))[0]
+
+def test_invalidate_user_bumps_version():
+    cache = ResponseCache(MemoryCacheBackend(max_entries=100), max_age=60)
+
+    async def scenario():
+        before = await version(cache, 1)
+        await cache.invalidate_user(1)
+        assert await version(cache, 1) > before
+        assert await version(cache, 2) == 0
+
+    asyncio.run(scenario())
+
+def test_worker_thread_bump_runs_on_event_loop():
+    cache = ResponseCache(RecordingBackend(), max_age=60)
+
+    async def scenario():
+        cache.start()
+        loop_thread = threading.get_ident()
+        # Returns only once the bump has landed
+        await asyncio.to_thread(cache.invalidate_user_sync, 1)
+        assert cache.backend.bump_threads == [loop_thread]
+        assert await version(cache, 1) > 0
+
+    asyncio.run(scenario())
+
+def test_sync_call_on_event_loop_does_not_block_it():
+    cache = ResponseCache(RecordingBackend(), max_age=60)
+
+    async def scenario():
+        cache.start()
+        cache.invalidate_user_sync(1)
+        assert cache.backend.bump_threads == []
+        await asyncio.sleep(0)
+        assert cache.backend.bump_threads == [threading.get_ident()]
+
+    asyncio.run(scenario())
+
+def test_redis_bump_uses_async_client(redis_url):
+    backend = RedisCacheBackend(redis_url, max_age=60)
+    cache = ResponseCache(backend, max_age=60)
+
+    async def scenario():
+        cache.start()
+        before = await version(cache, 7)
+        await asyncio.to_thread(cache.invalidate_user_sync, 7)
+        after = await version(cache, 7)
+        await cache.invalidate_user(7)
+        assert before < after < await version(cache, 7)
+        await backend._redis.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import TaskScheduler
+
+class FakePipeline:
+    """Stands in for the daily report pipeline, recording where it ran"""
+
+    def __init__(self, release: threading.Event = None):
+        self.runs = []
+        self.release = release
+
+    async def run(self):
+        self.runs.append((threading.get_ident(), asyncio.get_running_loop()))
+        if self.release:
+            await asyncio.to_thread(self.release.wait)
+        return {'sent': 1, 'failed': 0, 'deferred': 0, 'total_seconds': 0.0}
+
+def test_jobs_run_on_the_app_loop(monkeypatch):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(scheduler_module, "daily_report_pipeline", pipeline)
+    scheduler = TaskScheduler(check_interval=0.01)
+
+    async def scenario():
+        scheduler.start_scheduler()
+        try:
+            # Due jobs are triggered from the scheduler thread
+            await asyncio.to_thread(scheduler._run_job, scheduler._send_daily_reports)
+            await asyncio.wrap_future(scheduler._in_flight["_send_daily_reports"])
+        finally:
+            await asyncio.to_thread(scheduler.stop_scheduler)
+        return threading.get_ident(), asyncio.get_running_loop()
+
+    assert pipeline.runs == [asyncio.run(scenario())]
+
+def test_jobs_run_to_completion_without_an_app_loop(monkeypatch):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(scheduler_module, "daily_report_pipeline", pipeline)
+    scheduler = TaskScheduler()
+
+    scheduler._run_job(scheduler._send_daily_reports)
+
+    assert len(pipeline.runs) == 1
+
+def test_overlapping_run_is_skipped(monkeypatch):
+    release = threading.Event()
+    pipeline = FakePipeline(release)
+    monkeypatch.setattr(scheduler_module, "daily_report_pipeline", pipeline)
+    scheduler = TaskScheduler()
+
+    async def scenario():
+        scheduler.start_scheduler()
+        try:
+            await asyncio.to_thread(scheduler._run_job, scheduler._send_daily_reports)
+            first = scheduler._in_flight["_send_daily_reports"]
+            await asyncio.sleep(0.05)
+            await asyncio.to_thread(scheduler._run_job, scheduler._send_daily_reports)
+            assert scheduler._in_flight["_send_daily_reports"] is first
+            release.set()
+            await asyncio.wrap_future(first)
+        finally:
+            release.set()
+            await asyncio.to_thread(scheduler.stop_scheduler)
+
+    asyncio.run(scenario())
+    assert len(pipeline.runs) == 1
+
+def test_start_registers_jobs_once_and_stops_promptly():
+    scheduler = TaskScheduler(check_interval=60)
+    scheduler.start_scheduler()
+    scheduler.start_scheduler()
+    assert len(scheduler._schedule.jobs) == 4
+
+    thread = scheduler.thread
+    scheduler.stop_scheduler()
+    assert not thread.is_alive()
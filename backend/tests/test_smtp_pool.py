@@ -0,0 +1,135 @@
+import asyncio
+from email.message import EmailMessage
+
+import pytest
+
+from conftest import free_port
+from app.services.email_service import SMTPPool, EmailDeliveryError
+
+def make_pool(controller, **options) -> SMTPPool:
+    options = {"size": 2, "retry_backoff": 0.01, "max_retries": 2, "timeout": 5, **options}
+    return SMTPPool(controller.hostname, controller.port, use_tls=False, **options)
+
+def message(number: int = 0) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@example.com"
+    msg["To"] = f"user{number}@example.com"
+    msg["Subject"] = f"Report {number}"
+    msg.set_content("body")
+    return msg
+
+def run(pool: SMTPPool, *messages: EmailMessage):
+    async def scenario():
+        try:
+            return await asyncio.gather(*[pool.send(msg) for msg in messages])
+        finally:
+            await pool.close()
+    return asyncio.run(scenario())
+
+def test_sequential_sends_reuse_one_session(smtp_server):
+    pool = make_pool(smtp_server)
+
+    async def scenario():
+        results = [await pool.send(message(i)) for i in range(5)]
+        await pool.close()
+        return results
+
+    assert asyncio.run(scenario()) == [True] * 5
+    assert len(smtp_server.handler.messages) == 5
+    assert len(smtp_server.handler.sessions) == 1
+    assert pool.metrics()["connections_opened"] == 1
+    assert pool.metrics()["messages_per_connection"] == 5.0
+
+def test_session_recycled_after_message_limit(smtp_server):
+    pool = make_pool(smtp_server, messages_per_connection=2)
+
+    async def scenario():
+        for i in range(5):
+            assert await pool.send(message(i))
+        await pool.close()
+
+    asyncio.run(scenario())
+    assert pool.stats["connections_opened"] == 3
+
+def test_reconnects_after_server_side_disconnect(smtp_server):
+    pool = make_pool(smtp_server)
+    handler = smtp_server.handler
+
+    async def scenario():
+        assert await pool.send(message(1))
+        # Drop every session from the server's side, as an idle timeout would
+        done = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def drop():
+            for session in handler.sessions:
+                session.transport.close()
+            loop.call_soon_threadsafe(done.set)
+
+        smtp_server.loop.call_soon_threadsafe(drop)
+        await done.wait()
+        assert await pool.send(message(2))
+        await pool.close()
+
+    asyncio.run(scenario())
+    assert len(handler.messages) == 2
+    assert pool.stats["connections_opened"] == 2
+    assert pool.stats["failed"] == 0
+
+def test_retries_transient_4xx_on_same_session(smtp_server):
+    smtp_server.handler.replies = ["451 Try again later"]
+    pool = make_pool(smtp_server)
+
+    assert run(pool, message()) == [True]
+    assert len(smtp_server.handler.messages) == 1
+    assert pool.stats["retries"] == 1
+    assert pool.stats["connections_opened"] == 1
+
+def test_gives_up_after_max_retries(smtp_server):
+    smtp_server.handler.replies = ["451 Try again later"] * 3
+    pool = make_pool(smtp_server, max_retries=2)
+
+    assert run(pool, message()) == [False]
+    assert smtp_server.handler.messages == []
+    assert pool.stats["retries"] == 2
+    assert pool.stats["failed"] == 1
+
+def test_5xx_fails_without_retry(smtp_server):
+    smtp_server.handler.replies = ["554 Message rejected"]
+    pool = make_pool(smtp_server, size=1)
+
+    assert run(pool, message(1), message(2)) == [False, True]
+    assert len(smtp_server.handler.messages) == 1
+    assert pool.stats["retries"] == 0
+    assert pool.stats["failed"] == 1
+    # The rejected message left the session usable
+    assert pool.stats["connections_opened"] == 1
+
+def test_concurrency_bounded_by_pool_size(smtp_server):
+    smtp_server.handler.delay = 0.2
+    pool = make_pool(smtp_server, size=2)
+
+    assert run(pool, *[message(i) for i in range(6)]) == [True] * 6
+    assert len(smtp_server.handler.messages) == 6
+    assert smtp_server.handler.max_active == 2
+    assert pool.stats["connections_opened"] == 2
+
+def test_deliver_raises_with_server_reply(smtp_server):
+    smtp_server.handler.replies = ["554 5.7.1 Message rejected as spam"]
+    pool = make_pool(smtp_server)
+
+    async def scenario():
+        try:
+            await pool.deliver(message())
+        finally:
+            await pool.close()
+
+    with pytest.raises(EmailDeliveryError, match="554 5.7.1 Message rejected as spam"):
+        asyncio.run(scenario())
+
+def test_deliver_reports_connection_failure(smtp_server):
+    pool = make_pool(smtp_server, max_retries=1)
+    pool.port = free_port()
+
+    with pytest.raises(EmailDeliveryError, match="failed after 2 attempts"):
+        asyncio.run(pool.deliver(message()))
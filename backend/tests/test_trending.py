@@ -0,0 +1,88 @@
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from app.services.trending import SpaceSaving, WindowedSketch, TrendingEngine
+
+HOUR = 3600
+
+def test_space_saving_is_exact_within_capacity():
+    sketch = SpaceSaving(capacity=3)
+    for term in ["alpha", "beta", "alpha", "gamma", "alpha", "beta"]:
+        sketch.add(term)
+
+    assert dict(sketch.items()) == {"alpha": 3, "beta": 2, "gamma": 1}
+    assert set(sketch.errors.values()) == {0}
+
+def test_space_saving_bounds_hold_past_capacity():
+    rng = random.Random(7)
+    heavy = ["outage", "refund", "delay"]
+    stream = heavy * 300 + [f"rare{rng.randrange(400)}" for _ in range(1100)]
+    rng.shuffle(stream)
+    capacity = 20
+
+    sketch = SpaceSaving(capacity)
+    for term in stream:
+        sketch.add(term)
+    truth = Counter(stream)
+
+    counts = dict(sketch.items())
+    assert len(counts) == capacity
+    # Counts are never too low, and overshoot by at most the recorded error
+    for term, count in counts.items():
+        assert count - sketch.errors[term] <= truth[term] <= count
+    # Every term above N / capacity is kept
+    assert set(heavy) <= set(counts)
+    assert sum(counts.values()) == len(stream)
+    # The count groups mirror the counts
+    assert {term for group in sketch.groups.values() for term in group} == set(counts)
+    assert sketch.min_count == min(counts.values())
+
+def test_windowed_sketch_drops_expired_panes():
+    sketch = WindowedSketch(window=HOUR, panes=6, capacity=10)
+    for _ in range(3):
+        sketch.add("outage", 0)
+    sketch.add("refund", 30 * 60)
+
+    assert sketch.counts(50 * 60) == {"outage": 3, "refund": 1}
+    # The first pane has left the window, the later one has not
+    assert sketch.counts(HOUR + 60) == {"refund": 1}
+    assert sketch.counts(2 * HOUR) == {}
+
+def test_windowed_sketch_reuses_a_slot_for_a_new_pane():
+    sketch = WindowedSketch(window=HOUR, panes=6, capacity=10)
+    sketch.add("outage", 0)
+    sketch.add("refund", HOUR)
+
+    assert sketch.counts(HOUR) == {"refund": 1}
+
+def test_trending_ranks_recent_spikes_over_steady_terms():
+    engine = TrendingEngine(capacity=50, max_users=10, min_count=3)
+    now = time.time()
+    # "refund" is steady across the day; "outage" only shows up in the last hour
+    for hour in range(1, 20):
+        for _ in range(2):
+            engine.add_text(1, "refund request pending", now - hour * HOUR)
+    for _ in range(5):
+        engine.add_text(1, "refund outage outage the and", now - 60)
+
+    hourly = engine.trending(1, "1h")
+    assert [item["keyword"] for item in hourly[:2]] == ["outage", "refund"]
+    assert hourly[0]["count"] == 5 and hourly[0]["baseline_count"] == 5
+    assert hourly[1]["count"] == 5 and hourly[1]["baseline_count"] == 43
+    assert hourly[0]["score"] > hourly[1]["score"]
+    # Stop words and short words are never counted; rare terms are filtered
+    assert not {"the", "and"} & {item["keyword"] for item in engine.trending(1, "7d")}
+    assert "request" not in {item["keyword"] for item in hourly}
+
+def test_trending_validates_window_and_evicts_idle_users():
+    engine = TrendingEngine(capacity=10, max_users=2, min_count=1)
+    for user_id in (1, 2, 3):
+        engine.add_text(user_id, "outage")
+
+    assert engine.users() == [2, 3]
+    assert engine.trending(1, "24h") == []
+    with pytest.raises(ValueError):
+        engine.trending(2, "5m")
@@ -48,7 +48,7 @@ CREATE TABLE social_posts (
     id SERIAL PRIMARY KEY,
     user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
     platform VARCHAR(50) NOT NULL, -- twitter, linkedin, facebook, instagram
-    post_id VARCHAR(255) UNIQUE NOT NULL,
+    post_id VARCHAR(255) NOT NULL,
     content TEXT NOT NULL,
     author VARCHAR(255),
     author_id VARCHAR(255),
@@ -72,7 +72,10 @@ CREATE TABLE social_posts (
     -- Full-text search
     search_vector TSVECTOR GENERATED ALWAYS AS (
         to_tsvector('english', content)
-    ) STORED
+    ) STORED,
+
+    -- Source post ids are only unique per platform, and each user keeps their own copy
+    CONSTRAINT uq_social_posts_user_platform_post UNIQUE (user_id, platform, post_id)
 );
 
 -- Analytics data table (aggregated daily metrics)
@@ -0,0 +1,19 @@
+-- Make social_posts.post_id unique per (user, platform) instead of across the table.
+--
+-- A global UNIQUE(post_id) made re-imports of a dataset for a second user
+-- skip every row as a conflict. Dataset imports now skip only posts the same
+-- user already has, via ON CONFLICT (user_id, platform, post_id).
+--
+-- Apply to existing PostgreSQL databases created from init.sql or by the
+-- application before this change:
+--   psql ai_social_db < schemas/migrations/001_social_posts_per_user_post_id.sql
+-- Development SQLite databases are recreated with backend/init_db.py.
+
+BEGIN;
+
+ALTER TABLE social_posts DROP CONSTRAINT IF EXISTS social_posts_post_id_key;
+
+ALTER TABLE social_posts
+    ADD CONSTRAINT uq_social_posts_user_platform_post UNIQUE (user_id, platform, post_id);
+
+COMMIT;